@@ -0,0 +1,253 @@
+"""
+Offline load test: latency percentiles and throughput against the mock backend.
+
+Suites:
+    client   RiotTournamentClient.create_codes from a thread pool
+    async    AsyncRiotTournamentClient.create_codes with N calls in flight
+    runner   PresetRunner.run on a generated preset (tournament -> codes -> webhooks)
+    webhook  WebhookDispatcher.send_codes to Discord-style mock webhooks
+
+Each suite runs once per concurrency level and reports p50/p95/p99 latency
+and codes per second. --save writes the results as JSON; --baseline
+compares against a saved run and exits with status 1 on a regression.
+
+Usage:
+    python bench_load.py --levels 1,4,16 --latency 0.02 --jitter 0.01
+    python bench_load.py --save baseline.json
+    python bench_load.py --baseline baseline.json --tolerance 0.2
+    python bench_load.py --suites client,runner --error-rate 0.02 --rate-limit-rate 0.05
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from api_client import RiotTournamentClient
+from async_client import AsyncRiotTournamentClient
+from discord_helper import WebhookDispatcher, get_dispatcher
+from preset_runner import PresetRunner
+from rate_limiter import RateLimiter
+from mock_backend import start_server
+
+SUITES = ["client", "async", "runner", "webhook"]
+
+# Client-side limits high enough that the benchmark measures the request path, not Riot's quotas
+UNTHROTTLED_LIMITS = {endpoint: [(1000000, 1)] for endpoint in ("/providers", "/tournaments", "/codes")}
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+def summarize(suite, level, latencies, codes, errors, elapsed):
+    return {
+        "suite": suite,
+        "concurrency": level,
+        "calls": len(latencies),
+        "errors": errors,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "codes_per_s": codes / elapsed if elapsed > 0 else 0.0
+    }
+
+def make_limiter(args):
+    return RateLimiter() if args.respect_limits else RateLimiter(UNTHROTTLED_LIMITS)
+
+# --- Suites ---
+def bench_client(args, base_url, webhook_base, level):
+    latencies, errors = [], 0
+    with RiotTournamentClient(use_stub=True, base_url=base_url, pool_size=level,
+                              rate_limiter=make_limiter(args), max_retries=args.max_retries) as client:
+        def call(_):
+            start = time.perf_counter()
+            res = client.create_codes(1, count=1)
+            return time.perf_counter() - start, res["success"]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=level) as executor:
+            for latency, ok in executor.map(call, range(args.calls)):
+                latencies.append(latency)
+                errors += not ok
+        elapsed = time.perf_counter() - start
+    return summarize("client", level, latencies, len(latencies) - errors, errors, elapsed)
+
+def bench_async(args, base_url, webhook_base, level):
+    async def run():
+        latencies, errors = [], 0
+        limit = asyncio.Semaphore(level)
+        async with AsyncRiotTournamentClient(use_stub=True, max_in_flight=level, base_url=base_url,
+                                             rate_limiter=make_limiter(args),
+                                             max_retries=args.max_retries) as client:
+            async def call():
+                async with limit:
+                    start = time.perf_counter()
+                    res = await client.create_codes(1, count=1)
+                    return time.perf_counter() - start, res["success"]
+
+            start = time.perf_counter()
+            for latency, ok in await asyncio.gather(*(call() for _ in range(args.calls))):
+                latencies.append(latency)
+                errors += not ok
+            elapsed = time.perf_counter() - start
+        return summarize("async", level, latencies, len(latencies) - errors, errors, elapsed)
+    return asyncio.run(run())
+
+def make_preset(args, webhook_base):
+    """A preset spread over a few tournaments and webhook channels, like a bracket round."""
+    run = uuid.uuid4().hex[:8]
+    return {
+        "label": f"Load test {run}",
+        "actions": [{"name": f"Match {i + 1}",
+                     "api_name": f"Load test {run} - group {i % args.groups}",
+                     "url": f"{webhook_base}/{i % args.webhooks}/{run}"}
+                    for i in range(args.actions)]
+    }
+
+def bench_runner(args, base_url, webhook_base, level):
+    latencies, codes, errors, elapsed = [], 0, 0, 0.0
+    with RiotTournamentClient(use_stub=True, base_url=base_url, pool_size=level,
+                              rate_limiter=make_limiter(args), max_retries=args.max_retries) as client:
+        runner = PresetRunner(client, max_workers=level, batch=not args.no_batch)
+        for _ in range(args.runs):
+            preset = make_preset(args, webhook_base)
+            start = time.perf_counter()
+            finished = []
+            # Per-action latency: from run start until the action's webhook is done
+            summary = runner.run("1", preset, on_result=lambda i, r: finished.append(time.perf_counter() - start))
+            elapsed += time.perf_counter() - start
+            latencies.extend(finished)
+            codes += summary["success_count"]
+            errors += summary["total_count"] - summary["success_count"]
+    return summarize("runner", level, latencies, codes, errors, elapsed)
+
+def bench_webhook(args, base_url, webhook_base, level):
+    latencies, codes, errors = [], 0, 0
+    dispatcher = WebhookDispatcher(pool_size=level, max_retries=args.max_retries)
+    run = uuid.uuid4().hex[:8]
+    # One message per call with --embeds codes, spread over the webhook channels
+    entries = [(f"Match {i + 1}", f"KR1-MOCK-{i:06d}") for i in range(args.embeds)]
+
+    def call(i):
+        start = time.perf_counter()
+        sent = dispatcher.send_codes(f"{webhook_base}/{i % args.webhooks}/{run}", entries)
+        return time.perf_counter() - start, sum(sent), len(sent) - sum(sent)
+
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=level) as executor:
+            for latency, ok, failed in executor.map(call, range(args.calls)):
+                latencies.append(latency)
+                codes += ok
+                errors += failed
+        elapsed = time.perf_counter() - start
+    finally:
+        dispatcher.close()
+    return summarize("webhook", level, latencies, codes, errors, elapsed)
+
+BENCHES = {"client": bench_client, "async": bench_async, "runner": bench_runner, "webhook": bench_webhook}
+
+# --- Reporting ---
+def print_table(results):
+    print(f"{'suite':<8} {'conc':>5} {'calls':>6} {'errors':>6} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'codes/s':>9}")
+    for r in results:
+        print(f"{r['suite']:<8} {r['concurrency']:>5} {r['calls']:>6} {r['errors']:>6} "
+              f"{r['p50_ms']:9.2f} {r['p95_ms']:9.2f} {r['p99_ms']:9.2f} {r['codes_per_s']:9.1f}")
+
+def compare(results, baseline, tolerance):
+    """Print regressions against a saved run. Returns True if any were found."""
+    previous = {(r["suite"], r["concurrency"]): r for r in baseline}
+    regressed = False
+    for r in results:
+        old = previous.get((r["suite"], r["concurrency"]))
+        if not old:
+            continue
+        problems = []
+        if old["p95_ms"] > 0 and r["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+            problems.append(f"p95 {old['p95_ms']:.2f} -> {r['p95_ms']:.2f} ms")
+        if r["codes_per_s"] < old["codes_per_s"] * (1 - tolerance):
+            problems.append(f"codes/s {old['codes_per_s']:.1f} -> {r['codes_per_s']:.1f}")
+        if problems:
+            regressed = True
+            print(f"REGRESSION {r['suite']} @ {r['concurrency']}: " + ", ".join(problems))
+    if not regressed:
+        print(f"No regressions beyond {tolerance:.0%} against the baseline.")
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency/throughput load test against the mock backend")
+    parser.add_argument("--suites", default=",".join(SUITES), help=f"Comma-separated subset of {SUITES}")
+    parser.add_argument("--levels", default="1,4,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--calls", type=int, default=200, help="Calls per level (client/async/webhook)")
+    parser.add_argument("--runs", type=int, default=5, help="Preset runs per level (runner)")
+    parser.add_argument("--actions", type=int, default=20, help="Actions per generated preset")
+    parser.add_argument("--groups", type=int, default=4, help="Distinct tournaments per generated preset")
+    parser.add_argument("--webhooks", type=int, default=4, help="Distinct webhook channels")
+    parser.add_argument("--embeds", type=int, default=1, help="Codes per webhook message (webhook suite)")
+    parser.add_argument("--no-batch", action="store_true", help="Runner: one /codes call per action")
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--respect-limits", action="store_true", help="Use the real Riot rate limits client-side")
+    parser.add_argument("--latency", type=float, default=0.02, help="Mock server processing time (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra server latency, up to (s)")
+    parser.add_argument("--connect-latency", type=float, default=0.0, help="Simulated handshake cost (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of Riot calls failing with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of Riot calls answered 429")
+    parser.add_argument("--retry-after", type=float, default=0.05, help="retry_after of injected 429s (s)")
+    parser.add_argument("--webhook-limit", type=int, default=0,
+                        help="Mock webhook messages per 2s window (0 = unlimited)")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the injected failures")
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against results saved with --save")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before flagging (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    suites = [s.strip() for s in args.suites.split(",") if s.strip()]
+    unknown = [s for s in suites if s not in BENCHES]
+    if unknown:
+        parser.error(f"Unknown suite(s): {', '.join(unknown)}")
+    levels = [int(level) for level in args.levels.split(",") if level.strip()]
+
+    server, base_url = start_server(latency=args.latency, jitter=args.jitter,
+                                    connect_latency=args.connect_latency,
+                                    error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+                                    retry_after=args.retry_after, webhook_limit=args.webhook_limit,
+                                    seed=args.seed)
+    webhook_base = base_url.rsplit("/", 1)[0] + "/webhooks"
+    results = []
+    try:
+        print(f"Mock backend: {base_url} (latency {args.latency * 1000:.0f} ms, "
+              f"errors {args.error_rate:.0%}, 429s {args.rate_limit_rate:.0%})")
+        for suite in suites:
+            for level in levels:
+                results.append(BENCHES[suite](args, base_url, webhook_base, level))
+        print_table(results)
+        stats = server.state.stats
+        print(f"Server: {stats['requests']} Riot calls, {stats['connections']} connections, "
+              f"{stats['errors_injected']} injected errors, {stats['rate_limited']} injected 429s, "
+              f"{stats['webhook_messages']} webhook messages ({stats['webhook_rate_limited']} rate limited)")
+    finally:
+        get_dispatcher().close()
+        server.shutdown()
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.save}")
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            if compare(results, json.load(f), args.tolerance):
+                return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Compare per-call latency of RiotTournamentClient with and without connection pooling.
+
+Runs against the local mock backend (mock_backend.py), which can add an
+artificial per-connection delay to stand in for the TCP/TLS handshake.
+
+Usage:
+    python bench_pooling.py --calls 50 --connect-latency 0.05
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from api_client import RiotTournamentClient
+from mock_backend import start_server
+
+def run_pooled(base_url, calls):
+    timings = []
+    with RiotTournamentClient(use_stub=True, base_url=base_url) as client:
+        for _ in range(calls):
+            start = time.perf_counter()
+            res = client.create_codes(1, count=1)
+            timings.append(time.perf_counter() - start)
+            assert res["success"], res
+    return timings
+
+def run_unpooled(base_url, calls):
+    # A fresh client per call means a fresh connection per call (old behaviour)
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        with RiotTournamentClient(use_stub=True, base_url=base_url) as client:
+            res = client.create_codes(1, count=1)
+        timings.append(time.perf_counter() - start)
+        assert res["success"], res
+    return timings
+
+def report(label, timings, connections):
+    print(f"{label:<10} mean {statistics.mean(timings) * 1000:8.2f} ms | "
+          f"median {statistics.median(timings) * 1000:8.2f} ms | "
+          f"total {sum(timings):6.2f} s | connections {connections}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Pooled vs. unpooled client latency benchmark")
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0, help="Mock server processing time (s)")
+    parser.add_argument("--connect-latency", type=float, default=0.03, help="Simulated handshake cost (s)")
+    args = parser.parse_args()
+
+    server, base_url = start_server(latency=args.latency, connect_latency=args.connect_latency)
+    stats = server.state.stats
+    try:
+        print(f"Mock backend: {base_url} ({args.calls} calls each)")
+
+        before = stats["connections"]
+        unpooled = run_unpooled(base_url, args.calls)
+        report("unpooled", unpooled, stats["connections"] - before)
+
+        before = stats["connections"]
+        pooled = run_pooled(base_url, args.calls)
+        report("pooled", pooled, stats["connections"] - before)
+
+        print(f"Speedup: {statistics.mean(unpooled) / statistics.mean(pooled):.2f}x")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
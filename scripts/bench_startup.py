@@ -0,0 +1,60 @@
+"""
+Startup benchmark: time to first window and time until the backend client is ready.
+
+Launches the GUI with --startup-benchmark (it records FIRST_WINDOW/CLIENT_READY
+markers to a file and closes itself) several times and reports wall-clock timings
+measured from process spawn. Works for the source tree or a built exe, so
+the --onefile and --onedir builds can be compared.
+
+Usage:
+    python bench_startup.py --runs 5
+    python bench_startup.py --exe ../dist/LOL_Tournament_Code_Creator.exe
+    python bench_startup.py --exe ../dist/LOL_Tournament_Code_Creator/LOL_Tournament_Code_Creator.exe
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+def launch_once(command, timeout):
+    with tempfile.TemporaryDirectory() as tmp:
+        marks_file = os.path.join(tmp, "marks.txt")
+        env = dict(os.environ, STARTUP_BENCHMARK_FILE=marks_file)
+        spawned = time.time()
+        proc = subprocess.Popen(command + ["--startup-benchmark"], cwd=SRC_DIR, env=env,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        try:
+            _, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            raise RuntimeError("GUI did not exit after startup")
+
+        if not os.path.exists(marks_file):
+            raise RuntimeError(f"GUI did not report startup markers: {stderr.strip()}")
+        with open(marks_file, "r", encoding="utf-8") as f:
+            # "<NAME> <epoch>" lines written by gui_main.startup_mark()
+            return {name: float(ts) - spawned for name, ts in (line.split() for line in f if line.strip())}
+
+def main():
+    parser = argparse.ArgumentParser(description="GUI startup benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--exe", help="Benchmark a built executable instead of src/gui_main.py")
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    command = [os.path.abspath(args.exe)] if args.exe else [sys.executable, "gui_main.py"]
+    runs = [launch_once(command, args.timeout) for _ in range(args.runs)]
+
+    for key in ("FIRST_WINDOW", "CLIENT_READY"):
+        values = [r[key] for r in runs if key in r]
+        if values:
+            print(f"{key:<13} median {statistics.median(values) * 1000:8.1f} ms | "
+                  f"min {min(values) * 1000:8.1f} ms | max {max(values) * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,30 @@
 import PyInstaller.__main__
+import argparse
 import os
 import customtkinter
 
+parser = argparse.ArgumentParser(description="Build the LOL Tournament Code Creator executable")
+parser.add_argument("--onedir", action="store_true",
+                    help="Build a folder instead of a single exe (no per-launch unpack to _MEIPASS, faster startup)")
+args = parser.parse_args()
+
 # Get CustomTkinter path for bundling themes/assets
 ctk_path = os.path.dirname(customtkinter.__file__)
 
 PyInstaller.__main__.run([
     '../src/gui_main.py',
     '--name=LOL_Tournament_Code_Creator',
-    '--onefile',
+    '--onedir' if args.onedir else '--onefile',
     '--noconsole',
     '--clean',
     '--distpath=../dist',
     '--workpath=../build',
+    # Modules imported lazily after the first window is drawn
+    '--hidden-import=api_client',
+    '--hidden-import=async_client',
+    '--hidden-import=preset_runner',
+    '--hidden-import=pyperclip',
+    '--hidden-import=startup_profile',
     # Include CustomTkinter assets
     f'--add-data={ctk_path}{os.path.pathsep}customtkinter',
     # Include default config and presets example
@@ -72,12 +72,18 @@ function doPost(e) {
     // 7. 결과 반환
     // Riot API가 에러를 반환하면 그대로 전달
     if (responseCode >= 400) {
+      var errorData;
       try {
-        var errorData = JSON.parse(responseText);
-        return jsonResponse(errorData);
+        errorData = JSON.parse(responseText);
       } catch(parseErr) {
-        return jsonResponse({"status": {"status_code": responseCode, "message": responseText}});
+        errorData = {"status": {"status_code": responseCode, "message": responseText}};
       }
+      // 429/503: Riot 헤더의 Retry-After를 payload로 전달 (클라이언트 백오프용)
+      if (responseCode === 429 || responseCode === 503) {
+        var headers = response.getHeaders();
+        errorData.retry_after = headers["Retry-After"] || headers["retry-after"] || null;
+      }
+      return jsonResponse(errorData);
     }
     
     // 성공 응답
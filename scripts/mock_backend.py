@@ -0,0 +1,289 @@
+"""
+Local stand-in for the GAS backend proxy.
+
+Accepts the same payload api_client.py sends to GAS
+({"method", "endpoint", "use_stub", "params", "body"}) and answers with
+tournament-stub style responses, so the client can be exercised offline.
+Latency, errors and rate limiting can be injected to test the client's
+retry path. It also serves Discord-style webhooks under /webhooks/ with
+X-RateLimit-* headers, so the webhook path can be load-tested too.
+
+Usage:
+    python mock_backend.py --port 8765 --connect-latency 0.05
+    python mock_backend.py --latency 0.2 --jitter 0.1 --error-rate 0.02 --rate-limit-rate 0.05
+"""
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RIOT_PREFIXES = ("/lol/tournament-stub/v5", "/lol/tournament/v5")
+
+# Discord-style webhook bucket: WEBHOOK_LIMIT messages per WEBHOOK_WINDOW seconds
+WEBHOOK_LIMIT = 5
+WEBHOOK_WINDOW = 2.0
+
+def riot_error(status_code, message):
+    return {"status": {"status_code": status_code, "message": message}}
+
+class MockBackendState:
+    def __init__(self, latency=0.0, connect_latency=0.0, redirect=True, jitter=0.0,
+                 error_rate=0.0, rate_limit_rate=0.0, retry_after=1.0,
+                 webhook_limit=WEBHOOK_LIMIT, webhook_window=WEBHOOK_WINDOW, seed=None):
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.redirect = redirect
+        # Extra random latency, uniform in [0, jitter]
+        self.jitter = jitter
+        # Fraction of calls answered with a Riot 500 / a forwarded Riot 429
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        # webhook_limit=0 disables webhook rate limiting
+        self.webhook_limit = webhook_limit
+        self.webhook_window = webhook_window
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1000)
+        self.pending = {}  # redirect token -> response body
+        self.webhook_buckets = {}  # webhook path -> [remaining, reset_at]
+        self.stats = {"connections": 0, "requests": 0, "errors_injected": 0, "rate_limited": 0,
+                      "codes": 0, "webhook_messages": 0, "webhook_embeds": 0, "webhook_rate_limited": 0}
+
+    def next_id(self):
+        with self.lock:
+            return next(self.ids)
+
+    def bump(self, key, amount=1):
+        with self.lock:
+            self.stats[key] += amount
+
+    def delay(self):
+        """Sleep for the configured latency plus jitter."""
+        with self.lock:
+            extra = self.random.uniform(0, self.jitter) if self.jitter else 0.0
+        if self.latency or extra:
+            time.sleep(self.latency + extra)
+
+    def roll(self, rate):
+        if not rate:
+            return False
+        with self.lock:
+            return self.random.random() < rate
+
+    def handle_payload(self, payload):
+        """
+        Build the Riot-style response for a GAS payload, enforcing the same
+        required fields the real tournament(-stub) v5 endpoints do.
+        """
+        method = str(payload.get("method", "POST")).upper()
+        endpoint = payload.get("endpoint", "")
+        params = payload.get("params") or {}
+        body = payload.get("body") or {}
+
+        if not endpoint.startswith(RIOT_PREFIXES):
+            return riot_error(404, f"Unknown endpoint {endpoint}")
+        if bool(payload.get("use_stub", True)) != endpoint.startswith(RIOT_PREFIXES[0]):
+            return riot_error(400, "use_stub does not match the endpoint")
+        if method != "POST":
+            return riot_error(405, f"Method {method} not allowed")
+
+        # Injected failures, as GAS forwards them (see gas_backend_script.js)
+        if self.roll(self.rate_limit_rate):
+            self.bump("rate_limited")
+            error = riot_error(429, "Rate limit exceeded")
+            error["retry_after"] = str(self.retry_after)
+            return error
+        if self.roll(self.error_rate):
+            self.bump("errors_injected")
+            return riot_error(500, "Internal server error (injected)")
+
+        suffix = endpoint.rsplit("/", 1)[-1]
+        if suffix == "providers":
+            if not body.get("region") or not body.get("url"):
+                return riot_error(400, "Bad request - region and url are required")
+            return self.next_id()
+        if suffix == "tournaments":
+            if not body.get("providerId"):
+                return riot_error(400, "Bad request - providerId is required")
+            return self.next_id()
+        if suffix == "codes":
+            try:
+                count = int(params.get("count", 1))
+                tid = int(params["tournamentId"])
+            except (KeyError, TypeError, ValueError):
+                return riot_error(400, "Bad request - tournamentId is required")
+            if not 1 <= count <= 1000:
+                return riot_error(400, "Bad request - count must be between 1 and 1000")
+            self.bump("codes", count)
+            return [f"KR{tid}-MOCK-{self.next_id():06d}" for _ in range(count)]
+        return riot_error(404, f"Unknown endpoint {endpoint}")
+
+    def take_webhook_slot(self, path):
+        """
+        Consume one slot of a webhook's bucket.
+        Returns (allowed, remaining, reset_after).
+        """
+        if not self.webhook_limit:
+            return True, 1, 0.0
+        now = time.monotonic()
+        with self.lock:
+            bucket = self.webhook_buckets.get(path)
+            if bucket is None or now >= bucket[1]:
+                bucket = self.webhook_buckets[path] = [self.webhook_limit, now + self.webhook_window]
+            reset_after = max(0.0, bucket[1] - now)
+            if bucket[0] <= 0:
+                return False, 0, reset_after
+            bucket[0] -= 1
+            return True, bucket[0], reset_after
+
+
+class MockBackendHandler(BaseHTTPRequestHandler):
+    # Keep-alive requires HTTP/1.1 and an explicit Content-Length
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        # Called once per TCP connection: simulates handshake cost
+        super().setup()
+        state = self.server.state
+        with state.lock:
+            state.stats["connections"] += 1
+        if state.connect_latency:
+            time.sleep(state.connect_latency)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, data, status=200, headers=None):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        state = self.server.state
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json({"error": "Invalid JSON payload"})
+            return
+
+        if self.path.startswith("/webhooks/"):
+            self._handle_webhook(payload)
+            return
+
+        state.bump("requests")
+        state.delay()
+        result = state.handle_payload(payload)
+
+        if not state.redirect:
+            self._send_json(result)
+            return
+
+        # Mimic GAS: answer with a 302 to a second URL that serves the result
+        token = str(state.next_id())
+        with state.lock:
+            state.pending[token] = result
+        self.send_response(302)
+        self.send_header("Location", f"/echo?token={token}")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _handle_webhook(self, message):
+        """Discord execute-webhook: 204 on success, 429 + retry_after when the bucket is empty."""
+        state = self.server.state
+        state.delay()
+        allowed, remaining, reset_after = state.take_webhook_slot(self.path)
+        headers = {"X-RateLimit-Limit": str(state.webhook_limit),
+                   "X-RateLimit-Remaining": str(remaining),
+                   "X-RateLimit-Reset-After": f"{reset_after:.3f}"}
+        if not allowed:
+            state.bump("webhook_rate_limited")
+            self._send_json({"message": "You are being rate limited.", "retry_after": round(reset_after, 3),
+                             "global": False}, status=429, headers=headers)
+            return
+        if not message.get("embeds") and not message.get("content"):
+            self._send_json({"message": "Cannot send an empty message", "code": 50006}, status=400)
+            return
+
+        state.bump("webhook_messages")
+        state.bump("webhook_embeds", len(message.get("embeds", [])))
+        self.send_response(204)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        state = self.server.state
+        if self.path.startswith("/echo?token="):
+            token = self.path.split("=", 1)[1]
+            with state.lock:
+                result = state.pending.pop(token, None)
+            if result is None:
+                self._send_json({"error": "Unknown redirect token"}, status=404)
+            else:
+                self._send_json(result)
+            return
+        # Same answer as the GAS doGet() health handler
+        self._send_json({"status": "ok", "message": "Mock backend is running."})
+
+
+class MockBackendServer(ThreadingHTTPServer):
+    # The default backlog of 5 drops connection bursts under load (1s SYN retry)
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def start_server(host="127.0.0.1", port=0, **options):
+    """
+    Start the mock backend in a daemon thread. Returns (server, base_url).
+    Webhook URLs are f"{base_url.rsplit('/', 1)[0]}/webhooks/<id>/<token>".
+    """
+    server = MockBackendServer((host, port), MockBackendHandler)
+    server.state = MockBackendState(**options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/exec"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the GAS/Riot backend")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument("--connect-latency", type=float, default=0.0, help="Seconds added to every new connection")
+    parser.add_argument("--no-redirect", action="store_true", help="Answer directly instead of via a 302 hop")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra latency, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls answered with a Riot 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of calls answered with a Riot 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="retry_after sent with injected 429s (s)")
+    parser.add_argument("--webhook-limit", type=int, default=WEBHOOK_LIMIT,
+                        help="Webhook messages per window (0 = unlimited)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible injection")
+    args = parser.parse_args()
+
+    server, url = start_server(args.host, args.port, latency=args.latency,
+                               connect_latency=args.connect_latency,
+                               redirect=not args.no_redirect, jitter=args.jitter,
+                               error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+                               retry_after=args.retry_after, webhook_limit=args.webhook_limit,
+                               seed=args.seed)
+    print(f"Mock backend listening on {url} (Ctrl+C to stop)")
+    print(f"Webhooks: {url.rsplit('/', 1)[0]}/webhooks/<id>/<token>")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
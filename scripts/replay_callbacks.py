@@ -0,0 +1,154 @@
+"""
+Replays Riot game-completion callbacks against the callback receiver.
+
+Payloads come from a JSONL file (one Riot callback per line) or are built
+from the newest codes in the ledger. Each payload is POSTed --repeat times
+(Riot resends, so repeats must be stored once) with --concurrency requests
+in flight; acknowledgement latency p50/p95 and the status counts are reported.
+
+--self-test starts a receiver on a temporary ledger with generated codes,
+replays against it and checks that every callback was persisted once and
+correlated with its code. Exits with status 1 if not.
+
+Usage:
+    python replay_callbacks.py --self-test --count 2000 --concurrency 50
+    python replay_callbacks.py --url http://127.0.0.1:8787/callback --from-ledger 20
+    python replay_callbacks.py --url http://127.0.0.1:8787/callback --file payloads.jsonl --repeat 3
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import zlib
+import aiohttp
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from bench_load import percentile
+from callback_server import CallbackReceiver
+from code_ledger import CodeLedger, get_ledger
+
+def sample_payload(code, region="KR", metadata="", game_id=None):
+    """A Riot-style callback for one finished game of code."""
+    return {
+        "startTime": int(time.time() * 1000),
+        "shortCode": code,
+        "metaData": metadata,
+        "gameId": game_id if game_id is not None else zlib.crc32(code.encode("utf-8")),
+        "gameName": f"e9aa4c7c-{code[-8:]}",
+        "gameType": "Practice",
+        "gameMap": 11,
+        "gameMode": "CLASSIC",
+        "region": region
+    }
+
+def payloads_from_ledger(ledger, count):
+    """Callbacks for the count most recent codes of the ledger."""
+    rows = ledger.recent(count)
+    return [sample_payload(row["code"], row["region"] or "KR", row["metadata"] or "") for row in rows]
+
+def payloads_from_file(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+async def replay(url, payloads, concurrency, repeat):
+    """POST every payload repeat times. Returns {"latencies", "statuses", "elapsed"}."""
+    latencies = []
+    statuses = {}
+    queue = asyncio.Queue()
+    for _ in range(repeat):
+        for payload in payloads:
+            queue.put_nowait(payload)
+
+    async def worker(session):
+        while not queue.empty():
+            payload = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                async with session.post(url, json=payload) as resp:
+                    await resp.read()
+                    status = resp.status
+            except aiohttp.ClientError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency)) as session:
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+    return {"latencies": latencies, "statuses": statuses, "elapsed": time.perf_counter() - start}
+
+def report(result):
+    latencies = result["latencies"]
+    rate = len(latencies) / result["elapsed"] if result["elapsed"] > 0 else 0.0
+    print(f"{len(latencies)} callbacks in {result['elapsed']:.2f}s ({rate:.0f}/s)")
+    print(f"ack p50 {percentile(latencies, 50) * 1000:.2f} ms, p95 {percentile(latencies, 95) * 1000:.2f} ms")
+    print("statuses: " + ", ".join(f"{k}={v}" for k, v in sorted(result["statuses"].items(), key=str)))
+
+async def self_test(count, concurrency, repeat):
+    tmp_dir = tempfile.mkdtemp()
+    ledger = CodeLedger(os.path.join(tmp_dir, "codes.db"))
+    codes = [f"KR0000-SELFTEST-{i:06d}" for i in range(count)]
+    for i, code in enumerate(codes):
+        ledger.record(code, provider_id=1, tournament_id=100 + i % 10, action=f"Match {i}", preset="Self Test",
+                      metadata=f"Self Test/Match {i}", region="KR")
+    ledger.flush()
+
+    correlated = set()
+    receiver = CallbackReceiver(ledger, host="127.0.0.1", port=0, queue_size=max(count * repeat, 1),
+                                on_result=lambda event: event["action"] and correlated.add(event["code"]))
+    port = await receiver.start()
+    payloads = [sample_payload(code, metadata=f"Self Test/Match {i}") for i, code in enumerate(codes)]
+    result = await replay(f"http://127.0.0.1:{port}{receiver.path}", payloads, concurrency, repeat)
+    await receiver.stop()
+    report(result)
+
+    stored = ledger.callback_count()
+    ledger.close()
+    failures = []
+    if result["statuses"].get(200, 0) != count * repeat:
+        failures.append(f"expected {count * repeat} acknowledgements, got {result['statuses']}")
+    if stored != count:
+        failures.append(f"expected {count} stored callbacks, got {stored}")
+    if len(correlated) != count:
+        failures.append(f"expected {count} correlated codes, got {len(correlated)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print(f"OK: {stored} callbacks stored once and correlated ({receiver.stats['duplicates']} resends ignored)")
+    return not failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay Riot tournament callbacks against the receiver")
+    parser.add_argument("--url", help="Receiver URL, e.g. http://127.0.0.1:8787/callback")
+    parser.add_argument("--file", help="JSONL file of callback payloads")
+    parser.add_argument("--from-ledger", type=int, default=0, metavar="N",
+                        help="Build payloads for the N newest codes in the ledger")
+    parser.add_argument("--self-test", action="store_true", help="Replay against an in-process receiver and verify")
+    parser.add_argument("--count", type=int, default=1000, help="Codes generated for --self-test")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=2, help="Times each payload is sent")
+    args = parser.parse_args()
+
+    if args.self_test:
+        ok = asyncio.run(self_test(args.count, args.concurrency, args.repeat))
+        sys.exit(0 if ok else 1)
+
+    if not args.url or not (args.file or args.from_ledger):
+        parser.error("--url with --file or --from-ledger is required (or use --self-test)")
+    if args.file:
+        payloads = payloads_from_file(args.file)
+    else:
+        ledger = get_ledger()
+        payloads = payloads_from_ledger(ledger, args.from_ledger)
+        ledger.close()
+    if not payloads:
+        print("No payloads to replay.")
+        return
+    report(asyncio.run(replay(args.url, payloads, args.concurrency, args.repeat)))
+
+if __name__ == "__main__":
+    main()
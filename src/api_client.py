@@ -1,22 +1,65 @@
+import json
+import time
 import requests
+from requests.adapters import HTTPAdapter
 import urllib.parse
+from rate_limiter import RateLimiter, backoff_delay, throttle_delay
+from transports import GasTransport, DEFAULT_GAS_URL
+from metrics import get_metrics, mode_label
+from idempotency import SingleFlight
+from circuit_breaker import breaker_for
+
+DEFAULT_BASE_URL = DEFAULT_GAS_URL
+DEFAULT_POOL_SIZE = 10
+DEFAULT_MAX_RETRIES = 3
+REQUEST_TIMEOUT = 30
+HEALTH_TIMEOUT = 5
+
+def normalize_response(res_data):
+    """Convert a decoded GAS/Riot response into the {"success", "data"/"error"} contract."""
+    # Check if GAS returned an error from Riot
+    if isinstance(res_data, dict):
+        # Riot API error response
+        if "status" in res_data and isinstance(res_data["status"], dict):
+            status_code = res_data["status"].get("status_code", 0)
+            if status_code >= 400:
+                return {"success": False, "error": f"Riot API Error {status_code}: {res_data['status'].get('message', 'Unknown')}"}
+        # GAS error response
+        if "error" in res_data:
+            return {"success": False, "error": res_data["error"]}
+        # Success with custom structure
+        if "success" in res_data:
+            return res_data
+
+    # Direct success (number or list returned by Riot)
+    return {"success": True, "data": res_data}
+
+def response_status(http_status, res_data):
+    """Status to report for a call: the Riot status forwarded in the payload, else the HTTP status."""
+    if isinstance(res_data, dict) and isinstance(res_data.get("status"), dict):
+        return res_data["status"].get("status_code", http_status)
+    return http_status
+
+
+class BaseTournamentClient:
+    """
+    Endpoint helpers shared by the blocking and async clients.
+    Subclasses implement _request(); for the async client it returns a
+    coroutine, so the create_* methods below become awaitable.
+    """
+    use_stub = True
+    # Optional IdempotencyStore: successful keyed calls are answered from it on retry
+    idempotency = None
+    # Optional second route, used while the primary transport's breaker is open
+    fallback = None
 
-class RiotTournamentClient:
-    def __init__(self, use_stub=True):
-        self.use_stub = use_stub
-        # Use Google Apps Script (GAS) backend to protect Production Key
-        self.base_url = "https://script.google.com/macros/s/AKfycbz53p_hNUxB_EP8VaGaEZzpSzhXgiZ3ceMPDz5jdixqjLtEgrkpMqtB31Do-DXpFmMXug/exec"
-        
     def _build_riot_path(self, endpoint_suffix):
         """Build full Riot API path based on stub/production mode."""
         base = "/lol/tournament-stub/v5" if self.use_stub else "/lol/tournament/v5"
         return base + endpoint_suffix
 
-    def _request(self, method, endpoint_suffix, params=None, json_data=None):
-        """
-        Route requests through GAS backend.
-        GAS script will receive this payload and forward to Riot API.
-        """
+    def _build_payload(self, method, endpoint_suffix, params=None, json_data=None):
+        """Build the payload the GAS backend forwards to Riot API."""
         # Build the full Riot API endpoint path
         riot_endpoint = self._build_riot_path(endpoint_suffix)
         
@@ -30,35 +73,84 @@ class RiotTournamentClient:
             payload["params"] = params
         if json_data:
             payload["body"] = json_data
+        return payload
 
-        try:
-            response = requests.post(self.base_url, json=payload, timeout=30)
-            response.raise_for_status()
-            res_data = response.json()
-            
-            # Check if GAS returned an error from Riot
-            if isinstance(res_data, dict):
-                # Riot API error response
-                if "status" in res_data and isinstance(res_data["status"], dict):
-                    status_code = res_data["status"].get("status_code", 0)
-                    if status_code >= 400:
-                        return {"success": False, "error": f"Riot API Error {status_code}: {res_data['status'].get('message', 'Unknown')}"}
-                # GAS error response
-                if "error" in res_data:
-                    return {"success": False, "error": res_data["error"]}
-                # Success with custom structure
-                if "success" in res_data:
-                    return res_data
-            
-            # Direct success (number or list returned by Riot)
-            return {"success": True, "data": res_data}
-            
-        except requests.exceptions.Timeout:
-            return {"success": False, "error": "Backend timeout (30s). Please try again."}
-        except requests.exceptions.HTTPError as e:
-            return {"success": False, "error": f"Backend HTTP Error: {e}"}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+    def _request(self, method, endpoint_suffix, params=None, json_data=None, idempotency_key=None):
+        raise NotImplementedError
+
+    def _flight_key(self, payload, idempotency_key):
+        """
+        Key under which identical concurrent calls share one request, or None.
+        Two identical unkeyed /codes calls are two requests for codes, so
+        only keyed /codes calls are ever shared.
+        """
+        if idempotency_key:
+            return self._stored_key(idempotency_key)
+        if payload["endpoint"].endswith("/codes"):
+            return None
+        return json.dumps(payload, sort_keys=True)
+
+    def _stored_key(self, idempotency_key):
+        # Stub and production results must never answer for each other
+        return f"{mode_label(self.use_stub)}:{idempotency_key}"
+
+    def _remembered(self, endpoint_suffix, idempotency_key):
+        """The persisted result of an earlier identical call, if any."""
+        if not (idempotency_key and self.idempotency):
+            return None
+        result = self.idempotency.get(self._stored_key(idempotency_key))
+        if result is not None:
+            self._record_dedup(endpoint_suffix, "idempotency_key")
+        return result
+
+    def _remember(self, idempotency_key, result):
+        if idempotency_key and self.idempotency:
+            self.idempotency.put(self._stored_key(idempotency_key), result)
+
+    def _record_dedup(self, endpoint_suffix, reason):
+        get_metrics().inc("deduplicated_calls_total", {"leg": self.transport.name, "endpoint": endpoint_suffix,
+                                                       "mode": mode_label(self.use_stub), "reason": reason})
+
+    def _pick_transport(self):
+        """The first route whose circuit breaker lets a call through, or None."""
+        for transport in (self.transport, self.fallback):
+            if transport is not None and breaker_for(transport).allow():
+                return transport
+        return None
+
+    def _unavailable_result(self):
+        breaker = breaker_for(self.transport)
+        reason = f" ({breaker.last_error})" if breaker.last_error else ""
+        return {"success": False, "error": f"{self.transport.label} unavailable after repeated failures{reason}. "
+                                           f"Next attempt in {breaker.retry_in():.0f}s."}
+
+    def _record_outcome(self, transport, status, latency, result):
+        """Feed one attempt to the route's breaker. Riot 4xx answers mean the backend is up."""
+        failed = not isinstance(status, int) or status >= 500
+        breaker_for(transport).record(failed, latency, None if not failed else result.get("error"))
+
+    def _health_result(self, transport, status, latency, error=None):
+        """Record a health check and build its {"success", "data"/"error"} result."""
+        healthy = error is None and isinstance(status, int) and status < 500
+        breaker = breaker_for(transport)
+        breaker.record_health(healthy, error or f"HTTP {status}")
+        get_metrics().record_call(transport.name, "/health", mode_label(self.use_stub), status, latency)
+        if not healthy:
+            return {"success": False, "error": f"{transport.label} health check failed: {error or f'HTTP {status}'}"}
+        return {"success": True, "data": {"transport": transport.describe(), "status": status,
+                                          "latency_ms": round(latency * 1000), "circuit": breaker.state}}
+
+    def circuit_state(self):
+        """State of the primary route's breaker ("closed", "open" or "half_open")."""
+        return breaker_for(self.transport).state
+
+    def _throttled_result(self, http_status):
+        return {"success": False, "error": f"{self.transport.label} HTTP Error: {http_status} (rate limited)"}
+
+    def _record_call(self, endpoint_suffix, status, started, retries, payload, transport=None):
+        """Feed one finished call (all attempts) into the metrics registry."""
+        get_metrics().record_call((transport or self.transport).name, endpoint_suffix, mode_label(self.use_stub),
+                                  status, time.perf_counter() - started, retries, len(json.dumps(payload)))
 
     def create_provider(self, region="KR", url="http://example.com/callback"):
         data = {
@@ -67,16 +159,16 @@ class RiotTournamentClient:
         }
         return self._request("POST", "/providers", json_data=data)
 
-    def create_tournament(self, provider_id, name="My Tournament"):
+    def create_tournament(self, provider_id, name="My Tournament", idempotency_key=None):
         data = {
             "name": name,
             "providerId": provider_id
         }
-        return self._request("POST", "/tournaments", json_data=data)
+        return self._request("POST", "/tournaments", json_data=data, idempotency_key=idempotency_key)
 
     def create_codes(self, tournament_id, count=1, map_type="SUMMONERS_RIFT", 
                      pick_type="TOURNAMENT_DRAFT", spectator_type="ALL", 
-                     team_size=5, metadata=""):
+                     team_size=5, metadata="", idempotency_key=None):
         params = {
             "count": count,
             "tournamentId": tournament_id
@@ -88,4 +180,154 @@ class RiotTournamentClient:
             "teamSize": team_size,
             "metadata": metadata
         }
-        return self._request("POST", "/codes", params=params, json_data=data)
+        return self._request("POST", "/codes", params=params, json_data=data, idempotency_key=idempotency_key)
+
+
+class RiotTournamentClient(BaseTournamentClient):
+    def __init__(self, use_stub=True, pool_size=DEFAULT_POOL_SIZE, base_url=None,
+                 rate_limiter=None, max_retries=DEFAULT_MAX_RETRIES, transport=None, idempotency=None,
+                 fallback=None):
+        self.use_stub = use_stub
+        # Default: Google Apps Script (GAS) backend to protect Production Key.
+        # See transports.create_transport for the direct and relay routes.
+        self.transport = transport or GasTransport(base_url)
+        self.fallback = fallback
+        self.pool_size = pool_size
+        self.session = self._create_session(pool_size)
+        # Share one limiter between clients that use the same API key
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.max_retries = max_retries
+        self.idempotency = idempotency
+        self.inflight = SingleFlight()
+
+    def _create_session(self, pool_size):
+        """
+        Create a keep-alive session shared by every call of this client.
+        GAS answers each POST with a 302 to googleusercontent, so both hosts
+        get their own pool and the redirect hop reuses its connection too.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def close(self):
+        """Release pooled connections. Safe to call more than once."""
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _request(self, method, endpoint_suffix, params=None, json_data=None, idempotency_key=None):
+        """
+        Route requests through the transport (GAS backend by default).
+        GAS script will receive this payload and forward to Riot API.
+        Identical concurrent calls share one request, and a call whose
+        idempotency_key already succeeded returns the stored result.
+        """
+        payload = self._build_payload(method, endpoint_suffix, params, json_data)
+        remembered = self._remembered(endpoint_suffix, idempotency_key)
+        if remembered is not None:
+            return remembered
+
+        def call():
+            result = self._call(endpoint_suffix, payload)
+            self._remember(idempotency_key, result)
+            return result
+
+        flight_key = self._flight_key(payload, idempotency_key)
+        if flight_key is None:
+            return call()
+        result, shared = self.inflight.do(flight_key, call)
+        if shared:
+            self._record_dedup(endpoint_suffix, "inflight")
+        return result
+
+    def _call(self, endpoint_suffix, payload):
+        """
+        Send one logical call: waits on the endpoint's rate limiter before
+        each attempt and retries 429/503 answers with backoff, up to
+        max_retries times. While the backend's circuit breaker is open the
+        call goes to the fallback route, or fails at once without one.
+        """
+        started = time.perf_counter()
+
+        attempt = 0
+        while True:
+            if self.session is None:
+                return {"success": False, "error": "Client is closed."}
+
+            transport = self._pick_transport()
+            if transport is None:
+                self._record_call(endpoint_suffix, "circuit_open", started, attempt, payload)
+                return self._unavailable_result()
+            self.rate_limiter.acquire(endpoint_suffix)
+            sent = time.perf_counter()
+            result, retry_after, status = self._send(payload, transport)
+            self._record_outcome(transport, status, time.perf_counter() - sent, result)
+            if retry_after is None:
+                self._record_call(endpoint_suffix, status, started, attempt, payload, transport)
+                return result
+
+            self.rate_limiter.record_rate_limited(endpoint_suffix)
+            if attempt >= self.max_retries:
+                self._record_call(endpoint_suffix, status, started, attempt, payload, transport)
+                return result
+            attempt += 1
+            self.rate_limiter.record_retry(endpoint_suffix)
+            time.sleep(backoff_delay(attempt, retry_after))
+
+    def _send(self, payload, transport):
+        """
+        Perform one backend call over transport.
+        Returns (result, retry_after, status) where retry_after is None unless
+        the call was rate limited and status is what metrics record for it.
+        """
+        label = transport.label
+        try:
+            request = transport.build(payload)
+            response = self.session.request(request["method"], request["url"], params=request["params"],
+                                            json=request["json"], headers=request["headers"],
+                                            timeout=REQUEST_TIMEOUT)
+            if response.status_code in (429, 503):
+                # The backend (or Riot, on the direct route) is throttling us
+                retry_after = throttle_delay(response.status_code, response.headers, None)
+                return self._throttled_result(response.status_code), retry_after, response.status_code
+            if not transport.riot_errors_in_body:
+                response.raise_for_status()
+            res_data = transport.decode(response.status_code, response.content)
+            # A Riot 429 forwarded inside the GAS payload
+            return (normalize_response(res_data), throttle_delay(response.status_code, response.headers, res_data),
+                    response_status(response.status_code, res_data))
+        except requests.exceptions.Timeout:
+            return {"success": False, "error": f"{label} timeout ({REQUEST_TIMEOUT}s). Please try again."}, None, "timeout"
+        except requests.exceptions.HTTPError as e:
+            return {"success": False, "error": f"{label} HTTP Error: {e}"}, None, e.response.status_code
+        except Exception as e:
+            return {"success": False, "error": str(e)}, None, "error"
+
+    def check_health(self, timeout=HEALTH_TIMEOUT):
+        """
+        Lightweight reachability check of the primary route (GAS doGet, relay
+        GET). The answer is fed to the route's circuit breaker, so a healthy
+        backend lets the next call probe without waiting out the open period.
+        """
+        if self.session is None:
+            return {"success": False, "error": "Client is closed."}
+        started = time.perf_counter()
+        try:
+            request = self.transport.health_request()
+            response = self.session.request(request["method"], request["url"], headers=request["headers"],
+                                            timeout=timeout)
+            return self._health_result(self.transport, response.status_code, time.perf_counter() - started)
+        except requests.exceptions.Timeout:
+            return self._health_result(self.transport, "timeout", time.perf_counter() - started,
+                                       f"timeout ({timeout}s)")
+        except Exception as e:
+            return self._health_result(self.transport, "error", time.perf_counter() - started, str(e))
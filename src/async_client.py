@@ -0,0 +1,179 @@
+import asyncio
+import threading
+import time
+import aiohttp
+from api_client import (BaseTournamentClient, DEFAULT_MAX_RETRIES, REQUEST_TIMEOUT, HEALTH_TIMEOUT,
+                        normalize_response, response_status)
+from rate_limiter import RateLimiter, backoff_delay, throttle_delay
+from transports import GasTransport
+from idempotency import AsyncSingleFlight
+from circuit_breaker import breaker_for
+
+DEFAULT_MAX_IN_FLIGHT = 100
+
+class AsyncRiotTournamentClient(BaseTournamentClient):
+    """
+    Awaitable variant of RiotTournamentClient.
+    Same create_provider/create_tournament/create_codes surface and the same
+    {"success", "data"/"error"} results, but every call is a coroutine so one
+    event loop can keep many requests in flight without a thread per call.
+    """
+    def __init__(self, use_stub=True, max_in_flight=DEFAULT_MAX_IN_FLIGHT, base_url=None,
+                 rate_limiter=None, max_retries=DEFAULT_MAX_RETRIES, transport=None, idempotency=None,
+                 fallback=None):
+        self.use_stub = use_stub
+        self.transport = transport or GasTransport(base_url)
+        self.fallback = fallback
+        self.max_in_flight = max_in_flight
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.max_retries = max_retries
+        self.idempotency = idempotency
+        self.inflight = AsyncSingleFlight()
+        # aiohttp sessions must be created inside the loop that uses them
+        self._session = None
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            # The connector limit bounds concurrent connections; extra calls queue
+            connector = aiohttp.TCPConnector(limit=self.max_in_flight)
+            timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._session
+
+    async def aclose(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def _request(self, method, endpoint_suffix, params=None, json_data=None, idempotency_key=None):
+        """Route requests through the transport (see RiotTournamentClient._request)."""
+        payload = self._build_payload(method, endpoint_suffix, params, json_data)
+        remembered = self._remembered(endpoint_suffix, idempotency_key)
+        if remembered is not None:
+            return remembered
+
+        async def call():
+            result = await self._call(endpoint_suffix, payload)
+            if idempotency_key and self.idempotency:
+                # fsync off the loop thread
+                await asyncio.to_thread(self._remember, idempotency_key, result)
+            return result
+
+        flight_key = self._flight_key(payload, idempotency_key)
+        if flight_key is None:
+            return await call()
+        result, shared = await self.inflight.do(flight_key, call)
+        if shared:
+            self._record_dedup(endpoint_suffix, "inflight")
+        return result
+
+    async def _call(self, endpoint_suffix, payload):
+        """
+        Send one logical call with rate limiting, 429/503 retries and the
+        circuit breaker (see RiotTournamentClient._call).
+        """
+        started = time.perf_counter()
+
+        attempt = 0
+        while True:
+            transport = self._pick_transport()
+            if transport is None:
+                self._record_call(endpoint_suffix, "circuit_open", started, attempt, payload)
+                return self._unavailable_result()
+            try:
+                wait = self.rate_limiter.reserve(endpoint_suffix)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                sent = time.perf_counter()
+                result, retry_after, status = await self._send(payload, transport)
+            except asyncio.CancelledError:
+                # Do not leave a half-open breaker waiting on a probe that never reports
+                breaker_for(transport).abandon()
+                raise
+            self._record_outcome(transport, status, time.perf_counter() - sent, result)
+            if retry_after is None:
+                self._record_call(endpoint_suffix, status, started, attempt, payload, transport)
+                return result
+
+            self.rate_limiter.record_rate_limited(endpoint_suffix)
+            if attempt >= self.max_retries:
+                self._record_call(endpoint_suffix, status, started, attempt, payload, transport)
+                return result
+            attempt += 1
+            self.rate_limiter.record_retry(endpoint_suffix)
+            await asyncio.sleep(backoff_delay(attempt, retry_after))
+
+    async def _send(self, payload, transport):
+        """Perform one backend call. Returns (result, retry_after, status) like RiotTournamentClient._send."""
+        label = transport.label
+        try:
+            request = transport.build(payload)
+            session = self._get_session()
+            async with session.request(request["method"], request["url"], params=request["params"],
+                                       json=request["json"], headers=request["headers"]) as response:
+                if response.status in (429, 503):
+                    retry_after = throttle_delay(response.status, response.headers, None)
+                    return self._throttled_result(response.status), retry_after, response.status
+                if not transport.riot_errors_in_body:
+                    response.raise_for_status()
+                # GAS serves JSON from googleusercontent with a text/* content type, so decode the raw body
+                res_data = transport.decode(response.status, await response.read())
+                return (normalize_response(res_data), throttle_delay(response.status, response.headers, res_data),
+                        response_status(response.status, res_data))
+        except asyncio.TimeoutError:
+            return {"success": False, "error": f"{label} timeout ({REQUEST_TIMEOUT}s). Please try again."}, None, "timeout"
+        except aiohttp.ClientResponseError as e:
+            return {"success": False, "error": f"{label} HTTP Error: {e.status} {e.message}"}, None, e.status
+        except Exception as e:
+            return {"success": False, "error": str(e)}, None, "error"
+
+    async def check_health(self, timeout=HEALTH_TIMEOUT):
+        """Reachability check of the primary route (see RiotTournamentClient.check_health)."""
+        started = time.perf_counter()
+        try:
+            request = self.transport.health_request()
+            session = self._get_session()
+            async with session.request(request["method"], request["url"], headers=request["headers"],
+                                       timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                await response.read()
+                return self._health_result(self.transport, response.status, time.perf_counter() - started)
+        except asyncio.TimeoutError:
+            return self._health_result(self.transport, "timeout", time.perf_counter() - started,
+                                       f"timeout ({timeout}s)")
+        except Exception as e:
+            return self._health_result(self.transport, "error", time.perf_counter() - started, str(e))
+
+
+class EventLoopThread:
+    """
+    One asyncio event loop running in a daemon thread.
+    The GUI and the CLI tools submit coroutines to it instead of starting a
+    new OS thread per button press.
+    """
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """Schedule a coroutine on the loop. Returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the loop and block the calling thread for its result."""
+        return self.submit(coro).result(timeout)
+
+    def stop(self):
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout=5)
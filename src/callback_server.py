@@ -0,0 +1,196 @@
+import argparse
+import asyncio
+import json
+import time
+from aiohttp import web
+import config_manager
+from code_ledger import get_ledger
+from metrics import get_metrics
+
+DEFAULT_HOST = "127.0.0.1"  # Loopback only; exposing the receiver takes an explicit host
+DEFAULT_PORT = 8787
+DEFAULT_PATH = "/callback"
+QUEUE_SIZE = 1000  # Callbacks accepted but not yet persisted
+BATCH_SIZE = 100
+FLUSH_INTERVAL = 1.0  # Longest a callback waits for its batch to fill
+MAX_BODY = 64 * 1024
+
+def parse_callback(data):
+    """
+    Ledger row for one Riot game-completion callback, e.g.
+    {"shortCode": "KR1234-...", "metaData": "...", "gameId": 123, "region": "KR", "startTime": 1700000000000, ...}.
+    Raises ValueError if it carries no tournament code.
+    """
+    if not isinstance(data, dict) or not data.get("shortCode"):
+        raise ValueError("callback without shortCode")
+    return {
+        "code": data["shortCode"],
+        "game_id": data.get("gameId"),
+        "region": data.get("region"),
+        "metadata": data.get("metaData"),
+        "start_time": data.get("startTime"),
+        "received_at": time.time(),
+        "payload": json.dumps(data, ensure_ascii=False)
+    }
+
+
+class CallbackReceiver:
+    """
+    HTTP endpoint for the callback URL registered with tournament providers.
+
+    Riot POSTs one JSON document per finished game. The handler only parses
+    it and puts it on a bounded queue, so the POST is acknowledged at once;
+    a consumer task persists queued callbacks to the code ledger in batches
+    and correlates each with the code (and action) it was minted for.
+    When the queue is full the POST is refused with 503 so the sender
+    retries later instead of the receiver growing without bound.
+
+    on_result(event) is called for every persisted callback with the
+    callback row plus "action", "preset" and "tournament_id" from the ledger
+    (None when the code is not in the ledger). It runs on the loop thread.
+    """
+    def __init__(self, ledger=None, host=DEFAULT_HOST, port=DEFAULT_PORT, path=DEFAULT_PATH,
+                 queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL, on_result=None):
+        self.ledger = ledger or get_ledger()
+        self.host = host
+        self.port = port
+        self.path = path
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_result = on_result
+        self.queue = None  # Created in start(), on the serving loop
+        self.stats = {"received": 0, "rejected": 0, "invalid": 0, "persisted": 0, "duplicates": 0,
+                      "uncorrelated": 0}
+        self._runner = None
+        self._consumer = None
+
+    async def start(self):
+        """Start serving on the running loop. Returns the bound port."""
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        app = web.Application(client_max_size=MAX_BODY)
+        app.router.add_post(self.path, self._handle)
+        app.router.add_get("/health", self._health)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # Port 0 binds a free port; report the real one
+        self.port = self._runner.addresses[0][1]
+        self._consumer = asyncio.create_task(self._consume())
+        return self.port
+
+    async def stop(self):
+        """Stop accepting callbacks and persist everything already acknowledged."""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+        if self._consumer:
+            # Let the consumer finish its batch and the backlog; cancelling mid-write would drop events
+            await self.queue.join()
+            self._consumer.cancel()
+            try:
+                await self._consumer
+            except asyncio.CancelledError:
+                pass
+            self._consumer = None
+
+    # --- HTTP ---
+    async def _handle(self, request):
+        try:
+            row = parse_callback(json.loads(await request.read()))
+        except ValueError as e:
+            self._count("invalid")
+            return web.json_response({"error": str(e)}, status=400)
+        try:
+            self.queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self._count("rejected")
+            return web.json_response({"error": "busy"}, status=503, headers={"Retry-After": "5"})
+        self._count("received")
+        return web.json_response({"status": "ok"})
+
+    async def _health(self, request):
+        return web.json_response(dict(self.stats, queued=self.queue.qsize()))
+
+    def _count(self, key, amount=1):
+        self.stats[key] += amount
+        get_metrics().inc("callbacks_total", {"result": key}, amount)
+
+    # --- Persistence ---
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.flush_interval
+            # Let the batch fill up for a moment instead of writing one row per transaction
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    await asyncio.sleep(min(0.05, remaining))
+            try:
+                await self._persist(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def _persist(self, batch):
+        try:
+            # SQLite work stays off the loop thread, so acknowledgements never wait on disk
+            stored = await asyncio.to_thread(self.ledger.add_callbacks, batch)
+            codes = await asyncio.to_thread(self.ledger.find_many, {row["code"] for row in batch})
+        except Exception as e:
+            print(f"Error persisting callbacks: {e}")
+            return
+        self._count("persisted", stored)
+        self._count("duplicates", len(batch) - stored)
+        for row in batch:
+            minted = codes.get(row["code"])
+            if minted is None:
+                self._count("uncorrelated")
+            if self.on_result:
+                event = dict(row, action=minted and minted["action"], preset=minted and minted["preset"],
+                             tournament_id=minted and minted["tournament_id"])
+                try:
+                    self.on_result(event)
+                except Exception as e:
+                    print(f"Callback result handler failed: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Receive Riot tournament callbacks into the code ledger")
+    parser.add_argument("--host", default=None,
+                        help="Interface to listen on (default: config callback_host, else 127.0.0.1; "
+                             "0.0.0.0 exposes the receiver to the network)")
+    parser.add_argument("--port", type=int, default=None, help="Default: config callback_port")
+    parser.add_argument("--path", default=DEFAULT_PATH)
+    args = parser.parse_args()
+    config = config_manager.load_config()
+    host = args.host or config.get("callback_host") or DEFAULT_HOST
+
+    def show(event):
+        match = f"{event['preset']} / {event['action']}" if event["action"] else "(unknown code)"
+        print(json.dumps({"code": event["code"], "match": match, "game_id": event["game_id"]}, ensure_ascii=False))
+
+    async def serve():
+        receiver = CallbackReceiver(host=host, port=args.port or config.get("callback_port", DEFAULT_PORT),
+                                    path=args.path, on_result=show)
+        port = await receiver.start()
+        print(f"Listening on http://{host}:{port}{args.path}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await receiver.stop()
+            receiver.ledger.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
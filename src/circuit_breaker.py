@@ -0,0 +1,155 @@
+import collections
+import threading
+import time
+
+# Breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+DEFAULT_SETTINGS = {
+    "window": 20,  # Most recent calls the rates are computed over
+    "min_calls": 5,  # Calls needed in the window before the breaker may open
+    "failure_rate": 0.5,  # Open when this fraction of the window failed...
+    "slow_call_s": 10.0,  # ...or when calls slower than this (s)...
+    "slow_rate": 0.8,  # ...make up this fraction of the window
+    "open_s": 30.0  # Fail fast this long before letting a probe call through
+}
+
+class CircuitBreaker:
+    """
+    Fails backend calls fast once the backend is known to be bad.
+
+    CLOSED: calls go through and their outcome (failed? slow?) is kept for
+    the last `window` calls. Too many failures or slow calls open the breaker.
+    OPEN: allow() refuses every call for open_s seconds.
+    HALF_OPEN: a single probe call is let through; its outcome closes the
+    breaker again or re-opens it for another open_s seconds. A successful
+    health check while OPEN skips the rest of the wait.
+    """
+    def __init__(self, name, window=20, min_calls=5, failure_rate=0.5, slow_call_s=10.0, slow_rate=0.8,
+                 open_s=30.0):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_s = slow_call_s
+        self.slow_rate = slow_rate
+        self.open_s = open_s
+        self.lock = threading.Lock()
+        self.calls = collections.deque(maxlen=window)  # (failed, slow)
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probing = False
+        self.last_error = None
+
+    def allow(self):
+        """True if a call may be sent now. In HALF_OPEN only one probe is let through."""
+        with self.lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.open_s:
+                    return False
+                self.state = HALF_OPEN
+                self.probing = False
+            if self.state == HALF_OPEN:
+                if self.probing:
+                    return False
+                self.probing = True
+            return True
+
+    def record(self, failed, latency, error=None):
+        """Feed the outcome of one call that allow() let through."""
+        slow = latency >= self.slow_call_s
+        with self.lock:
+            if failed:
+                self.last_error = error
+            if self.state == HALF_OPEN:
+                self.probing = False
+                if failed or slow:
+                    self._open()
+                else:
+                    self.state = CLOSED
+                    self.calls.clear()
+                return
+            if self.state == OPEN:
+                # A call that was already in flight when the breaker opened
+                return
+            self._add(failed, slow)
+
+    def abandon(self):
+        """A call let through by allow() ended without an outcome (e.g. it was cancelled)."""
+        with self.lock:
+            self.probing = False
+
+    def record_health(self, healthy, error=None):
+        """
+        Outcome of a health check: a healthy answer lets the next call probe
+        right away; a failed one counts like a failed call (one slow cold
+        start alone does not open the breaker).
+        """
+        with self.lock:
+            if healthy:
+                if self.state == OPEN:
+                    self.state = HALF_OPEN
+                    self.probing = False
+            else:
+                self.last_error = error
+                if self.state == CLOSED:
+                    self._add(True, False)
+
+    def retry_in(self):
+        """Seconds until an OPEN breaker lets a probe through (0 otherwise)."""
+        with self.lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.open_s - (time.monotonic() - self.opened_at))
+
+    def snapshot(self):
+        with self.lock:
+            return {"name": self.name, "state": self.state, "window_calls": len(self.calls),
+                    "failures": sum(1 for f, _ in self.calls if f),
+                    "slow_calls": sum(1 for _, s in self.calls if s), "last_error": self.last_error}
+
+    def _add(self, failed, slow):
+        self.calls.append((failed, slow))
+        if len(self.calls) < self.min_calls:
+            return
+        failures = sum(1 for f, _ in self.calls if f)
+        slow_calls = sum(1 for _, s in self.calls if s)
+        if failures >= self.failure_rate * len(self.calls) or slow_calls >= self.slow_rate * len(self.calls):
+            self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.probing = False
+        self.calls.clear()
+
+
+_settings = dict(DEFAULT_SETTINGS)
+_breakers = {}  # (transport name, URL or host) -> CircuitBreaker
+_lock = threading.Lock()
+
+def breaker_for(transport):
+    """
+    Process-wide breaker for a backend route, so every client talking to the
+    same backend (sync, async, CLI workers) shares one view of its health.
+    """
+    key = (transport.name, getattr(transport, "url", None) or getattr(transport, "host", None))
+    with _lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker(transport.describe(), **_settings)
+        return breaker
+
+def configure(config):
+    """Apply the "circuit_breaker" config overrides. Existing breakers start over."""
+    overrides = config.get("circuit_breaker") or {}
+    with _lock:
+        _settings.clear()
+        _settings.update(DEFAULT_SETTINGS)
+        _settings.update({k: v for k, v in overrides.items() if k in DEFAULT_SETTINGS})
+        _breakers.clear()
+
+def snapshots():
+    with _lock:
+        return [breaker.snapshot() for breaker in _breakers.values()]
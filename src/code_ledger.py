@@ -0,0 +1,249 @@
+import csv
+import json
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import config_manager
+
+LEDGER_DB = "codes.db"  # In the app-data dir
+
+FLUSH_INTERVAL = 0.5  # Seconds between background batch writes
+BATCH_SIZE = 200  # Pending rows that trigger an early write
+EXPORT_CHUNK = 500
+
+# Where a code came from
+SOURCE_LIVE = "live"
+SOURCE_POOL = "pool"
+SOURCE_MANUAL = "manual"
+
+COLUMNS = ["code", "provider_id", "tournament_id", "region", "mode", "preset", "action", "metadata", "settings",
+           "source", "run_id", "created_at", "delivered_at"]
+CALLBACK_COLUMNS = ["code", "game_id", "region", "metadata", "start_time", "received_at", "payload"]
+
+class CodeLedger:
+    """
+    SQLite record of every tournament code handed out: provider, tournament,
+    action, settings, the metadata string sent to Riot and timestamps.
+    record()/mark_delivered() only queue the row; a background thread
+    writes queued rows in one transaction every FLUSH_INTERVAL (or once
+    BATCH_SIZE rows are waiting), so minting never waits on the disk.
+    Lookups write pending rows first, so they always see every code.
+    """
+    def __init__(self, path=None, flush_interval=FLUSH_INTERVAL, batch_size=BATCH_SIZE):
+        self.path = path or config_manager.app_data_path(LEDGER_DB)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        # WAL: exports read a snapshot while the writer keeps appending
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS codes ("
+                          "code TEXT PRIMARY KEY, provider_id INTEGER, tournament_id INTEGER, region TEXT, "
+                          "mode TEXT, preset TEXT, action TEXT, metadata TEXT, settings TEXT, source TEXT, "
+                          "run_id TEXT, created_at REAL NOT NULL, delivered_at REAL)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS codes_tournament ON codes (tournament_id)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS codes_metadata ON codes (metadata)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS codes_action ON codes (action)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS codes_created ON codes (created_at)")
+        # Game-completion callbacks from Riot; a resent callback is stored once
+        self.conn.execute("CREATE TABLE IF NOT EXISTS callbacks ("
+                          "id INTEGER PRIMARY KEY, code TEXT, game_id INTEGER, region TEXT, metadata TEXT, "
+                          "start_time INTEGER, received_at REAL NOT NULL, payload TEXT NOT NULL, "
+                          "UNIQUE (code, game_id))")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS callbacks_code ON callbacks (code)")
+        self.conn.commit()
+
+        self.pending = queue.SimpleQueue()  # ("insert" | "delivered", params)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # --- Writes (queued) ---
+    def record(self, code, provider_id=None, tournament_id=None, action="", preset="", metadata="",
+               settings=None, region=None, use_stub=True, source=SOURCE_LIVE, run_id=None):
+        """Queue one handed-out code. A code already in the ledger keeps its first row."""
+        self.pending.put(("insert", (code, provider_id, tournament_id, region, "stub" if use_stub else "prod",
+                                     preset, action, metadata, json.dumps(settings or {}, sort_keys=True),
+                                     source, run_id, time.time())))
+        if self.pending.qsize() >= self.batch_size:
+            self._wake.set()
+
+    def mark_delivered(self, code):
+        """Queue the delivery time of a code (its webhook was sent)."""
+        self.pending.put(("delivered", (time.time(), code)))
+
+    def flush(self):
+        """Write every queued row now. Returns the number of rows written."""
+        with self.lock:
+            # Drained under the lock, so two flushes never reorder an insert and its update
+            batch = []
+            while True:
+                try:
+                    batch.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return 0
+            try:
+                with self.conn:
+                    # Consecutive ops of one kind go in one executemany, keeping insert-before-update order
+                    start = 0
+                    for i in range(1, len(batch) + 1):
+                        if i == len(batch) or batch[i][0] != batch[start][0]:
+                            self._execute(batch[start][0], [params for _, params in batch[start:i]])
+                            start = i
+            except Exception as e:
+                print(f"Error writing code ledger: {e}", file=sys.stderr)
+                return 0
+        return len(batch)
+
+    def _execute(self, op, rows):
+        if op == "insert":
+            self.conn.executemany(f"INSERT OR IGNORE INTO codes ({', '.join(COLUMNS[:-1])}) "
+                                  f"VALUES ({', '.join('?' * (len(COLUMNS) - 1))})", rows)
+        else:
+            self.conn.executemany("UPDATE codes SET delivered_at = ? WHERE code = ? AND delivered_at IS NULL", rows)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        """Write what is queued and stop the writer thread."""
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+        with self.lock:
+            self.conn.close()
+
+    # --- Lookups ---
+    def _query(self, where, params):
+        self.flush()
+        with self.lock:
+            cursor = self.conn.execute(f"SELECT {', '.join(COLUMNS)} FROM codes WHERE {where} ORDER BY created_at",
+                                       params)
+            return [_row_dict(row) for row in cursor.fetchall()]
+
+    def find(self, code):
+        """The ledger row of one code, or None."""
+        rows = self._query("code = ?", (code.strip(),))
+        return rows[0] if rows else None
+
+    def by_tournament(self, tournament_id):
+        return self._query("tournament_id = ?", (int(tournament_id),))
+
+    def by_metadata(self, metadata):
+        return self._query("metadata = ?", (metadata,))
+
+    def lookup(self, query):
+        """Rows matching a code, a tournament ID, a metadata string or an action name (exact)."""
+        query = query.strip()
+        row = self.find(query)
+        if row:
+            return [row]
+        if query.isdigit():
+            return self.by_tournament(query)
+        return self._query("metadata = ? OR action = ?", (query, query))
+
+    def recent(self, limit):
+        """The limit most recently handed-out codes, oldest first."""
+        self.flush()
+        with self.lock:
+            cursor = self.conn.execute(f"SELECT {', '.join(COLUMNS)} FROM codes ORDER BY created_at DESC LIMIT ?",
+                                       (int(limit),))
+            return [_row_dict(row) for row in reversed(cursor.fetchall())]
+
+    def find_many(self, codes):
+        """{code: ledger row} for the codes that are in the ledger."""
+        codes = list(codes)
+        if not codes:
+            return {}
+        rows = self._query(f"code IN ({', '.join('?' * len(codes))})", codes)
+        return {row["code"]: row for row in rows}
+
+    # --- Callbacks ---
+    def add_callbacks(self, callbacks):
+        """
+        Store a batch of callback rows (dicts with CALLBACK_COLUMNS keys) in
+        one transaction. Returns how many were new.
+        """
+        rows = [tuple(c.get(col) for col in CALLBACK_COLUMNS) for c in callbacks]
+        with self.lock:
+            with self.conn:
+                before = self.conn.total_changes
+                self.conn.executemany(f"INSERT OR IGNORE INTO callbacks ({', '.join(CALLBACK_COLUMNS)}) "
+                                      f"VALUES ({', '.join('?' * len(CALLBACK_COLUMNS))})", rows)
+                return self.conn.total_changes - before
+
+    def callbacks_for(self, code):
+        """Callbacks received for a code, oldest first (payloads decoded)."""
+        with self.lock:
+            cursor = self.conn.execute(f"SELECT {', '.join(CALLBACK_COLUMNS)} FROM callbacks WHERE code = ? "
+                                       "ORDER BY received_at", (code,))
+            rows = [dict(zip(CALLBACK_COLUMNS, row)) for row in cursor.fetchall()]
+        for row in rows:
+            row["payload"] = json.loads(row["payload"])
+        return rows
+
+    def callback_count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM callbacks").fetchone()[0]
+
+    # --- Export ---
+    def export(self, path, fmt=None):
+        """
+        Stream every row to path as CSV or JSONL (by fmt, else by extension),
+        oldest first, without loading the table into memory. Returns the row count.
+        """
+        self.flush()
+        fmt = fmt or ("csv" if path.lower().endswith(".csv") else "jsonl")
+        # A separate connection reads a consistent snapshot while the writer carries on
+        reader = sqlite3.connect(self.path)
+        count = 0
+        try:
+            cursor = reader.execute(f"SELECT {', '.join(COLUMNS)} FROM codes ORDER BY created_at")
+            with open(path, "w", encoding="utf-8-sig" if fmt == "csv" else "utf-8", newline="") as f:
+                writer = csv.writer(f) if fmt == "csv" else None
+                if writer:
+                    writer.writerow(COLUMNS)
+                while True:
+                    rows = cursor.fetchmany(EXPORT_CHUNK)
+                    if not rows:
+                        break
+                    for row in rows:
+                        if writer:
+                            writer.writerow(row)
+                        else:
+                            f.write(json.dumps(_row_dict(row), ensure_ascii=False) + "\n")
+                    count += len(rows)
+        finally:
+            reader.close()
+        return count
+
+
+def _row_dict(row):
+    record = dict(zip(COLUMNS, row))
+    try:
+        record["settings"] = json.loads(record["settings"] or "{}")
+    except ValueError:
+        pass
+    return record
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+def get_ledger():
+    """Process-wide code ledger."""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = CodeLedger()
+        return _ledger
@@ -0,0 +1,148 @@
+import json
+import os
+import sys
+import threading
+import time
+import config_manager
+
+POOL_FILE = "code_pool.json"  # In the app-data dir
+
+DEFAULT_LOW_WATERMARK = 2
+DEFAULT_HIGH_WATERMARK = 10
+DEFAULT_REFILL_INTERVAL = 30  # Seconds between background checks
+DEFAULT_MAX_AGE = 7 * 24 * 60 * 60  # Unused codes older than this are discarded
+POOL_TOURNAMENT_NAME = "Code Pool"
+
+class CodePool:
+    """
+    Pre-minted tournament codes keyed by game settings (map, pick type,
+    team size, spectator), persisted to disk with their creation time.
+    A background worker tops each watched key back up to the high watermark
+    whenever it drops below the low watermark, so take() rarely has to wait
+    for a live GAS -> Riot round trip.
+    """
+    def __init__(self, client, provider_id, path=None,
+                 low=DEFAULT_LOW_WATERMARK, high=DEFAULT_HIGH_WATERMARK,
+                 interval=DEFAULT_REFILL_INTERVAL, max_age=DEFAULT_MAX_AGE):
+        self.client = client
+        self.provider_id = provider_id
+        self.path = path or config_manager.app_data_path(POOL_FILE)
+        self.low = low
+        self.high = max(high, low)
+        self.interval = interval
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.codes = {}  # key -> [{"code", "tournament_id", "created_at"}]
+        self.tournaments = {}  # key -> tournament ID the pool mints under
+        self.watched = {}  # key -> settings kept warm by the worker
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._load()
+
+    def key(self, settings):
+        # Codes only work for the provider and mode they were minted under
+        mode = "stub" if self.client.use_stub else "prod"
+        parts = [settings["map_type"], settings["pick_type"], settings["team_size"], settings["spectator_type"]]
+        return "|".join(str(p) for p in [self.provider_id, mode] + parts)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.codes = data.get("codes", {})
+            self.tournaments = data.get("tournaments", {})
+        except Exception as e:
+            print(f"Error loading code pool: {e}", file=sys.stderr)
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"codes": self.codes, "tournaments": self.tournaments}, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error saving code pool: {e}", file=sys.stderr)
+
+    def watch(self, settings):
+        """Keep a settings combination warm."""
+        key = self.key(settings)
+        with self.lock:
+            self.watched[key] = dict(settings)
+        self._wake.set()
+
+    def size(self, settings):
+        with self.lock:
+            return len(self.codes.get(self.key(settings), []))
+
+    def take(self, settings):
+        """Pop the oldest fresh code for these settings, or None if the pool is empty."""
+        key = self.key(settings)
+        now = time.time()
+        with self.lock:
+            self.watched.setdefault(key, dict(settings))
+            entries = [e for e in self.codes.get(key, []) if now - e["created_at"] <= self.max_age]
+            entry = entries.pop(0) if entries else None
+            self.codes[key] = entries
+            if entry:
+                self._save()
+            remaining = len(entries)
+        if remaining < self.low:
+            self._wake.set()
+        return entry["code"] if entry else None
+
+    def refill(self):
+        """Top up every watched key that is below the low watermark. Returns codes minted."""
+        with self.lock:
+            targets = [(k, s, len(self.codes.get(k, []))) for k, s in self.watched.items()]
+
+        minted = 0
+        for key, settings, count in targets:
+            if count >= self.low or self._stop.is_set():
+                continue
+            minted += self._mint(key, settings, self.high - count)
+        return minted
+
+    def _mint(self, key, settings, count):
+        tid = self.tournaments.get(key)
+        if tid is None:
+            t_res = self.client.create_tournament(self.provider_id, POOL_TOURNAMENT_NAME)
+            if not t_res["success"]:
+                print(f"[POOL] 토너먼트 생성 실패: {t_res['error']}", file=sys.stderr)
+                return 0
+            tid = t_res["data"]
+
+        c_res = self.client.create_codes(tid, count=count, **settings)
+        if not c_res["success"]:
+            print(f"[POOL] 코드 생성 실패: {c_res['error']}", file=sys.stderr)
+            return 0
+
+        now = time.time()
+        with self.lock:
+            self.tournaments[key] = tid
+            self.codes.setdefault(key, []).extend(
+                {"code": code, "tournament_id": tid, "created_at": now} for code in c_res["data"])
+            self._save()
+        return len(c_res["data"])
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _worker(self):
+        while not self._stop.is_set():
+            try:
+                self.refill()
+            except Exception as e:
+                print(f"[POOL] Refill error: {e}", file=sys.stderr)
+            self._wake.wait(self.interval)
+            self._wake.clear()
@@ -1,55 +1,213 @@
+import atexit
+import copy
 import json
 import os
-from dotenv import load_dotenv
+import sys
+import threading
+
+_app_data_dir = None
 
 def get_app_data_dir():
-    """Get or create the storage directory in AppData."""
+    """Get or create the storage directory in AppData (checked once per process)."""
+    global _app_data_dir
+    if _app_data_dir is not None:
+        return _app_data_dir
+    
     app_data = os.environ.get('APPDATA')
     if not app_data:
         # Fallback for non-windows or weird env
         app_data = os.path.expanduser("~")
     
     path = os.path.join(app_data, "LOL_Tournament_Code_Creator")
-    if not os.path.exists(path):
-        os.makedirs(path)
+    os.makedirs(path, exist_ok=True)
+    _app_data_dir = path
     return path
 
-CONFIG_FILE = os.path.join(get_app_data_dir(), "config.json")
-ENV_FILE = os.path.join(get_app_data_dir(), ".env")
+def app_data_path(name):
+    """Path of a file in the app-data dir. Resolved on use, so importing a module touches no disk."""
+    return os.path.join(get_app_data_dir(), name)
+
+CONFIG_FILE = "config.json"
+ENV_FILE = ".env"  # Read lazily with python-dotenv when needed
 
 DEFAULT_CONFIG = {
-    "provider_id": None,
+    "provider_id": None,  # Default provider (configured region, manual tab and code pool)
+    "providers": None,  # [{"id", "region", "stub"}] registry; None = migrate provider_id on first use
+    "providers_per_region": 1,  # Providers to shard preset actions across in each region
+    "callback_url": None,  # Public URL of the callback receiver registered with new providers
+    "callback_server": False,  # Run the callback receiver inside the GUI
+    "callback_port": 8787,  # Local port of the callback receiver
+    "callback_host": "127.0.0.1",  # Interface it listens on; "0.0.0.0" exposes it to the network
     "last_tournament_id": None,
     "region": "KR",
     "theme": "Dark",
-    "use_stub": True  # Default to Stub API for safety
+    "use_stub": True,  # Default to Stub API for safety
+    "pool_size": 10,  # Max keep-alive connections per backend host
+    "max_concurrency": 4,  # Preset actions in flight at once
+    "job_workers": 1,  # Queued preset runs executed at the same time
+    "batch_codes": True,  # One /codes call per same-format tournament group
+    "max_retries": 3,  # Retries for rate-limited (429/503) backend calls
+    "rate_limits": {},  # Per-endpoint overrides, e.g. {"/codes": [[20, 1], [1000, 600]]}
+    "tournament_cache_ttl": 43200,  # Seconds before a cached tournament ID is re-created
+    "code_pool_enabled": False,  # Keep pre-minted codes warm in the background
+    "code_pool_low": 2,  # Refill a settings combination below this many codes
+    "code_pool_high": 10,  # ...up to this many
+    "transport": "gas",  # "gas" (default proxy), "direct" (own key in .env) or "relay" (self-hosted proxy)
+    "gas_url": None,  # None = the bundled GAS deployment
+    "relay_url": None,  # Self-hosted relay speaking the GAS payload contract
+    "fallback_transport": None,  # Route used while the primary one is failing, e.g. "relay"
+    "circuit_breaker": {},  # Overrides, e.g. {"failure_rate": 0.5, "slow_call_s": 10, "open_s": 30}
+    "riot_api_host": "americas.api.riotgames.com",  # Routing host for the direct transport
+    "metrics_export": True,  # Write metrics.prom/metrics.json after each preset run and on exit
+    "trace_log": False  # Append one JSON line per backend/webhook call to trace.jsonl
 }
 
+SAVE_DEBOUNCE = 0.5  # Seconds to coalesce rapid saves into one write
+
+def _read_config_file(path):
+    """Read config.json and fill in missing keys from the defaults."""
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    # Ensure all keys exist
+    for key, value in DEFAULT_CONFIG.items():
+        if key not in config:
+            config[key] = copy.deepcopy(value)
+    return config
+
+class ConfigStore:
+    """
+    Process-wide, thread-safe view of config.json.
+    The file is parsed once and re-read only when its mtime changes (e.g.
+    edited by hand or by another process). Saves are debounced and written
+    atomically (temp file + rename), so concurrent worker threads can
+    update single keys without clobbering each other.
+    """
+    def __init__(self, path, debounce=SAVE_DEBOUNCE):
+        self.path = path
+        self.debounce = debounce
+        self.lock = threading.RLock()
+        self._config = None
+        self._mtime = None
+        self._dirty = False
+        self._timer = None
+
+    def _file_mtime(self):
+        # Size too, since coarse mtime resolution can hide a quick second edit
+        try:
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _ensure_loaded(self):
+        mtime = self._file_mtime()
+        # Pending in-memory changes win over the file until they are flushed
+        if self._config is not None and (self._dirty or mtime == self._mtime):
+            return
+        if mtime is None:
+            self._config = copy.deepcopy(DEFAULT_CONFIG)
+            self._write()
+            return
+        try:
+            self._config = _read_config_file(self.path)
+        except Exception as e:
+            print(f"Error loading config: {e}", file=sys.stderr)
+            if self._config is None:
+                self._config = copy.deepcopy(DEFAULT_CONFIG)
+        self._mtime = mtime
+
+    def get(self):
+        """Return a copy of the current configuration."""
+        with self.lock:
+            self._ensure_loaded()
+            return copy.deepcopy(self._config)
+
+    def update(self, **changes):
+        """Change individual keys and schedule a save. Returns the new configuration."""
+        with self.lock:
+            self._ensure_loaded()
+            self._config.update(copy.deepcopy(changes))
+            self._schedule_write()
+            return copy.deepcopy(self._config)
+
+    def replace(self, config):
+        with self.lock:
+            self._config = copy.deepcopy(config)
+            self._schedule_write()
+
+    def _schedule_write(self):
+        self._dirty = True
+        if self._timer is None:
+            self._timer = threading.Timer(self.debounce, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Write pending changes now."""
+        with self.lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._dirty:
+                self._write()
+
+    def _write(self):
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._config, f, indent=4, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._mtime = self._file_mtime()
+            self._dirty = False
+        except Exception as e:
+            print(f"Error saving config: {e}", file=sys.stderr)
+
+_store = None
+_store_lock = threading.Lock()
+
+def _get_store():
+    """Process-wide ConfigStore, created on first access."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ConfigStore(app_data_path(CONFIG_FILE))
+        return _store
+
 def load_config():
-    """Load configuration from config.json, falling back to defaults."""
-    if not os.path.exists(CONFIG_FILE):
-        save_config(DEFAULT_CONFIG)
-        return DEFAULT_CONFIG
-    
-    try:
-        with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-            config = json.load(f)
-            # Ensure all keys exist
-            for key, value in DEFAULT_CONFIG.items():
-                if key not in config:
-                    config[key] = value
-            return config
-    except Exception as e:
-        print(f"Error loading config: {e}")
-        return DEFAULT_CONFIG
+    """Load configuration (cached; re-read only when config.json changes on disk)."""
+    return _get_store().get()
 
 def save_config(config):
-    """Save configuration to config.json."""
-    try:
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            json.dump(config, f, indent=4, ensure_ascii=False)
-    except Exception as e:
-        print(f"Error saving config: {e}")
-
-# API Key related functions removed for security compliance.
-# All API requests are now routed through a secure backend (GAS).
+    """Save configuration to config.json (debounced, atomic)."""
+    _get_store().replace(config)
+
+def update_config(**changes):
+    """Update individual keys without a load/modify/save race. Returns the new configuration."""
+    return _get_store().update(**changes)
+
+def flush_config():
+    """Write any pending configuration changes immediately."""
+    if _store is not None:
+        _store.flush()
+
+atexit.register(flush_config)
+
+_env_loaded = False
+
+def get_env_value(name):
+    """
+    Read a secret from the environment or the .env file in the app-data dir.
+    Secrets are never stored in config.json; by default all API requests are
+    routed through a secure backend (GAS) and need no key at all.
+    """
+    global _env_loaded
+    if not _env_loaded:
+        _env_loaded = True
+        env_file = app_data_path(ENV_FILE)
+        if os.path.exists(env_file):
+            try:
+                from dotenv import load_dotenv
+                load_dotenv(env_file, override=False)
+            except Exception as e:
+                print(f"Error loading .env: {e}", file=sys.stderr)
+    return os.environ.get(name)
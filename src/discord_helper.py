@@ -1,41 +1,177 @@
 import requests
+from requests.adapters import HTTPAdapter
 import json
+import sys
+import threading
+import time
+from metrics import get_metrics
 
-def send_discord_webhook(webhook_url, tournament_name, code):
-    """
-    생성된 토너먼트 코드를 디스코드 웹훅으로 전송합니다.
-    """
-    if not webhook_url:
-        print("오류: 웹훅 URL이 제공되지 않았습니다.")
-        return False
+MAX_EMBEDS_PER_MESSAGE = 10  # Discord limit per webhook message
+DEFAULT_POOL_SIZE = 10
+DEFAULT_MAX_RETRIES = 3
+REQUEST_TIMEOUT = 10
 
-    message = {
-        "content": f"**🏆 {tournament_name}**\n토너먼트 코드가 생성되었습니다!",
-        "embeds": [
+def build_embed(code, title="롤 토너먼트 생성 완료"):
+    return {
+        "title": title,
+        "description": f"```{code}```\n(롤 클라이언트 -> 플레이 -> 트로피 아이콘 🏆 -> 코드 입력)",
+        "color": 3447003, # Blue
+        "fields": [
             {
-                "title": "롤 토너먼트 생성 완료",
-                "description": f"```{code}```\n(롤 클라이언트 -> 플레이 -> 트로피 아이콘 🏆 -> 코드 입력)",
-                "color": 3447003, # Blue
-                "fields": [
-                    {
-                        "name": "맵",
-                        "value": "소환사의 협곡",
-                        "inline": True
-                    },
-                    {
-                        "name": "모드",
-                        "value": "토너먼트 드래프트",
-                        "inline": True
-                    }
-                ]
+                "name": "맵",
+                "value": "소환사의 협곡",
+                "inline": True
+            },
+            {
+                "name": "모드",
+                "value": "토너먼트 드래프트",
+                "inline": True
             }
         ]
     }
 
-    try:
-        response = requests.post(webhook_url, json=message)
-        response.raise_for_status()
-        return True
-    except Exception as e:
-        print(f"웹훅 전송 실패: {e}")
-        return False
+def build_message(entries):
+    """
+    Build one webhook message for up to 10 (tournament_name, code) entries.
+    A single entry keeps the original one-code layout.
+    """
+    if len(entries) == 1:
+        tournament_name, code = entries[0]
+        return {
+            "content": f"**🏆 {tournament_name}**\n토너먼트 코드가 생성되었습니다!",
+            "embeds": [build_embed(code)]
+        }
+    return {
+        "content": f"**🏆 토너먼트 코드 {len(entries)}개가 생성되었습니다!**",
+        "embeds": [build_embed(code, title=f"🏆 {name}") for name, code in entries]
+    }
+
+
+class WebhookDispatcher:
+    """
+    Sends webhook messages over a shared connection pool.
+    Keeps one rate-limit bucket per webhook URL from Discord's X-RateLimit-*
+    headers, waits when a bucket is exhausted, and retries 429s up to
+    max_retries times using the advertised retry_after.
+    """
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, max_retries=DEFAULT_MAX_RETRIES):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.max_retries = max_retries
+        self.lock = threading.Lock()
+        self.buckets = {}  # webhook_url -> {"remaining", "reset_at", "lock"}
+
+    def _bucket(self, webhook_url):
+        with self.lock:
+            if webhook_url not in self.buckets:
+                self.buckets[webhook_url] = {"remaining": None, "reset_at": 0.0, "lock": threading.Lock()}
+            return self.buckets[webhook_url]
+
+    def _update_bucket(self, bucket, headers):
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset_after = headers.get("X-RateLimit-Reset-After")
+        try:
+            if remaining is not None:
+                bucket["remaining"] = int(remaining)
+            if reset_after is not None:
+                bucket["reset_at"] = time.monotonic() + float(reset_after)
+        except ValueError:
+            pass
+
+    def _retry_after(self, response):
+        try:
+            return float(response.json().get("retry_after", 1.0))
+        except Exception:
+            try:
+                return float(response.headers.get("Retry-After", 1.0))
+            except ValueError:
+                return 1.0
+
+    def send(self, webhook_url, message):
+        """Post one message. Returns True on success."""
+        if not webhook_url:
+            print("오류: 웹훅 URL이 제공되지 않았습니다.", file=sys.stderr)
+            return False
+
+        started = time.perf_counter()
+        ok, status, retries = self._send(webhook_url, message)
+        # The URL carries the webhook token, so it is never used as a label
+        get_metrics().record_call("discord", "/webhooks", "-", status, time.perf_counter() - started,
+                                  retries, len(json.dumps(message)))
+        return ok
+
+    def _send(self, webhook_url, message):
+        """Returns (ok, final status, retries)."""
+        bucket = self._bucket(webhook_url)
+        status = "error"
+        # Serialize sends per webhook so the bucket state stays accurate
+        with bucket["lock"]:
+            for attempt in range(self.max_retries + 1):
+                if bucket["remaining"] == 0:
+                    wait = bucket["reset_at"] - time.monotonic()
+                    if wait > 0:
+                        time.sleep(wait)
+
+                try:
+                    response = self.session.post(webhook_url, json=message, timeout=REQUEST_TIMEOUT)
+                except requests.exceptions.Timeout as e:
+                    print(f"웹훅 전송 실패: {e}", file=sys.stderr)
+                    return False, "timeout", attempt
+                except Exception as e:
+                    print(f"웹훅 전송 실패: {e}", file=sys.stderr)
+                    return False, "error", attempt
+
+                status = response.status_code
+                self._update_bucket(bucket, response.headers)
+                if response.status_code == 429:
+                    retry_after = self._retry_after(response)
+                    print(f"웹훅 속도 제한 (429): {retry_after}s 후 재시도 ({attempt + 1}/{self.max_retries})", file=sys.stderr)
+                    if attempt < self.max_retries:
+                        time.sleep(retry_after)
+                    continue
+
+                try:
+                    response.raise_for_status()
+                    return True, status, attempt
+                except Exception as e:
+                    print(f"웹훅 전송 실패: {e}", file=sys.stderr)
+                    return False, status, attempt
+
+        print("웹훅 전송 실패: 재시도 횟수 초과", file=sys.stderr)
+        return False, status, self.max_retries
+
+    def send_codes(self, webhook_url, entries):
+        """
+        Coalesce (tournament_name, code) entries bound for one webhook into
+        as few messages as possible (10 embeds each).
+        Returns a list of booleans, one per entry.
+        """
+        results = []
+        for start in range(0, len(entries), MAX_EMBEDS_PER_MESSAGE):
+            chunk = entries[start:start + MAX_EMBEDS_PER_MESSAGE]
+            ok = self.send(webhook_url, build_message(chunk))
+            results.extend([ok] * len(chunk))
+        return results
+
+    def close(self):
+        self.session.close()
+
+
+_default_dispatcher = None
+_default_lock = threading.Lock()
+
+def get_dispatcher():
+    """Process-wide dispatcher shared by every webhook call."""
+    global _default_dispatcher
+    with _default_lock:
+        if _default_dispatcher is None:
+            _default_dispatcher = WebhookDispatcher()
+        return _default_dispatcher
+
+def send_discord_webhook(webhook_url, tournament_name, code):
+    """
+    생성된 토너먼트 코드를 디스코드 웹훅으로 전송합니다.
+    """
+    return get_dispatcher().send(webhook_url, build_message([(tournament_name, code)]))
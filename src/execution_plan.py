@@ -0,0 +1,214 @@
+import json
+import math
+import os
+import sys
+import config_manager
+from discord_helper import MAX_EMBEDS_PER_MESSAGE
+from metrics import get_metrics, METRICS_JSON_FILE
+
+WEBHOOK_ENDPOINT = "/webhooks"
+PLAN_ENDPOINTS = ["/providers", "/tournaments", "/codes", WEBHOOK_ENDPOINT]
+
+# Per-call latency (s) assumed for endpoints never called yet: a warm GAS round trip / one Discord post
+DEFAULT_LATENCIES = {"/providers": 1.5, "/tournaments": 1.5, "/codes": 1.5, WEBHOOK_ENDPOINT: 0.3}
+
+# Where a latency figure came from
+LATENCY_LIVE = "live"  # This session's calls
+LATENCY_SAVED = "saved"  # metrics.json of an earlier session
+LATENCY_DEFAULT = "default"
+
+def _mean_latencies(snapshot, mode):
+    """{endpoint: (mean seconds, calls)} from a metrics snapshot, for one stub/prod mode."""
+    totals = {}
+    for series in snapshot.get("histograms", {}).get("call_latency_seconds", []):
+        labels = series.get("labels", {})
+        if labels.get("mode") not in (mode, "-") or not series.get("count"):
+            continue
+        total = totals.setdefault(labels.get("endpoint"), [0.0, 0])
+        total[0] += series["sum"]
+        total[1] += series["count"]
+    return {endpoint: (s / n, n) for endpoint, (s, n) in totals.items()}
+
+def recorded_latencies(mode):
+    """
+    Mean latency per endpoint, from this session's calls if there were any,
+    else from the metrics.json an earlier session exported, else DEFAULT_LATENCIES.
+    Returns {endpoint: {"seconds", "calls", "source"}}.
+    """
+    live = _mean_latencies(get_metrics().snapshot(), mode)
+    saved = {}
+    metrics_file = config_manager.app_data_path(METRICS_JSON_FILE)
+    if os.path.exists(metrics_file):
+        try:
+            with open(metrics_file, "r", encoding="utf-8") as f:
+                saved = _mean_latencies(json.load(f), mode)
+        except Exception as e:
+            print(f"Error reading saved metrics: {e}", file=sys.stderr)
+    result = {}
+    for endpoint in PLAN_ENDPOINTS:
+        for source, values in ((LATENCY_LIVE, live), (LATENCY_SAVED, saved)):
+            if endpoint in values:
+                seconds, calls = values[endpoint]
+                result[endpoint] = {"seconds": seconds, "calls": calls, "source": source}
+                break
+        else:
+            result[endpoint] = {"seconds": DEFAULT_LATENCIES[endpoint], "calls": 0, "source": LATENCY_DEFAULT}
+    return result
+
+def _spread(costs, workers):
+    """Wall time of independent calls on `workers` threads: ideal packing, never below the longest one."""
+    if not costs:
+        return 0.0
+    return max(sum(costs) / workers, max(costs))
+
+def _throttle_floor(calls, windows):
+    """Shortest time `calls` requests can take under rate windows [(requests, seconds)], bursts included."""
+    return max([(calls - rate) * per / rate for rate, per in windows if calls > rate] or [0.0])
+
+
+class ExecutionPlan:
+    """
+    A preset compiled into the calls its run will make, built by
+    PresetRunner.plan() and executed as-is by PresetRunner.run(plan=...),
+    so a preview shows exactly what runs.
+
+    groups: tournament groups in run order. Each one is one count=N /codes
+    call for its "pending" actions, in a tournament that is created unless
+    "tournament_known" (cached, or created by the run being resumed).
+    Groups with the same tournament (same region and name, different game
+    settings) share one creation: concurrent calls are coalesced and later
+    ones hit the tournament cache.
+    deliveries: [{"url", "indices"}] webhook sends, one per URL in batch
+    mode and one per group otherwise; actions in "delivered" (resumed runs)
+    are not sent again.
+    provider_creations: {region: providers created before minting}.
+    Codes the pre-minted pool can serve skip /codes at run time, so the
+    estimate is an upper bound when a pool is running.
+    """
+    def __init__(self, preset, groups, deliveries, batch=True, max_workers=4, provider_creations=None,
+                 delivered=None, resume_run=None, use_stub=True, limits=None):
+        self.preset = preset
+        self.actions = preset.get("actions", [])
+        self.label = preset.get("label", "")
+        self.groups = groups
+        self.deliveries = deliveries
+        self.batch = batch
+        self.max_workers = max(1, int(max_workers))
+        self.provider_creations = provider_creations or {}
+        self.delivered = set(delivered or ())
+        self.resume_run = resume_run
+        self.use_stub = use_stub
+        self.limits = limits or {}
+
+    def webhook_messages(self, delivery):
+        """Discord messages one delivery posts (MAX_EMBEDS_PER_MESSAGE codes each)."""
+        if not delivery["url"]:
+            return 0
+        pending = sum(1 for i in delivery["indices"] if i not in self.delivered)
+        return math.ceil(pending / MAX_EMBEDS_PER_MESSAGE)
+
+    def creates_tournament(self):
+        """Groups whose tournament the run creates: the first minting group of every unknown tournament."""
+        seen = set()
+        creating = []
+        for group in self.groups:
+            key = (group["region"], group["tournament_name"])
+            if group["pending"] and not group["tournament_known"] and key not in seen:
+                seen.add(key)
+                creating.append(group)
+        return creating
+
+    def calls(self):
+        """Backend and webhook calls the run will make, per endpoint."""
+        minting = [g for g in self.groups if g["pending"]]
+        return {
+            "/providers": sum(self.provider_creations.values()),
+            "/tournaments": len(self.creates_tournament()),
+            "/codes": len(minting),
+            WEBHOOK_ENDPOINT: sum(self.webhook_messages(d) for d in self.deliveries)
+        }
+
+    def estimate(self, latencies=None):
+        """
+        Expected wall time from per-endpoint latencies (default: recorded_latencies()).
+        Models the run: providers are created one at a time, each shard mints
+        max_workers groups at once, webhooks go out on the whole pool, and no
+        endpoint can beat its rate limit.
+        """
+        latencies = latencies or recorded_latencies("stub" if self.use_stub else "prod")
+        seconds = {endpoint: latencies[endpoint]["seconds"] for endpoint in PLAN_ENDPOINTS}
+        calls = self.calls()
+        providers_s = calls["/providers"] * seconds["/providers"]
+
+        creating = {id(g) for g in self.creates_tournament()}
+
+        def mint_cost(group):
+            if not group["pending"]:
+                return 0.0
+            return (seconds["/tournaments"] if id(group) in creating else 0.0) + seconds["/codes"]
+
+        webhook_costs = [self.webhook_messages(d) * seconds[WEBHOOK_ENDPOINT] for d in self.deliveries]
+        costs_by_shard = {}
+        for i, group in enumerate(self.groups):
+            cost = mint_cost(group)
+            if not self.batch:
+                # One task per action: mint, then deliver right away (deliveries line up with groups)
+                cost += webhook_costs[i]
+            costs_by_shard.setdefault(group.get("provider_id"), []).append(cost)
+        minting_s = max([_spread(costs, self.max_workers) for costs in costs_by_shard.values()] or [0.0])
+        threads = self.max_workers * max(1, len(costs_by_shard))
+        webhooks_s = _spread([c for c in webhook_costs if c], threads) if self.batch else 0.0
+        throttle_s = max([_throttle_floor(calls[endpoint], windows) for endpoint, windows in self.limits.items()
+                          if endpoint in calls] or [0.0])
+        return {
+            "calls": calls,
+            "total_calls": sum(calls.values()),
+            "providers_s": providers_s,
+            "minting_s": minting_s,
+            "webhooks_s": webhooks_s,
+            "throttle_s": throttle_s,
+            "wall_s": providers_s + max(minting_s, throttle_s) + webhooks_s,
+            "latencies": latencies
+        }
+
+    def summary(self, latencies=None):
+        """JSON-serializable overview of the plan and its estimate."""
+        estimate = self.estimate(latencies)
+        return dict(estimate, label=self.label, actions=len(self.actions), groups=len(self.groups),
+                    batch=self.batch, shards=len({g.get("provider_id") for g in self.groups}),
+                    provider_creations=dict(self.provider_creations),
+                    tournaments_reused=len({(g["region"], g["tournament_name"]) for g in self.groups
+                                            if g["pending"] and g["tournament_known"]}),
+                    already_done=len(self.delivered), resume_run=self.resume_run,
+                    webhook_destinations=len({d["url"] for d in self.deliveries if self.webhook_messages(d)}))
+
+    def describe(self, latencies=None):
+        """Human-readable plan, one line per entry (for the CLI dry run)."""
+        s = self.summary(latencies)
+        lines = [f"Plan: {s['label']} - {s['actions']} matches, {s['groups']} tournament groups, "
+                 f"{s['shards']} shard(s), {'batched' if s['batch'] else 'one code per call'}"]
+        if s["resume_run"]:
+            lines.append(f"  Resumes run {s['resume_run'][:8]}: {s['already_done']} matches already delivered")
+        for region, count in sorted(s["provider_creations"].items()):
+            lines.append(f"  Creates {count} provider(s) in {region}")
+        creating = {id(g) for g in self.creates_tournament()}
+        for group in self.groups:
+            if not group["pending"]:
+                continue
+            tournament = "new" if id(group) in creating else "reused"
+            provider = group.get("provider_id") or "(assigned at run)"
+            lines.append(f"  [{group['region']}] {group['tournament_name']} ({tournament} tournament, provider "
+                         f"{provider}): /codes count={len(group['pending'])} {group['settings']['map_type']}/"
+                         f"{group['settings']['pick_type']}/{group['settings']['team_size']}v"
+                         f"{group['settings']['team_size']}")
+        lines.append(f"  Webhooks: {s['calls'][WEBHOOK_ENDPOINT]} message(s) to {s['webhook_destinations']} "
+                     f"destination(s)")
+        lines.append("  Calls: " + ", ".join(f"{endpoint} {count}" for endpoint, count in s["calls"].items())
+                     + f" (total {s['total_calls']})")
+        lines.append("  Latency: " + ", ".join(f"{endpoint} {v['seconds'] * 1000:.0f}ms ({v['source']})"
+                                              for endpoint, v in s["latencies"].items()))
+        estimate = f"  Estimated wall time: {s['wall_s']:.1f}s"
+        if s["throttle_s"] > s["minting_s"]:
+            estimate += f" (rate limits bound minting at {s['throttle_s']:.1f}s)"
+        lines.append(estimate)
+        return lines
@@ -1,22 +1,48 @@
+import sys
+
+# --profile-startup must hook the import system before anything heavy is imported
+PROFILE_STARTUP = "--profile-startup" in sys.argv
+STARTUP_BENCHMARK = "--startup-benchmark" in sys.argv
+if PROFILE_STARTUP:
+    import startup_profile
+    startup_profile.install()
+
 import customtkinter as ctk
 import os
 import threading
-import pyperclip
-import json
-from api_client import RiotTournamentClient
-from discord_helper import send_discord_webhook
+import time
+from rate_limiter import RateLimiter
+from tournament_cache import TournamentCache
+from code_pool import CodePool
+from job_journal import JobJournal
+from idempotency import IdempotencyStore
 import config_manager
-import sys
+from preset_manager import load_presets_file, save_presets_file, get_repository, LabelSearchIndex
+from virtual_list import VirtualList
+from ui_events import EventBus
+from job_scheduler import JobScheduler, PRIORITY_URGENT, PRIORITY_NORMAL, FINISHED_STATES
+from provider_registry import get_registry, PROVIDER_REGIONS, callback_url
+from code_ledger import get_ledger, SOURCE_MANUAL, SOURCE_POOL
+
+# Network (requests/aiohttp) and clipboard modules are imported on first use,
+# after the main window is already on screen.
 
-def resource_path(relative_path):
-    """ Get absolute path to resource, works for dev and for PyInstaller """
-    try:
-        # PyInstaller creates a temp folder and stores path in _MEIPASS
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
+def startup_mark(name):
+    """
+    Record a startup milestone (wall-clock epoch) for scripts/bench_startup.py.
+    Windowed builds have no stdout, so the benchmark passes a file path instead.
+    """
+    line = f"{name} {time.time():.4f}"
+    path = os.environ.get("STARTUP_BENCHMARK_FILE")
+    if path:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    elif sys.stdout:
+        print(line, flush=True)
 
-    return os.path.join(base_path, relative_path)
+def copy_to_clipboard(text):
+    import pyperclip
+    pyperclip.copy(text)
 
 # --- Configuration Constants ---
 ctk.set_appearance_mode("Dark")
@@ -31,40 +57,10 @@ BUTTON_HEIGHT_LG = 50
 BUTTON_HEIGHT_STD = 40
 INPUT_HEIGHT = 35
 
-PRESETS_FILE = os.path.join(config_manager.get_app_data_dir(), "presets.json")
-
-def load_presets_file():
-    # 1. Try loading actual presets
-    if os.path.exists(PRESETS_FILE):
-        try:
-            with open(PRESETS_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Error loading presets: {e}")
-            return []
-            
-    # 2. Fallback to bundled example file if exists
-    example_path = resource_path("presets.json.example")
-    if os.path.exists(example_path):
-        try:
-            with open(example_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            # Auto-create presets.json from example for convenience
-            save_presets_file(data)
-            return data
-        except Exception as e:
-            print(f"Error loading bundled example: {e}")
-            
-    return []
-
-def save_presets_file(data):
-    try:
-        with open(PRESETS_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        return True
-    except Exception as e:
-        print(f"Error saving presets: {e}")
-        return False
+JOB_STATE_TEXT = {"queued": "대기", "running": "실행 중", "done": "완료", "failed": "실패", "cancelled": "취소됨"}
+JOB_STATE_COLORS = {"queued": "gray", "running": "#FFFF55", "done": "#00FF00", "failed": "#FF5555", "cancelled": "orange"}
+HEALTH_RECHECK_MS = 15000  # Re-check an unreachable backend this often
+DEFAULT_REGION_CHOICE = "기본"  # Action region menu entry: play in the configured region
 
 class ManualConfigWindow(ctk.CTkToplevel):
     def __init__(self, parent):
@@ -116,10 +112,14 @@ class ManualConfigWindow(ctk.CTkToplevel):
         ctk.CTkFrame(self.tab_general, height=2, fg_color="gray").pack(fill="x", padx=20, pady=10)
         ctk.CTkLabel(self.tab_general, text="공급자 (Provider)", font=SUBHEADER_FONT).pack(pady=5)
         
-        self.lbl_provider = ctk.CTkLabel(self.tab_general, text="ID: 없음", font=BODY_FONT)
+        self.lbl_provider = ctk.CTkLabel(self.tab_general, text="ID: 없음", font=BODY_FONT, justify="left")
         self.lbl_provider.pack(pady=5)
         
-        ctk.CTkButton(self.tab_general, text="Provider 새로 생성 (Region: KR)", height=BUTTON_HEIGHT_STD, command=self.create_new_provider).pack(pady=10)
+        provider_frame = ctk.CTkFrame(self.tab_general, fg_color="transparent")
+        provider_frame.pack(pady=10)
+        self.combo_provider_region = ctk.CTkOptionMenu(provider_frame, values=PROVIDER_REGIONS, width=90, height=INPUT_HEIGHT)
+        self.combo_provider_region.pack(side="left", padx=5)
+        ctk.CTkButton(provider_frame, text="Provider 추가 생성", height=BUTTON_HEIGHT_STD, command=self.create_new_provider).pack(side="left", padx=5)
         
         self.txt_gen_log = ctk.CTkTextbox(self.tab_general, height=100)
         self.txt_gen_log.pack(fill="x", padx=20, pady=10)
@@ -150,6 +150,15 @@ class ManualConfigWindow(ctk.CTkToplevel):
         
         self.txt_manual_result = ctk.CTkTextbox(self.tab_manual, height=200)
         self.txt_manual_result.pack(fill="both", expand=True, padx=20, pady=10)
+        
+        # Ledger lookup: which code went to which match
+        lookup_frame = ctk.CTkFrame(self.tab_manual, fg_color="transparent")
+        lookup_frame.pack(fill="x", padx=20, pady=(0, 10))
+        self.entry_lookup = ctk.CTkEntry(lookup_frame, placeholder_text="코드 / 토너먼트 ID / 메타데이터 / 액션명", height=INPUT_HEIGHT)
+        self.entry_lookup.pack(side="left", fill="x", expand=True)
+        self.entry_lookup.bind("<Return>", lambda e: self.lookup_codes(), add="+")
+        ctk.CTkButton(lookup_frame, text="조회", width=60, height=INPUT_HEIGHT, command=self.lookup_codes).pack(side="left", padx=5)
+        ctk.CTkButton(lookup_frame, text="CSV 내보내기", width=100, height=INPUT_HEIGHT, command=self.export_codes).pack(side="left")
 
     def _init_presets_tab(self):
         # Load presets strictly from file for editing
@@ -161,7 +170,7 @@ class ManualConfigWindow(ctk.CTkToplevel):
 
         ctk.CTkLabel(frame_top, text="편집할 프리셋:", font=BODY_FONT).pack(side="left")
         
-        self.preset_names = [p["label"] for p in self.edit_presets_data]
+        self._index_presets()
         self.combo_presets = ctk.CTkComboBox(frame_top, values=self.preset_names, command=self._on_preset_select, height=INPUT_HEIGHT, width=200)
         self.combo_presets.pack(side="left", padx=10)
 
@@ -181,10 +190,10 @@ class ManualConfigWindow(ctk.CTkToplevel):
         # Actions List (Scrollable)
         ctk.CTkLabel(self.frame_edit, text="세부 액션 및 웹훅 설정", font=BODY_FONT).pack(anchor="w", padx=10, pady=(10,0))
         
-        self.scroll_actions = ctk.CTkScrollableFrame(self.frame_edit, height=300)
-        self.scroll_actions.pack(fill="both", expand=True, padx=10, pady=5)
-        
-        self.action_entries = [] # Stores widgets and references
+        # Only visible action rows exist as widgets; edits are written straight to memory
+        self.list_actions = VirtualList(self.frame_edit, row_height=INPUT_HEIGHT + 10, height=300,
+                                        make_row=self._make_action_row, bind_row=self._bind_action_row)
+        self.list_actions.pack(fill="both", expand=True, padx=10, pady=5)
         
         # Add Action Button
         ctk.CTkButton(self.frame_edit, text="+ 새 액션 추가", height=30, command=self.add_action).pack(pady=5)
@@ -202,9 +211,7 @@ class ManualConfigWindow(ctk.CTkToplevel):
 
     def _clear_edit_form(self):
         self.entry_preset_label.delete(0, "end")
-        for widget in self.scroll_actions.winfo_children():
-            widget.destroy()
-        self.action_entries = []
+        self.list_actions.set_items([])
         self.current_editing_index = -1
         self.btn_del_preset.configure(state="disabled")
 
@@ -212,10 +219,11 @@ class ManualConfigWindow(ctk.CTkToplevel):
         if not choice: return
         
         # Find selected preset data
-        selected = next((p for p in self.edit_presets_data if p["label"] == choice), None)
-        if not selected: return
+        index = self.preset_positions.get(choice)
+        if index is None: return
         
-        self.current_editing_index = self.edit_presets_data.index(selected)
+        selected = self.edit_presets_data[index]
+        self.current_editing_index = index
         self.btn_del_preset.configure(state="normal")
         
         # Fill Label
@@ -226,36 +234,59 @@ class ManualConfigWindow(ctk.CTkToplevel):
         self._refresh_actions_ui(selected["actions"])
 
     def _refresh_actions_ui(self, actions):
-        # Clear existing
-        for widget in self.scroll_actions.winfo_children():
-            widget.destroy()
-        self.action_entries = []
-        
-        for i, action in enumerate(actions):
-            f = ctk.CTkFrame(self.scroll_actions, fg_color="transparent")
-            f.pack(fill="x", pady=5)
-            
-            # Action Name
-            ctk.CTkLabel(f, text="액션명:", width=60).pack(side="left")
-            name_entry = ctk.CTkEntry(f, width=120, height=INPUT_HEIGHT)
-            name_entry.pack(side="left", padx=5)
-            name_entry.insert(0, action.get("name", ""))
-            
-            # URL
-            ctk.CTkLabel(f, text="웹훅:", width=40).pack(side="left")
-            url_entry = ctk.CTkEntry(f, height=INPUT_HEIGHT)
-            url_entry.pack(side="left", fill="x", expand=True, padx=5)
-            url_entry.insert(0, action.get("url", ""))
-            
-            # Delete Action Button
-            btn_del = ctk.CTkButton(f, text="X", width=30, height=INPUT_HEIGHT, fg_color="red", 
-                                  command=lambda idx=i: self.delete_action(idx))
-            btn_del.pack(side="right", padx=5)
-            
-            self.action_entries.append({
-                "name_entry": name_entry,
-                "url_entry": url_entry
-            })
+        self.list_actions.set_items(actions)
+
+    def _make_action_row(self, parent):
+        """Build one recyclable action row; _bind_action_row points it at an action."""
+        f = ctk.CTkFrame(parent, fg_color="transparent", height=INPUT_HEIGHT + 10)
+        f.index = -1
+        
+        # Action Name
+        ctk.CTkLabel(f, text="액션명:", width=60).pack(side="left")
+        f.name_entry = ctk.CTkEntry(f, width=120, height=INPUT_HEIGHT)
+        f.name_entry.pack(side="left", padx=5)
+        
+        # Delete Action Button (packed before the URL so it keeps its place on the right)
+        f.btn_del = ctk.CTkButton(f, text="X", width=30, height=INPUT_HEIGHT, fg_color="red",
+                                  command=lambda: self.delete_action(f.index))
+        f.btn_del.pack(side="right", padx=5)
+        
+        # Region the code is played in (shards across that region's providers)
+        f.region_menu = ctk.CTkOptionMenu(f, values=[DEFAULT_REGION_CHOICE] + PROVIDER_REGIONS, width=70,
+                                          height=INPUT_HEIGHT, command=lambda v: self._on_action_edit(f))
+        f.region_menu.pack(side="right", padx=5)
+        
+        # URL
+        ctk.CTkLabel(f, text="웹훅:", width=40).pack(side="left")
+        f.url_entry = ctk.CTkEntry(f, height=INPUT_HEIGHT)
+        f.url_entry.pack(side="left", fill="x", expand=True, padx=5)
+        
+        f.name_entry.bind("<KeyRelease>", lambda e: self._on_action_edit(f), add="+")
+        f.url_entry.bind("<KeyRelease>", lambda e: self._on_action_edit(f), add="+")
+        return f
+
+    def _bind_action_row(self, row, index, action):
+        row.index = index
+        for entry, value in ((row.name_entry, action.get("name", "")), (row.url_entry, action.get("url", ""))):
+            # Rewriting an unchanged entry would reset the cursor while typing
+            if entry.get() != value:
+                entry.delete(0, "end")
+                entry.insert(0, value)
+        row.region_menu.set(action.get("region") or DEFAULT_REGION_CHOICE)
+
+    def _on_action_edit(self, row):
+        """Write a row's entries back to the action it currently shows."""
+        if self.current_editing_index == -1 or row.index < 0:
+            return
+        actions = self.edit_presets_data[self.current_editing_index]["actions"]
+        if row.index < len(actions):
+            actions[row.index]["name"] = row.name_entry.get().strip()
+            actions[row.index]["url"] = row.url_entry.get().strip()
+            region = row.region_menu.get()
+            if region == DEFAULT_REGION_CHOICE:
+                actions[row.index].pop("region", None)
+            else:
+                actions[row.index]["region"] = region
 
     def add_preset(self):
         new_preset = {
@@ -269,8 +300,10 @@ class ManualConfigWindow(ctk.CTkToplevel):
         if self.current_editing_index < 0 or self.current_editing_index >= len(self.edit_presets_data):
             return
             
-        del self.edit_presets_data[self.current_editing_index]
-        save_presets_file(self.edit_presets_data) # Auto save on delete for safety
+        removed = self.edit_presets_data.pop(self.current_editing_index)
+        # Auto save on delete for safety; only the deleted record is touched
+        if removed.get("id"):
+            get_repository().delete(removed["id"])
         self.parent.refresh_presets() # Update main UI
         
         self._reload_combo(select_last=False)
@@ -289,7 +322,9 @@ class ManualConfigWindow(ctk.CTkToplevel):
         })
         
         # Redraw
-        self._refresh_actions_ui(self.edit_presets_data[self.current_editing_index]["actions"])
+        actions = self.edit_presets_data[self.current_editing_index]["actions"]
+        self._refresh_actions_ui(actions)
+        self.list_actions.scroll_to(len(actions) - 1)
 
     def delete_action(self, idx):
         if self.current_editing_index == -1: return
@@ -303,23 +338,26 @@ class ManualConfigWindow(ctk.CTkToplevel):
         self._refresh_actions_ui(actions)
 
     def _sync_ui_to_memory(self):
-        """Syncs current entries back to memory object before re-rendering"""
+        """Syncs the label entry back to memory (action rows write through on every edit)"""
         if self.current_editing_index == -1: return
         
         target = self.edit_presets_data[self.current_editing_index]
         target["label"] = self.entry_preset_label.get().strip()
         
-        # Reconstruct actions list from UI
-        new_actions = []
-        for entry in self.action_entries:
-            new_actions.append({
-                "name": entry["name_entry"].get().strip(),
-                "url": entry["url_entry"].get().strip()
-            })
-        target["actions"] = new_actions
+        # Normalize whitespace the same way the old full rebuild did
+        for action in target["actions"]:
+            action["name"] = action.get("name", "").strip()
+            action["url"] = action.get("url", "").strip()
 
-    def _reload_combo(self, select_last=False):
+    def _index_presets(self):
+        """Combo values plus a label -> position map for O(1) selection."""
         self.preset_names = [p["label"] for p in self.edit_presets_data]
+        self.preset_positions = {}
+        for index, label in enumerate(self.preset_names):
+            self.preset_positions.setdefault(label, index)
+
+    def _reload_combo(self, select_last=False):
+        self._index_presets()
         self.combo_presets.configure(values=self.preset_names)
         
         if self.preset_names:
@@ -338,7 +376,7 @@ class ManualConfigWindow(ctk.CTkToplevel):
             
         self._sync_ui_to_memory() # Final sync
         
-        # Write to file
+        # Write to the repository (only changed presets are written)
         if save_presets_file(self.edit_presets_data):
             self.parent.log("프리셋이 저장되었습니다.", "green")
             # Refresh Main UI
@@ -363,46 +401,97 @@ class ManualConfigWindow(ctk.CTkToplevel):
         else:
             self.switch_stub.deselect()
             
-        pid = config.get("provider_id")
-        self.lbl_provider.configure(text=f"현재 Provider ID: {pid}" if pid else "Provider ID: 없음 (생성 필요)")
+        self.combo_provider_region.set(config.get("region", "KR"))
+        self._show_providers()
+
+    def _show_providers(self):
+        """List the registered providers of the current stub/prod mode, by region."""
+        config = config_manager.load_config()
+        regions = get_registry().regions(config.get("use_stub", True))
+        if not regions:
+            self.lbl_provider.configure(text="Provider ID: 없음 (생성 필요)")
+            return
+        lines = [f"{region}: {', '.join(str(pid) for pid in ids)}" for region, ids in regions.items()]
+        self.lbl_provider.configure(text=f"기본 Provider ID: {config.get('provider_id') or '없음'}\n" + "\n".join(lines))
 
     def save_general_settings(self):
         use_stub = bool(self.switch_stub.get())
         
         config = config_manager.load_config()
-        config["use_stub"] = use_stub
-        config_manager.save_config(config)
+        if config.get("use_stub", True) != use_stub:
+            # Stub tournament IDs are meaningless in production and vice versa
+            self.parent.tournament_cache.invalidate()
+        config = config_manager.update_config(use_stub=use_stub)
         
         self.parent.init_client()
         self.parent.log("설정이 저장되었습니다.", "green")
         
-        self.lbl_provider.configure(text=f"현재 Provider ID: {config.get('provider_id') or '없음'}")
+        self._show_providers()
         self.txt_gen_log.insert("end", "설정 저장 완료.\n")
 
     def create_new_provider(self):
-        if not self.parent.client:
+        if not self.parent.async_client:
             self.txt_gen_log.insert("end", "오류: 클라이언트 미초기화.\n")
             return
             
-        def run():
-            self.txt_gen_log.insert("end", "Provider 생성 요청 중...\n")
-            res = self.parent.client.create_provider(region="KR", url="http://example.com/callback")
+        region = self.combo_provider_region.get()
+        use_stub = self.parent.async_client.use_stub
+        self.txt_gen_log.insert("end", f"Provider 생성 요청 중 ({region})...\n")
+        
+        def on_done(res):
+            if not self.winfo_exists():
+                return
             if res["success"]:
                 pid = res["data"]
-                self.parent.provider_id = pid
+                get_registry().add(pid, region, use_stub)
+                # A provider of the configured region becomes the default one
+                if region == config_manager.load_config().get("region", "KR").upper():
+                    self.parent.provider_id = pid
+                    config_manager.update_config(provider_id=pid)
+                    self.parent.init_code_pool()
                 
-                conf = config_manager.load_config()
-                conf["provider_id"] = pid
-                config_manager.save_config(conf)
-                
-                self.lbl_provider.configure(text=f"현재 Provider ID: {pid}")
-                self.txt_gen_log.insert("end", f"Provider 생성 성공: {pid}\n")
+                self._show_providers()
+                self.txt_gen_log.insert("end", f"Provider 생성 성공 ({region}): {pid}\n")
             else:
                 self.txt_gen_log.insert("end", f"Provider 생성 실패: {res['error']}\n")
-        threading.Thread(target=run).start()
+        
+        coro = self.parent.async_client.create_provider(region=region, url=callback_url())
+        self.parent.submit_async(coro, on_done)
+
+    def lookup_codes(self):
+        query = self.entry_lookup.get().strip()
+        if not query:
+            return
+        rows = get_ledger().lookup(query)
+        if not rows:
+            self.txt_manual_result.insert("end", f"'{query}': 기록 없음\n")
+        for row in rows[:50]:
+            delivered = "전송됨" if row["delivered_at"] else "미전송"
+            created = time.strftime("%m-%d %H:%M", time.localtime(row["created_at"]))
+            self.txt_manual_result.insert("end", f"{row['code']} · {row['preset'] or '-'} / {row['action']} · "
+                                                 f"T{row['tournament_id'] or '-'} · {created} · {delivered}\n")
+        if len(rows) == 1:
+            for callback in get_ledger().callbacks_for(rows[0]["code"]):
+                received = time.strftime("%m-%d %H:%M", time.localtime(callback["received_at"]))
+                self.txt_manual_result.insert("end", f"  └ 경기 결과: game {callback['game_id']} · {received}\n")
+        if len(rows) > 50:
+            self.txt_manual_result.insert("end", f"... 외 {len(rows) - 50}건\n")
+        self.txt_manual_result.see("end")
+
+    def export_codes(self):
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=".csv", initialfile="codes.csv",
+                                            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl")])
+        if not path:
+            return
+        try:
+            count = get_ledger().export(path)
+            self.txt_manual_result.insert("end", f"{count}개 코드 내보내기 완료: {path}\n")
+        except Exception as e:
+            self.txt_manual_result.insert("end", f"내보내기 실패: {e}\n")
 
     def manual_generate(self):
-        if not self.parent.client: 
+        if not self.parent.async_client: 
             self.txt_manual_result.insert("end", "오류: 클라이언트 미초기화.\n")
             return
         if not self.parent.provider_id:
@@ -412,27 +501,106 @@ class ManualConfigWindow(ctk.CTkToplevel):
         t_name = self.entry_tourn_name.get().strip() or "Manual Tournament"
         map_val = self.map_mapping.get(self.combo_map.get(), "SUMMONERS_RIFT")
         pick_val = self.pick_mapping.get(self.combo_pick.get(), "TOURNAMENT_DRAFT")
+        client = self.parent.async_client
+        provider_id = self.parent.provider_id
         
-        def run():
-            self.txt_manual_result.insert("end", f"토너먼트 '{t_name}' 생성 중...\n")
-            t_res = self.parent.client.create_tournament(self.parent.provider_id, t_name)
+        # A pre-minted code skips the backend round trip entirely
+        pool = self.parent.code_pool
+        settings = {"map_type": map_val, "pick_type": pick_val, "team_size": 5, "spectator_type": "ALL"}
+        pooled = pool.take(settings) if pool else None
+        if pooled:
+            get_ledger().record(pooled, provider_id=provider_id, action=t_name, settings=settings,
+                                use_stub=client.use_stub, source=SOURCE_POOL)
+            self.txt_manual_result.insert("end", f"코드 생성 완료 (풀):\n{pooled}\n")
+            copy_to_clipboard(pooled)
+            self.txt_manual_result.insert("end", "(복사됨)\n")
+            return
+        
+        async def run():
+            t_res = await client.create_tournament(provider_id, t_name)
+            if not t_res["success"]:
+                return t_res, None
+            c_res = await client.create_codes(t_res["data"], count=1, map_type=map_val, pick_type=pick_val,
+                                              metadata=f"manual/{t_name}")
+            if c_res["success"]:
+                get_ledger().record(c_res["data"][0], provider_id=provider_id, tournament_id=t_res["data"],
+                                    action=t_name, metadata=f"manual/{t_name}", settings=settings,
+                                    use_stub=client.use_stub, source=SOURCE_MANUAL)
+            return t_res, c_res
+        
+        def on_done(results):
+            if not self.winfo_exists():
+                return
+            t_res, c_res = results
             if not t_res["success"]:
                 self.txt_manual_result.insert("end", f"토너먼트 생성 실패: {t_res['error']}\n")
                 return
             
-            tid = t_res["data"]
-            self.txt_manual_result.insert("end", f"토너먼트 ID: {tid}\n")
-            
-            c_res = self.parent.client.create_codes(tid, count=1, map_type=map_val, pick_type=pick_val)
+            self.txt_manual_result.insert("end", f"토너먼트 ID: {t_res['data']}\n")
             if c_res["success"]:
                 code = c_res["data"][0]
                 self.txt_manual_result.insert("end", f"코드 생성 완료:\n{code}\n")
-                pyperclip.copy(code)
+                copy_to_clipboard(code)
                 self.txt_manual_result.insert("end", "(복사됨)\n")
             else:
                 self.txt_manual_result.insert("end", f"코드 생성 실패: {c_res['error']}\n")
-                
-        threading.Thread(target=run).start()
+        
+        self.txt_manual_result.insert("end", f"토너먼트 '{t_name}' 생성 중...\n")
+        self.parent.submit_async(run(), on_done)
+
+
+class PlanPreviewWindow(ctk.CTkToplevel):
+    """Shows the execution plan of a preset; "실행" queues exactly this plan."""
+    def __init__(self, parent, preset, plan):
+        super().__init__(parent)
+        self.title(f"실행 계획: {preset['label']}")
+        self.geometry("520x480")
+        self.parent = parent
+        self.preset = preset
+        self.plan = plan
+
+        txt = ctk.CTkTextbox(self)
+        txt.pack(fill="both", expand=True, padx=15, pady=(15, 5))
+        txt.insert("end", "\n".join(self._lines()))
+        txt.configure(state="disabled")
+
+        frame_buttons = ctk.CTkFrame(self, fg_color="transparent")
+        frame_buttons.pack(fill="x", padx=15, pady=10)
+        ctk.CTkButton(frame_buttons, text="닫기", width=80, height=BUTTON_HEIGHT_STD, fg_color="#555555",
+                      command=self.destroy).pack(side="right", padx=5)
+        ctk.CTkButton(frame_buttons, text="이 계획대로 실행", height=BUTTON_HEIGHT_STD, fg_color="green",
+                      command=self.run).pack(side="right")
+
+    def _lines(self):
+        s = self.plan.summary()
+        calls = s["calls"]
+        lines = [f"매치 {s['actions']}개 → 토너먼트 그룹 {s['groups']}개, Provider {s['shards']}개"
+                 + (" (묶음 발급)" if s["batch"] else " (매치별 발급)")]
+        if s["resume_run"]:
+            lines.append(f"이전 작업 이어서 진행: {s['already_done']}개 전송 완료 ('처음부터'를 켜면 새로 발급)")
+        for region, count in sorted(s["provider_creations"].items()):
+            lines.append(f"Provider 생성: {region} {count}개")
+        lines.append("")
+        lines.append(f"예상 호출: 총 {s['total_calls']}회")
+        lines.append(f"  Provider {calls['/providers']} · 토너먼트 {calls['/tournaments']} "
+                     f"(재사용 {s['tournaments_reused']}) · 코드 {calls['/codes']}")
+        lines.append(f"  웹훅 메시지 {calls['/webhooks']} (대상 {s['webhook_destinations']}곳)")
+        lines.append(f"예상 소요 시간: 약 {s['wall_s']:.1f}초")
+        if s["throttle_s"] > s["minting_s"]:
+            lines.append(f"  (호출 한도 때문에 코드 발급에 최소 {s['throttle_s']:.1f}초)")
+        sources = {"live": "이번 실행", "saved": "지난 기록", "default": "기본값"}
+        lines.append("  기준 지연: " + ", ".join(f"{endpoint} {v['seconds'] * 1000:.0f}ms({sources[v['source']]})"
+                                             for endpoint, v in s["latencies"].items()))
+        lines.append("")
+        for group in self.plan.groups:
+            if group["pending"]:
+                lines.append(f"[{group['region']}] {group['tournament_name']} · 코드 {len(group['pending'])}개 · "
+                             f"{group['settings']['team_size']}v{group['settings']['team_size']}")
+        return lines
+
+    def run(self):
+        self.parent.run_preset(self.preset, plan=self.plan)
+        self.destroy()
 
 
 class LoLPresetApp(ctk.CTk):
@@ -442,21 +610,225 @@ class LoLPresetApp(ctk.CTk):
         self.geometry("500x700")
         
         self.client = None
+        self.async_client = None
+        self.loop = None  # Shared event loop for every async button action
+        self.callback_receiver = None
+        self.backend_text = ""
+        self._health_after_id = None
         self.provider_id = None
         self.presets = []
+        self.preset_index = LabelSearchIndex()
+        self.provider_lock = threading.Lock()  # One provider auto-creation across parallel jobs
+        self.tournament_cache = TournamentCache(ttl=config_manager.load_config().get("tournament_cache_ttl", 43200))
+        self.code_pool = None
+        self.journal = JobJournal()
+        self.journal.compact()
+        # Results of journaled calls, so a resumed run never mints twice
+        self.idempotency = IdempotencyStore()
+        
+        # Worker threads publish here; the Tk loop drains it every frame
+        self.events = EventBus(self)
+        self.events.subscribe("status", self._show_status)
+        self.events.subscribe("progress", self._show_progress)
+        self.events.subscribe("jobs", self._refresh_jobs)
+        self.events.subscribe("game_result", self._show_game_result)
+        
+        # Preset runs are queued; the UI stays usable while they run
+        self.scheduler = JobScheduler(self._process_preset,
+                                      workers=config_manager.load_config().get("job_workers", 1),
+                                      on_update=lambda job: self.events.publish("jobs", coalesce="jobs"))
         
         self._init_ui()
-        self.init_client() 
+        self.events.start()
         self.refresh_presets()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Draw the window first; the network stack is loaded right after
+        self.after(0, self._finish_startup)
+
+    def _finish_startup(self):
+        self.update_idletasks()  # Make sure the first frame is painted before importing
+        if STARTUP_BENCHMARK:
+            startup_mark("FIRST_WINDOW")
+        
+        self.init_client()
+        
+        unfinished = self.journal.unfinished_runs()
+        if unfinished:
+            labels = ", ".join(sorted(set(unfinished.values())))
+            self.log(f"중단된 작업 {len(unfinished)}건: {labels} (다시 실행하면 이어서 진행)", "orange")
+            
+        if PROFILE_STARTUP:
+            self._report_startup_profile()
+        if STARTUP_BENCHMARK:
+            startup_mark("CLIENT_READY")
+            self.on_close()
+
+    def _report_startup_profile(self):
+        header = f"Startup complete in {startup_profile.elapsed() * 1000:.1f} ms"
+        if sys.stdout is not None:
+            print(header)
+            startup_profile.report()
+            return
+        # Windowed builds have no console: write the report to the app-data dir
+        path = os.path.join(config_manager.get_app_data_dir(), "startup_profile.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            print(header, file=f)
+            startup_profile.report(out=f)
 
     def init_client(self):
+        from api_client import RiotTournamentClient
+        from async_client import AsyncRiotTournamentClient, EventLoopThread
+        from transports import create_transport, create_fallback_transport, GasTransport, TransportError
+        import metrics
+        import circuit_breaker
+        
+        if self.loop is None:
+            self.loop = EventLoopThread()
         config = config_manager.load_config()
         use_stub = config.get("use_stub", True)
         self.provider_id = config.get("provider_id")
+        metrics.configure(config)
+        circuit_breaker.configure(config)
+        self.scheduler.set_workers(config.get("job_workers", 1))
         
-        self.client = RiotTournamentClient(use_stub=use_stub)
+        # Release the previous client's pooled connections before replacing it
+        if self.client:
+            self.client.close()
+        try:
+            transport = create_transport(config)
+        except TransportError as e:
+            self.log(f"전송 방식 설정 오류: {e} → GAS 백엔드를 사용합니다.", "red")
+            transport = GasTransport(config.get("gas_url"))
+        try:
+            fallback = create_fallback_transport(config)
+        except TransportError as e:
+            self.log(f"대체 경로 설정 오류: {e}", "red")
+            fallback = None
+        # Both clients draw from the same rate-limit buckets
+        limiter = RateLimiter(config.get("rate_limits"))
+        max_retries = config.get("max_retries", 3)
+        self.client = RiotTournamentClient(use_stub=use_stub, pool_size=config.get("pool_size", 10),
+                                           rate_limiter=limiter, max_retries=max_retries, transport=transport,
+                                           idempotency=self.idempotency, fallback=fallback)
+        if self.async_client:
+            self.loop.submit(self.async_client.aclose())
+        self.async_client = AsyncRiotTournamentClient(use_stub=use_stub, rate_limiter=limiter,
+                                                      max_retries=max_retries, transport=transport,
+                                                      idempotency=self.idempotency, fallback=fallback)
         mode_text = "Stub/Test (테스트 서버)" if use_stub else "Production (라이브 서버)"
-        self.log(f"Backend 연결됨: {mode_text}", "#00FF00" if use_stub else "#FF5500")
+        self.backend_text = f"{mode_text} · {transport.describe()}"
+        if fallback:
+            self.backend_text += f" (대체: {fallback.describe()})"
+        self.log(f"Backend 확인 중: {self.backend_text}", "gray")
+        self.check_backend_health()
+        self.init_code_pool()
+        self.init_callback_receiver(config)
+
+    def init_callback_receiver(self, config):
+        """Start the game-result callback receiver on the shared loop if enabled (once per session)."""
+        if self.callback_receiver or not config.get("callback_server"):
+            return
+        from callback_server import CallbackReceiver, DEFAULT_HOST
+        self.callback_receiver = CallbackReceiver(host=config.get("callback_host") or DEFAULT_HOST,
+                                                  port=config.get("callback_port", 8787),
+                                                  on_result=lambda event: self.events.publish("game_result", event))
+
+        def on_done(port):
+            self.log(f"경기 결과 수신 대기 중: 포트 {port}", "gray")
+        self.submit_async(self.callback_receiver.start(), on_done)
+
+    def _show_game_result(self, event):
+        target = f"{event['preset'] or '-'} / {event['action']}" if event["action"] else "알 수 없는 코드"
+        self.log(f"경기 결과 수신: {target} ({event['code']})", "#00BFFF")
+
+    def check_backend_health(self):
+        """Probe the backend (GAS doGet) and show the outcome in the status label. Tk thread only."""
+        if self._health_after_id:
+            self.after_cancel(self._health_after_id)
+            self._health_after_id = None
+        client = self.async_client
+
+        def on_done(res):
+            if client is not self.async_client:
+                return  # Settings changed meanwhile; init_client started a new check
+            if res["success"]:
+                color = "#00FF00" if client.use_stub else "#FF5500"
+                self.log(f"Backend 연결됨: {self.backend_text} · {res['data']['latency_ms']}ms", color)
+            else:
+                self.log(f"Backend 응답 없음: {res['error']} ({HEALTH_RECHECK_MS // 1000}초 후 다시 확인)", "#FF5555")
+                self._health_after_id = self.after(HEALTH_RECHECK_MS, self.check_backend_health)
+        self.submit_async(client.check_health(), on_done)
+
+    def init_code_pool(self):
+        """(Re)start the pre-minted code pool for the current client and provider."""
+        if self.code_pool:
+            self.code_pool.stop()
+            self.code_pool = None
+            
+        config = config_manager.load_config()
+        if not config.get("code_pool_enabled") or not self.provider_id:
+            return
+            
+        self.code_pool = CodePool(self.client, self.provider_id,
+                                  low=config.get("code_pool_low", 2),
+                                  high=config.get("code_pool_high", 10))
+        self._watch_preset_settings()
+        self.code_pool.start()
+
+    def _watch_preset_settings(self):
+        """Keep codes warm for every settings combination used by a preset."""
+        if not self.code_pool:
+            return
+        from preset_runner import action_settings
+        for preset in self.presets:
+            for action in preset.get("actions", []):
+                self.code_pool.watch(action_settings(action))
+
+    def on_close(self):
+        # Stop queued and running jobs first; interrupted runs resume from the journal
+        self.scheduler.shutdown(cancel=True)
+        if self.code_pool:
+            self.code_pool.stop()
+        if self.client:
+            self.client.close()
+        if self.async_client:
+            try:
+                self.loop.run(self.async_client.aclose(), timeout=5)
+            except Exception as e:
+                print(f"Error closing async client: {e}")
+        if self.callback_receiver:
+            try:
+                # Persist acknowledged callbacks before the ledger closes
+                self.loop.run(self.callback_receiver.stop(), timeout=5)
+            except Exception as e:
+                print(f"Error stopping callback receiver: {e}")
+        if self.loop:
+            self.loop.stop()
+        self.events.stop()
+        self.export_metrics()
+        get_ledger().close()
+        config_manager.flush_config()
+        self.destroy()
+
+    def export_metrics(self):
+        """Write the call metrics to metrics.prom/metrics.json if enabled."""
+        if "metrics" not in sys.modules or not config_manager.load_config().get("metrics_export", True):
+            return
+        import metrics
+        metrics.export_default()
+
+    def submit_async(self, coro, on_done):
+        """Run a coroutine on the shared loop and hand its result to on_done on the Tk thread."""
+        def done(future):
+            try:
+                result = future.result()
+            except Exception as e:
+                self.log(f"오류: {e}", "#FF5555")
+                return
+            # Runs on the loop thread: hand the result to the Tk thread
+            self.events.call(on_done, result)
+        self.loop.submit(coro).add_done_callback(done)
 
     def _init_ui(self):
         # Header
@@ -467,9 +839,16 @@ class LoLPresetApp(ctk.CTk):
         self.status_label = ctk.CTkLabel(self.header_frame, text="초기화 중...", font=BODY_FONT, text_color="gray")
         self.status_label.pack(pady=5)
         
-        # Scrollable Area for Presets
-        self.scroll = ctk.CTkScrollableFrame(self)
-        self.scroll.pack(fill="both", expand=True, padx=20, pady=10)
+        # Search box, filtered through an index over preset labels
+        self.entry_search = ctk.CTkEntry(self, placeholder_text="프리셋 검색...", height=INPUT_HEIGHT)
+        self.entry_search.pack(fill="x", padx=20)
+        self.entry_search.bind("<KeyRelease>", lambda e: self.apply_preset_filter(), add="+")
+        
+        # Virtualized area for presets: only visible buttons exist
+        self.preset_list = VirtualList(self, row_height=BUTTON_HEIGHT_LG + 20,
+                                       make_row=self._make_preset_row, bind_row=self._bind_preset_row,
+                                       empty_text="저장된 프리셋이 없습니다.\npresets.json을 확인하거나 복원하세요.")
+        self.preset_list.pack(fill="both", expand=True, padx=20, pady=10)
         
         # Footer
         self.frame_footer = ctk.CTkFrame(self, fg_color="transparent")
@@ -485,110 +864,192 @@ class LoLPresetApp(ctk.CTk):
             command=lambda: ManualConfigWindow(self)
         )
         self.btn_settings.pack(fill="x")
+        
+        # Job queue: progress and cancel for every queued/running preset
+        self.frame_jobs = ctk.CTkFrame(self, fg_color="transparent")
+        self.frame_jobs.pack(fill="x", side="bottom", padx=20)
+        frame_jobs_header = ctk.CTkFrame(self.frame_jobs, fg_color="transparent")
+        frame_jobs_header.pack(fill="x")
+        ctk.CTkLabel(frame_jobs_header, text="작업 대기열", font=BODY_FONT).pack(side="left")
+        self.var_urgent = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(frame_jobs_header, text="긴급 실행 (대기열 맨 앞)", variable=self.var_urgent).pack(side="right")
+        # Otherwise an interrupted run of the same preset is resumed
+        self.var_fresh = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(frame_jobs_header, text="처음부터", variable=self.var_fresh).pack(side="right", padx=5)
+        self.job_list = VirtualList(self.frame_jobs, row_height=INPUT_HEIGHT, height=INPUT_HEIGHT * 4,
+                                    make_row=self._make_job_row, bind_row=self._bind_job_row,
+                                    empty_text="대기 중인 작업이 없습니다.")
+        self.job_list.pack(fill="x", pady=5)
+
+    def _make_job_row(self, parent):
+        row = ctk.CTkFrame(parent, fg_color="transparent", height=INPUT_HEIGHT)
+        row.job_id = None
+        row.btn_cancel = ctk.CTkButton(row, text="취소", width=50, height=INPUT_HEIGHT - 8, fg_color="red",
+                                       command=lambda: row.job_id and self.scheduler.cancel(row.job_id))
+        row.btn_cancel.pack(side="right", padx=5)
+        row.lbl_progress = ctk.CTkLabel(row, width=110, anchor="e")
+        row.lbl_progress.pack(side="right")
+        row.lbl_name = ctk.CTkLabel(row, anchor="w")
+        row.lbl_name.pack(side="left", fill="x", expand=True, padx=5)
+        return row
+
+    def _bind_job_row(self, row, index, job):
+        row.job_id = job["id"]
+        urgent = "⚡ " if job["priority"] == PRIORITY_URGENT else ""
+        row.lbl_name.configure(text=f"{urgent}{job['label']}")
+        progress = f"{JOB_STATE_TEXT[job['state']]} {job['done']}/{job['total']}"
+        if job["failed"]:
+            progress += f" (실패 {job['failed']})"
+        row.lbl_progress.configure(text=progress, text_color=JOB_STATE_COLORS[job["state"]])
+        row.btn_cancel.configure(state="disabled" if job["state"] in FINISHED_STATES else "normal")
+
+    def _refresh_jobs(self):
+        jobs = self.scheduler.jobs()
+        # Newest first, so the queue reads top-down like a log
+        self.job_list.set_items(list(reversed(jobs)))
+        # Changing the backend settings would close the client under a running job
+        active = any(job["state"] not in FINISHED_STATES for job in jobs)
+        self.btn_settings.configure(state="disabled" if active else "normal")
 
     def refresh_presets(self):
-        """Reloads presets from file and rebuilds the buttons"""
+        """Reloads presets from file and rebinds the visible buttons"""
         self.presets = load_presets_file()
-        
-        # Clear existing buttons
-        for widget in self.scroll.winfo_children():
-            widget.destroy()
-            
-        if not self.presets:
-            ctk.CTkLabel(self.scroll, text="저장된 프리셋이 없습니다.\npresets.json을 확인하거나 복원하세요.", font=BODY_FONT).pack(pady=20)
-            return
-            
-        # Rebuild buttons
-        for preset in self.presets:
-            ctk.CTkButton(
-                self.scroll,
-                text=preset["label"],
-                height=BUTTON_HEIGHT_LG,
-                font=SUBHEADER_FONT,
-                command=lambda p=preset: self.run_preset(p)
-            ).pack(fill="x", padx=10, pady=10)
+        self.preset_index.rebuild(p["label"] for p in self.presets)
+        self._watch_preset_settings()
+        self.apply_preset_filter()
+
+    def apply_preset_filter(self):
+        query = self.entry_search.get()
+        self.preset_list.set_items([self.presets[i] for i in self.preset_index.search(query)])
+
+    def _make_preset_row(self, parent):
+        row = ctk.CTkFrame(parent, fg_color="transparent", height=BUTTON_HEIGHT_LG + 20)
+        row.btn_plan = ctk.CTkButton(row, text="계획", width=50, height=BUTTON_HEIGHT_LG, fg_color="#555555",
+                                     hover_color="#333333")
+        row.btn_plan.pack(side="right", padx=(0, 10), pady=10)
+        row.button = ctk.CTkButton(row, height=BUTTON_HEIGHT_LG, font=SUBHEADER_FONT)
+        row.button.pack(fill="x", padx=10, pady=10)
+        return row
+
+    def _bind_preset_row(self, row, index, preset):
+        row.button.configure(text=preset["label"], command=lambda p=preset: self.run_preset(p))
+        row.btn_plan.configure(command=lambda p=preset: self.preview_preset(p))
 
     def log(self, msg, color="white"):
-        self.status_label.configure(text=msg, text_color=color)
+        """Show a status message. Safe from any thread; rapid updates are coalesced per frame."""
         print(f"[LOG] {msg}")
+        self.events.publish("status", msg, color, coalesce="status")
 
-    def toggle_buttons(self, state="normal"):
-        """Enable or disable all preset buttons"""
-        for widget in self.scroll.winfo_children():
-            if isinstance(widget, ctk.CTkButton):
-                widget.configure(state=state)
-        
-        # Also disable settings button to prevent changing configs mid-process
-        self.btn_settings.configure(state=state)
+    def _show_status(self, msg, color):
+        self.status_label.configure(text=msg, text_color=color)
+
+    def _show_progress(self, label, done, total, failed):
+        text = f"진행 중: {label} ({done}/{total})" + (f" · 실패 {failed}" if failed else "")
+        self.status_label.configure(text=text, text_color="#FFFF55")
+
+    def _make_runner(self):
+        from preset_runner import PresetRunner
+        conf = config_manager.load_config()
+        return PresetRunner(self.client,
+                            max_workers=conf.get("max_concurrency", 4),
+                            batch=conf.get("batch_codes", True),
+                            cache=self.tournament_cache,
+                            region=conf.get("region", "KR"),
+                            code_pool=self.code_pool,
+                            journal=self.journal,
+                            providers=get_registry(),
+                            ledger=get_ledger(),
+                            providers_per_region=conf.get("providers_per_region", 1))
+
+    def preview_preset(self, preset):
+        """Compile the preset into its execution plan and show it (no backend calls)."""
+        if not self.client:
+            self.log("오류: 백엔드 클라이언트가 초기화되지 않았습니다.", "#FF5555")
+            return
+        PlanPreviewWindow(self, preset, self._make_runner().plan(self.provider_id, preset))
 
-    def run_preset(self, preset):
+    def run_preset(self, preset, plan=None):
         if not self.client:
             self.log("오류: 백엔드 클라이언트가 초기화되지 않았습니다.", "#FF5555")
             return
             
-        self.log(f"진행 중: {preset['label']}... (버튼 잠금)", "#FFFF55")
-        self.toggle_buttons("disabled")
-        
-        threading.Thread(target=self._process_preset, args=(preset,)).start()
+        if self.var_fresh.get():
+            self.var_fresh.set(False)
+            if self.journal.abandon_run(preset):
+                self.log(f"이전 작업을 이어가지 않고 새로 시작합니다: {preset['label']}", "orange")
+                if plan and plan.resume_run:
+                    plan = None  # The preview assumed a resume; plan again at run time
+        urgent = self.var_urgent.get()
+        self.scheduler.submit(preset, priority=PRIORITY_URGENT if urgent else PRIORITY_NORMAL, plan=plan)
+        if urgent:
+            self.var_urgent.set(False)
+        self.log(f"대기열에 추가: {preset['label']}" + (" (긴급)" if urgent else ""), "#FFFF55")
+
+    def _ensure_provider(self):
+        """Create and register a provider of the configured region if none is set. Returns False on failure."""
+        with self.provider_lock:
+            if self.provider_id:
+                return True
+            region = config_manager.load_config().get("region", "KR")
+            self.log("Provider 없음. 자동 생성 시도...", "yellow")
+            res = get_registry().ensure(self.client, region)
+            if not res["success"]:
+                self.log(f"Provider 생성 실패: {res['error']}", "#FF5555")
+                return False
+            self.provider_id = res["data"][0]
+            # Save dynamically
+            config_manager.update_config(provider_id=self.provider_id)
+            self.init_code_pool()
+            return True
 
-    def _process_preset(self, preset):
+    def _throttle_wait(self):
+        """Seconds the client's rate limiter has held calls back so far."""
+        return sum(c["wait_time"] for c in self.client.rate_limiter.snapshot().values())
+
+    def _process_preset(self, job, report):
+        """Scheduler worker: run one queued preset. Runs off the Tk thread."""
+        preset = job.preset
+        
         try:
             # 0. Provider Check
-            if not self.provider_id:
-                self.log("Provider 없음. 자동 생성 시도...", "yellow")
-                res = self.client.create_provider()
-                if res["success"]:
-                    self.provider_id = res["data"]
-                    # Save dynamically
-                    conf = config_manager.load_config()
-                    conf["provider_id"] = self.provider_id
-                    config_manager.save_config(conf)
-                else:
-                    self.log(f"Provider 생성 실패: {res['error']}", "#FF5555")
-                    return
-
-            success_count = 0
-            total_count = len(preset["actions"])
-            
-            for action in preset["actions"]:
-                try:
-                    t_name = action.get("api_name", action["name"]) 
-                    t_res = self.client.create_tournament(self.provider_id, t_name)
-                    
-                    if not t_res["success"]:
-                        print(f"[{action['name']}] 토너먼트 생성 실패: {t_res['error']}")
-                        continue
-                        
-                    tid = t_res["data"]
-                    c_res = self.client.create_codes(tid, count=1)
-                    
-                    if not c_res["success"]:
-                        print(f"[{action['name']}] 코드 생성 실패: {c_res['error']}")
-                        continue
-                        
-                    code = c_res["data"][0]
-                    
-                    if send_discord_webhook(action["url"], action["name"], code):
-                        success_count += 1
-                    else:
-                        print(f"[{action['name']}] 웹훅 실패")
-                        
-                except Exception as e:
-                    print(f"Error: {e}")
+            if not self._ensure_provider():
+                raise RuntimeError("Provider 생성 실패")
+
+            def on_result(index, res):
+                # Called from runner threads: only publish, never touch widgets
+                if not res["success"]:
+                    print(f"[{res['name']}] {res['error']}")
+                report(index, res)
+                self.events.publish("progress", job.label, job.done, job.total, job.failed, coalesce="status")
+
+            waited_before = self._throttle_wait()
+            # A previewed job runs the plan that was shown
+            summary = self._make_runner().run(self.provider_id, preset, on_result=on_result,
+                                              cancel=job.cancel_event, plan=job.plan)
+            success_count = summary["success_count"]
+            total_count = summary["total_count"]
+            # Per-endpoint latency and retries go to metrics.prom/metrics.json; the status line notes throttling
+            self.export_metrics()
+            waited = self._throttle_wait() - waited_before
+            note = f" · 속도 제한 대기 {waited:.1f}초" if waited >= 0.1 else ""
             
-            if success_count == total_count:
-                self.log(f"모든 작업 완료: {preset['label']}", "#00FF00")
+            if summary["cancelled"]:
+                self.log(f"작업 취소됨 ({success_count}/{total_count}): {job.label} (다시 실행하면 이어서 진행){note}",
+                         "orange")
+            elif success_count == total_count:
+                self.log(f"모든 작업 완료: {job.label}{note}", "#00FF00")
             elif success_count > 0:
-                self.log(f"일부 완료 ({success_count}/{total_count}): {preset['label']}", "orange")
+                self.log(f"일부 완료 ({success_count}/{total_count}): {job.label}{note}", "orange")
             else:
-                self.log(f"작업 실패: {preset['label']}", "#FF5555")
+                self.log(f"작업 실패: {job.label}{note}", "#FF5555")
+            if self.client.circuit_state() != "closed":
+                # Calls are failing fast: keep probing so the label shows when the backend is back
+                self.events.call(self.check_backend_health)
+            return summary
                 
         except Exception as e:
             self.log(f"치명적 오류: {e}", "red")
-            
-        finally:
-            # Re-enable buttons on main thread
-            self.after(0, lambda: self.toggle_buttons("normal"))
+            raise
 
 if __name__ == "__main__":
     app = LoLPresetApp()
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import config_manager
+
+IDEMPOTENCY_FILE = "idempotency.jsonl"  # In the app-data dir
+DEFAULT_TTL = 7 * 24 * 3600  # Keys outlive any realistic retry of a bracket
+
+class IdempotencyStore:
+    """
+    Persisted results of successful backend calls, by idempotency key.
+    A call retried with the same key (after a timeout, a crash or a second
+    click) gets the original result back instead of minting again.
+    Stored as fsynced JSON lines; expired keys are dropped when the file is
+    loaded and compacted.
+    """
+    def __init__(self, path=None, ttl=DEFAULT_TTL):
+        self.path = path or config_manager.app_data_path(IDEMPOTENCY_FILE)
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = {}  # key -> {"result", "ts"}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        expired = 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Torn last line after a crash
+                        continue
+                    if time.time() - record["ts"] > self.ttl:
+                        expired += 1
+                        continue
+                    self.entries[record["key"]] = {"result": record["result"], "ts": record["ts"]}
+        except Exception as e:
+            print(f"Error loading idempotency keys: {e}", file=sys.stderr)
+            return
+        if expired:
+            self._compact()
+
+    def _compact(self):
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for key, entry in self.entries.items():
+                    f.write(json.dumps({"key": key, "result": entry["result"], "ts": entry["ts"]},
+                                       ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error compacting idempotency keys: {e}", file=sys.stderr)
+
+    def get(self, key):
+        """The stored result for key, or None."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or time.time() - entry["ts"] > self.ttl:
+                return None
+            return entry["result"]
+
+    def put(self, key, result):
+        """Remember a successful result. Failed results are not stored, so they can be retried."""
+        if not result.get("success"):
+            return
+        record = {"key": key, "result": result, "ts": time.time()}
+        with self.lock:
+            self.entries[key] = {"result": result, "ts": record["ts"]}
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+            except Exception as e:
+                print(f"Error saving idempotency key: {e}", file=sys.stderr)
+
+
+class SingleFlight:
+    """
+    In-flight call coalescing for threads: concurrent do() calls with the
+    same key run fn once and all receive its result.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}  # key -> {"event", "result"}
+
+    def do(self, key, fn):
+        """Returns (result, shared); shared is True when another caller's call answered."""
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = {"event": threading.Event(), "result": None}
+        if not leader:
+            call["event"].wait()
+            return call["result"], True
+        try:
+            call["result"] = fn()
+        except Exception as e:
+            call["result"] = {"success": False, "error": str(e)}
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call["event"].set()
+        return call["result"], False
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines on one event loop."""
+    def __init__(self):
+        self.calls = {}  # key -> asyncio.Future
+
+    async def do(self, key, coro_fn):
+        """Returns (result, shared) like SingleFlight.do."""
+        future = self.calls.get(key)
+        if future is not None:
+            # shield: a cancelled follower must not cancel the leader's call
+            return await asyncio.shield(future), True
+        future = asyncio.get_running_loop().create_future()
+        self.calls[key] = future
+        try:
+            result = await coro_fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        finally:
+            del self.calls[key]
+        future.set_result(result)
+        return result, False
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+import config_manager
+
+JOURNAL_FILE = "job_journal.jsonl"  # In the app-data dir
+
+# Per-action stages, in the order they complete
+STAGE_TOURNAMENT_CREATED = "tournament_created"
+STAGE_CODE_MINTED = "code_minted"
+STAGE_WEBHOOK_SENT = "webhook_sent"
+STAGES = [STAGE_TOURNAMENT_CREATED, STAGE_CODE_MINTED, STAGE_WEBHOOK_SENT]
+
+# How a run ended
+OUTCOME_COMPLETED = "completed"  # Every action succeeded
+OUTCOME_FAILED = "failed"  # Ended with failures a rerun cannot fix
+OUTCOME_ABANDONED = "abandoned"  # The user started the preset fresh
+
+RESUME_TTL = 24 * 3600  # An unfinished run older than this is not resumed (one event day)
+
+def preset_fingerprint(preset):
+    """Stable hash of a preset's label and actions; a changed preset never resumes an old run."""
+    raw = json.dumps({"label": preset.get("label"), "actions": preset.get("actions", [])},
+                     sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+class JobJournal:
+    """
+    Append-only write-ahead journal of preset runs (JSON lines, fsynced).
+    Every completed stage of every action is recorded with its IDs, so an
+    interrupted run of the same preset resumes where it stopped instead of
+    creating duplicate tournaments or re-posting codes. Runs left open for
+    longer than resume_ttl are not resumed (and dropped by compact()).
+    A run is claimed by the job executing it until release_run(), so two
+    jobs of the same preset never resume the same run at once.
+    """
+    def __init__(self, path=None, resume_ttl=RESUME_TTL):
+        self.path = path or config_manager.app_data_path(JOURNAL_FILE)
+        self.resume_ttl = resume_ttl
+        self.lock = threading.Lock()
+        self.runs = {}  # run_id -> {"fingerprint", "label", "started", "finished", "actions": {key: state}}
+        self.active = set()  # run_ids claimed by a job in progress
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        self._apply(json.loads(line))
+                    except ValueError:
+                        # A torn last line from a crash mid-write is expected; skip it
+                        continue
+        except Exception as e:
+            print(f"Error loading job journal: {e}", file=sys.stderr)
+
+    def _apply(self, record):
+        run_id = record["run_id"]
+        event = record["event"]
+        if event == "run_started":
+            self.runs[run_id] = {"fingerprint": record["fingerprint"], "label": record.get("label", ""),
+                                 "started": record.get("ts", 0), "finished": False, "actions": {}}
+        elif run_id not in self.runs:
+            return
+        elif event == "stage":
+            state = self.runs[run_id]["actions"].setdefault(str(record["action"]), {})
+            state.update(record.get("data", {}))
+            state["stage"] = record["stage"]
+        elif event == "run_finished":
+            self.runs[run_id]["finished"] = True
+
+    def _append(self, record):
+        with self.lock:
+            self._append_locked(record)
+
+    def _append_locked(self, record):
+        record["ts"] = time.time()
+        self._apply(record)
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception as e:
+            print(f"Error writing job journal: {e}", file=sys.stderr)
+
+    def _resumable(self, run):
+        return not run["finished"] and time.time() - run["started"] <= self.resume_ttl
+
+    def _find_run_locked(self, fingerprint):
+        for run_id, run in self.runs.items():
+            if run["fingerprint"] == fingerprint and self._resumable(run) and run_id not in self.active:
+                return run_id
+        return None
+
+    def find_run(self, preset):
+        """The unfinished, unclaimed run of this preset that a new run would resume, or None."""
+        with self.lock:
+            return self._find_run_locked(preset_fingerprint(preset))
+
+    def start_run(self, preset):
+        """
+        Claim a run for this preset and return its ID: the unfinished run of
+        the same preset if there is one no other job holds (resume),
+        otherwise a new run. Pair with release_run().
+        """
+        fingerprint = preset_fingerprint(preset)
+        with self.lock:
+            run_id = self._find_run_locked(fingerprint)
+            if run_id is None:
+                run_id = uuid.uuid4().hex
+                self._append_locked({"run_id": run_id, "event": "run_started", "fingerprint": fingerprint,
+                                     "label": preset.get("label", "")})
+            self.active.add(run_id)
+        return run_id
+
+    def release_run(self, run_id):
+        """Give up the claim start_run() took; an unfinished run becomes resumable again."""
+        with self.lock:
+            self.active.discard(run_id)
+
+    def action_state(self, run_id, action_key):
+        """Recorded state of one action: {"stage", "tournament_id", "code"} or {}."""
+        with self.lock:
+            run = self.runs.get(run_id)
+            return dict(run["actions"].get(str(action_key), {})) if run else {}
+
+    def record(self, run_id, action_key, stage, **data):
+        self._append({"run_id": run_id, "event": "stage", "action": str(action_key), "stage": stage, "data": data})
+
+    def finish_run(self, run_id, outcome=OUTCOME_COMPLETED):
+        """Close a run; the next run of its preset starts fresh."""
+        self._append({"run_id": run_id, "event": "run_finished", "outcome": outcome})
+
+    def abandon_run(self, preset):
+        """Close the resumable run of this preset, if any, so the next run starts fresh. Returns its ID."""
+        run_id = self.find_run(preset)
+        if run_id:
+            self.finish_run(run_id, OUTCOME_ABANDONED)
+        return run_id
+
+    def unfinished_runs(self):
+        with self.lock:
+            return {run_id: run["label"] for run_id, run in self.runs.items() if self._resumable(run)}
+
+    def compact(self):
+        """Rewrite the journal keeping only resumable and claimed runs."""
+        with self.lock:
+            self.runs = {k: r for k, r in self.runs.items() if self._resumable(r) or k in self.active}
+            tmp_path = self.path + ".tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    for run_id, run in self.runs.items():
+                        f.write(json.dumps({"run_id": run_id, "event": "run_started",
+                                            "fingerprint": run["fingerprint"], "label": run["label"],
+                                            "ts": run["started"]},
+                                           ensure_ascii=False) + "\n")
+                        for key, state in run["actions"].items():
+                            data = {k: v for k, v in state.items() if k != "stage"}
+                            f.write(json.dumps({"run_id": run_id, "event": "stage", "action": key,
+                                                "stage": state["stage"], "data": data},
+                                               ensure_ascii=False) + "\n")
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                print(f"Error compacting job journal: {e}", file=sys.stderr)
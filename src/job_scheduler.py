@@ -0,0 +1,209 @@
+import heapq
+import itertools
+import sys
+import threading
+import time
+import uuid
+
+PRIORITY_URGENT = 0
+PRIORITY_NORMAL = 10
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+# Per-action states
+ACTION_PENDING = "pending"
+ACTION_OK = "ok"
+ACTION_FAILED = "failed"
+
+class Job:
+    """One queued preset run and its per-action progress."""
+    def __init__(self, preset, priority=PRIORITY_NORMAL, label=None, plan=None):
+        self.id = uuid.uuid4().hex[:8]
+        self.preset = preset
+        # Optional ExecutionPlan the job was previewed with; the run executes it as-is
+        self.plan = plan
+        self.label = label or preset.get("label", "")
+        self.priority = priority
+        self.state = QUEUED
+        self.actions = [ACTION_PENDING] * len(preset.get("actions", []))
+        self.summary = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        # Set by cancel(); the runner stops starting new work once it is set
+        self.cancel_event = threading.Event()
+
+    @property
+    def total(self):
+        return len(self.actions)
+
+    @property
+    def done(self):
+        return sum(1 for a in self.actions if a != ACTION_PENDING)
+
+    @property
+    def failed(self):
+        return sum(1 for a in self.actions if a == ACTION_FAILED)
+
+    def snapshot(self):
+        return {"id": self.id, "label": self.label, "priority": self.priority, "state": self.state,
+                "done": self.done, "failed": self.failed, "total": self.total,
+                "actions": list(self.actions), "error": self.error}
+
+
+class JobScheduler:
+    """
+    Runs preset jobs on a fixed number of worker threads.
+    Jobs wait in a priority queue (lower priority value first, then FIFO),
+    so an urgent reschedule jumps ahead of the queued rounds. Queued jobs
+    are cancelled outright; running jobs get their cancel_event set and
+    stop at the next action boundary.
+
+    run_job(job, on_result) does the work and returns the run summary;
+    on_result(index, result) must be passed to the runner so per-action
+    progress is tracked. on_update(job) is called from worker threads on
+    every state or progress change.
+    """
+    def __init__(self, run_job, workers=1, on_update=None, keep_finished=50):
+        self.run_job = run_job
+        self.on_update = on_update
+        self.keep_finished = keep_finished
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.heap = []  # (priority, seq, job)
+        self.seq = itertools.count()
+        self.jobs_by_id = {}  # every job still listed, in submission order
+        self.threads = []
+        self.target_workers = 0
+        self.running = True
+        self.set_workers(workers)
+
+    # --- Public API ---
+    def submit(self, preset, priority=PRIORITY_NORMAL, label=None, plan=None):
+        job = Job(preset, priority, label, plan)
+        with self.lock:
+            self.jobs_by_id[job.id] = job
+            heapq.heappush(self.heap, (priority, next(self.seq), job))
+            self._prune()
+            self.wakeup.notify()
+        self._notify(job)
+        return job
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job. Returns False if it already finished."""
+        with self.lock:
+            job = self.jobs_by_id.get(job_id)
+            if job is None or job.state in FINISHED_STATES:
+                return False
+            job.cancel_event.set()
+            if job.state == QUEUED:
+                # Left in the heap; workers skip cancelled entries
+                job.state = CANCELLED
+                job.finished = time.time()
+        self._notify(job)
+        return True
+
+    def cancel_all(self):
+        with self.lock:
+            ids = [job.id for job in self.jobs_by_id.values() if job.state not in FINISHED_STATES]
+        for job_id in ids:
+            self.cancel(job_id)
+
+    def jobs(self):
+        """Snapshots of every listed job, in submission order."""
+        with self.lock:
+            return [job.snapshot() for job in self.jobs_by_id.values()]
+
+    def active_count(self):
+        with self.lock:
+            return sum(1 for job in self.jobs_by_id.values() if job.state not in FINISHED_STATES)
+
+    def set_workers(self, workers):
+        """Change the number of jobs that run at once."""
+        with self.lock:
+            self.target_workers = max(1, int(workers))
+            while len(self.threads) < self.target_workers:
+                thread = threading.Thread(target=self._worker, args=(len(self.threads),), daemon=True)
+                self.threads.append(thread)
+                thread.start()
+            self.wakeup.notify_all()
+
+    def wait(self, timeout=None):
+        """Block until no job is queued or running. Returns True if idle."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.active_count():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def shutdown(self, cancel=True):
+        if cancel:
+            self.cancel_all()
+        with self.lock:
+            self.running = False
+            self.wakeup.notify_all()
+
+    # --- Workers ---
+    def _next_job(self, slot):
+        with self.lock:
+            while True:
+                if not self.running:
+                    return None
+                # Surplus workers (after set_workers lowered the count) stay idle
+                if slot < self.target_workers:
+                    while self.heap and self.heap[0][2].state != QUEUED:
+                        heapq.heappop(self.heap)
+                    if self.heap:
+                        job = heapq.heappop(self.heap)[2]
+                        job.state = RUNNING
+                        job.started = time.time()
+                        return job
+                self.wakeup.wait()
+
+    def _worker(self, slot):
+        while True:
+            job = self._next_job(slot)
+            if job is None:
+                return
+            self._notify(job)
+
+            def on_result(index, result, job=job):
+                with self.lock:
+                    if 0 <= index < len(job.actions):
+                        job.actions[index] = ACTION_OK if result.get("success") else ACTION_FAILED
+                self._notify(job)
+
+            try:
+                job.summary = self.run_job(job, on_result)
+            except Exception as e:
+                job.error = str(e)
+            with self.lock:
+                job.finished = time.time()
+                if job.cancel_event.is_set():
+                    job.state = CANCELLED
+                elif job.error or (job.summary and job.summary["success_count"] < job.summary["total_count"]):
+                    job.state = FAILED
+                else:
+                    job.state = DONE
+            self._notify(job)
+
+    def _notify(self, job):
+        if self.on_update:
+            try:
+                self.on_update(job)
+            except Exception as e:
+                print(f"Job update handler failed: {e}", file=sys.stderr)
+
+    def _prune(self):
+        # Keep the list bounded: drop the oldest finished jobs
+        finished = [job_id for job_id, job in self.jobs_by_id.items() if job.state in FINISHED_STATES]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self.jobs_by_id[job_id]
@@ -1,24 +1,278 @@
+import argparse
+import csv
+import json
 import os
 import sys
+import threading
 import config_manager
 from api_client import RiotTournamentClient
+from preset_manager import get_repository
+from preset_runner import PresetRunner, DEFAULT_CODE_SETTINGS
+from tournament_cache import TournamentCache
+from job_journal import JobJournal
+from idempotency import IdempotencyStore
+from transports import create_transport, create_fallback_transport, TransportError, TRANSPORTS
+import circuit_breaker
+from metrics import get_metrics, export_default
+from job_scheduler import JobScheduler, CANCELLED, DONE
+from provider_registry import get_registry, callback_url
+from code_ledger import get_ledger
+
+def load_bracket(path):
+    """
+    Load a bracket file into a list of preset-style actions.
+    Supported formats:
+      - CSV with a header row: name, url, and optional api_name, region,
+        metadata, map_type, pick_type, team_size, spectator_type columns
+      - JSON: a list of actions, a single preset ({"label", "actions"}),
+        or a presets.json-style list of presets (actions are concatenated)
+    """
+    if path.lower().endswith(".csv"):
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            actions = [{k: v.strip() for k, v in row.items() if k and v and v.strip()}
+                       for row in csv.DictReader(f)]
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = [data]
+        actions = []
+        for item in data:
+            if isinstance(item, dict) and "actions" in item:
+                actions.extend(item["actions"])
+            else:
+                actions.append(item)
+
+    for i, action in enumerate(actions):
+        if not action.get("name"):
+            raise ValueError(f"Match #{i + 1} has no name")
+        if "team_size" in action:
+            action["team_size"] = int(action["team_size"])
+        unknown = set(action) - {"name", "url", "api_name", "region", "metadata"} - set(DEFAULT_CODE_SETTINGS)
+        if unknown:
+            print(f"Warning: match '{action['name']}' has unknown fields {sorted(unknown)}", file=sys.stderr)
+    return actions
+
+def load_jobs(args):
+    """Presets to run, in command-line order (--preset labels first, then --bracket files)."""
+    presets = []
+    for label in args.preset or []:
+        preset = get_repository().find_by_label(label)
+        if not preset:
+            raise ValueError(f"Preset not found: {label}")
+        presets.append(preset)
+    for path in args.bracket or []:
+        try:
+            presets.append({"label": os.path.basename(path), "actions": load_bracket(path)})
+        except Exception as e:
+            raise ValueError(f"Failed to load bracket {path}: {e}")
+    return presets
+
+def default_provider(config, use_stub):
+    """
+    Provider of the configured region in the effective stub/prod mode:
+    config provider_id if it is one of them, else the oldest, else None.
+    """
+    ids = get_registry().providers(config.get("region", "KR"), use_stub)
+    if config.get("provider_id") in ids:
+        return config["provider_id"]
+    return ids[0] if ids else None
+
+def run_bulk(args):
+    """
+    Headless bulk generation. Every --preset/--bracket is compiled into an
+    execution plan and becomes a job on the scheduler; one JSON line per
+    match is streamed as it completes. --dry-run prints the plans instead.
+    Ctrl+C cancels the jobs; a rerun resumes them from the journal.
+    """
+    config = config_manager.load_config()
+    use_stub = config.get("use_stub", True) if args.stub is None else args.stub
+    mode = "stub" if use_stub else "production"
+    if args.provider_id:
+        entry = get_registry().entry(args.provider_id)
+        if entry and entry["stub"] != use_stub:
+            print(f"Provider {args.provider_id} is registered for {'stub' if entry['stub'] else 'production'}, "
+                  f"not {mode} mode", file=sys.stderr)
+            return 1
+
+    try:
+        presets = load_jobs(args)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    if args.transport:
+        config["transport"] = args.transport
+    try:
+        transport = create_transport(config)
+        fallback = create_fallback_transport(config)
+    except TransportError as e:
+        print(f"Transport error: {e}", file=sys.stderr)
+        return 1
+    circuit_breaker.configure(config)
+
+    concurrency = args.concurrency or config.get("max_concurrency", 4)
+    client = RiotTournamentClient(use_stub=use_stub, pool_size=max(concurrency, config.get("pool_size", 10)),
+                                  max_retries=config.get("max_retries", 3), transport=transport,
+                                  idempotency=None if args.no_resume else IdempotencyStore(), fallback=fallback)
+    runner = PresetRunner(client, max_workers=concurrency,
+                          batch=not args.no_batch,
+                          cache=TournamentCache(ttl=config.get("tournament_cache_ttl", 43200)),
+                          region=config.get("region", "KR"),
+                          journal=None if args.no_resume else JobJournal(),
+                          # An explicit --provider-id pins every match to that provider
+                          providers=None if args.provider_id else get_registry(),
+                          providers_per_region=args.providers_per_region or config.get("providers_per_region", 1),
+                          ledger=None if args.dry_run else get_ledger())
+    if args.dry_run:
+        # Plans only: no backend call, no provider, nothing journaled
+        provider_id = args.provider_id or default_provider(config, use_stub)
+        for preset in presets:
+            plan = runner.plan(provider_id, preset)
+            print("\n".join(plan.describe()))
+        client.close()
+        return 0
+
+    out = open(args.out, "a", encoding="utf-8") if args.out else sys.stdout
+    if args.trace:
+        get_metrics().enable_trace(args.trace)
+    try:
+        health = client.check_health()
+        if not health["success"]:
+            print(f"Warning: {health['error']}", file=sys.stderr)
+        provider_id = args.provider_id or default_provider(config, use_stub)
+        if not provider_id:
+            res = get_registry().ensure(client, config.get("region", "KR"))
+            if not res["success"]:
+                print(f"Failed to create provider: {res['error']}", file=sys.stderr)
+                return 1
+            provider_id = res["data"][0]
+            # config provider_id is the default of the configured mode only
+            if use_stub == config.get("use_stub", True) and not config.get("provider_id"):
+                config_manager.update_config(provider_id=provider_id)
+
+        write_lock = threading.Lock()
+
+        def run_job(job, report):
+            def on_result(index, res):
+                report(index, res)
+                line = json.dumps(dict(res, index=index, job=job.label), ensure_ascii=False)
+                with write_lock:
+                    out.write(line + "\n")
+                    out.flush()
+            return runner.run(provider_id, job.preset, on_result=on_result, cancel=job.cancel_event, plan=job.plan)
+
+        scheduler = JobScheduler(run_job, workers=args.workers or config.get("job_workers", 1))
+        jobs = []
+        for preset in presets:
+            plan = runner.plan(provider_id, preset)
+            estimate = plan.estimate()
+            print(f"{plan.label}: {estimate['total_calls']} calls planned, ~{estimate['wall_s']:.1f}s",
+                  file=sys.stderr)
+            jobs.append(scheduler.submit(preset, plan=plan))
+        try:
+            scheduler.wait()
+        except KeyboardInterrupt:
+            print("Cancelling... (in-flight requests finish first; rerun to resume)", file=sys.stderr)
+            scheduler.cancel_all()
+            scheduler.wait()
+        scheduler.shutdown()
+
+        for job in jobs:
+            summary = job.summary or {"success_count": 0, "total_count": job.total}
+            print(f"{job.label}: {job.state} - {summary['success_count']}/{summary['total_count']} matches succeeded"
+                  + (f" ({job.error})" if job.error else ""), file=sys.stderr)
+        if any(job.state == CANCELLED for job in jobs):
+            return 130
+        return 0 if all(job.state == DONE for job in jobs) else 2
+    finally:
+        client.close()
+        get_ledger().close()
+        if args.out:
+            out.close()
+        if args.metrics_out:
+            get_metrics().write(args.metrics_out)
+        if config.get("metrics_export", True):
+            # Recorded latencies feed the estimates of later --dry-run plans
+            export_default()
+        get_metrics().enable_trace(None)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="LOL Tournament Code Generator (CLI)")
+    parser.add_argument("--bracket", action="append",
+                        help="CSV/JSON bracket file to generate codes for (headless mode; repeatable)")
+    parser.add_argument("--preset", action="append", help="Label of a saved preset to run (headless mode; repeatable)")
+    parser.add_argument("--concurrency", type=int, help="Matches in flight at once (default: config max_concurrency)")
+    parser.add_argument("--workers", type=int, help="Presets/brackets run at the same time (default: config job_workers)")
+    parser.add_argument("--out", help="Append JSONL results to this file instead of stdout")
+    parser.add_argument("--provider-id", type=int,
+                        help="Provider ID to use (default: the configured region's provider in the selected mode)")
+    parser.add_argument("--providers-per-region", type=int,
+                        help="Providers to shard matches across in each region (default: config providers_per_region)")
+    parser.add_argument("--no-batch", action="store_true", help="Mint one code per /codes call")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Print the execution plan (calls per endpoint, estimated wall time) without running it")
+    parser.add_argument("--transport", choices=TRANSPORTS, help="Backend route (default: config transport)")
+    parser.add_argument("--metrics-out", help="Write call metrics here when done (.prom = Prometheus text, else JSON)")
+    parser.add_argument("--trace", help="Append one JSON line per backend/webhook call to this file")
+    parser.add_argument("--find-code", metavar="QUERY",
+                        help="Look up the code ledger by code, tournament ID, metadata or match name, then exit")
+    parser.add_argument("--export-codes", metavar="PATH",
+                        help="Export the code ledger to PATH (.csv, else JSONL), then exit")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="Don't journal this run or resume an interrupted run of the same bracket")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--stub", dest="stub", action="store_true", default=None, help="Use the Stub API")
+    mode.add_argument("--production", dest="stub", action="store_false", help="Use the Production API")
+    return parser.parse_args(argv)
+
+def ledger_command(args):
+    """--find-code / --export-codes: read the local code ledger without touching the backend."""
+    ledger = get_ledger()
+    try:
+        if args.export_codes:
+            count = ledger.export(args.export_codes)
+            print(f"Exported {count} codes to {args.export_codes}", file=sys.stderr)
+        if args.find_code:
+            rows = ledger.lookup(args.find_code)
+            for row in rows:
+                print(json.dumps(row, ensure_ascii=False))
+            if not rows:
+                print(f"No codes found for '{args.find_code}'", file=sys.stderr)
+                return 1
+        return 0
+    finally:
+        ledger.close()
 
 def main():
+    args = parse_args()
+    if args.find_code or args.export_codes:
+        sys.exit(ledger_command(args))
+    if args.bracket or args.preset:
+        sys.exit(run_bulk(args))
+    interactive()
+
+def interactive():
     print("=== LOL Tournament Code Generator (CLI) ===")
     
     # 0. Setup Client
-    # All API requests are now routed through a secure backend (GAS).
-    # No local API key is required.
+    # By default all API requests are routed through a secure backend (GAS)
+    # and no local API key is required (see config "transport").
     config = config_manager.load_config()
-    client = RiotTournamentClient(use_stub=config.get("use_stub", True))
+    try:
+        transport = create_transport(config)
+    except TransportError as e:
+        print(f"Transport error: {e}")
+        return
+    client = RiotTournamentClient(use_stub=config.get("use_stub", True), transport=transport)
     
     # Ask for the Target Region (where the game is played)
     target_region = input("Enter Target Region (default: KR): ").strip().upper() or "KR"
 
     # 1. Create Provider
     print("\n--- Step 1: Create Provider ---")
-    provider_url = "http://example.com/callback" # Dummy URL used for Stub
-    print(f"Using Dummy Callback URL: {provider_url}")
+    provider_url = callback_url(config)
+    print(f"Using Callback URL: {provider_url}")
     print(f"Creating Provider for Region: {target_region}")
     
     resp_provider = client.create_provider(region=target_region, url=provider_url)
@@ -0,0 +1,215 @@
+import json
+import os
+import sys
+import threading
+import time
+import config_manager
+
+# In the app-data dir
+METRICS_PROM_FILE = "metrics.prom"
+METRICS_JSON_FILE = "metrics.json"
+TRACE_FILE = "trace.jsonl"
+
+# Latency buckets (seconds): sized for a 50 ms relay up to a cold GAS start with retries
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 30.0)
+# Request body buckets (bytes)
+SIZE_BUCKETS = (128, 256, 512, 1024, 4096, 16384, 65536)
+
+def _finite(value):
+    return None if value == float("inf") else value
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (an estimate, like histogram_quantile)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": {str(b): n for b, n in zip(self.buckets + ("+Inf",), self._cumulative())},
+            # None when the quantile falls in the +Inf bucket (JSON has no infinity)
+            "p50": _finite(self.quantile(0.5)),
+            "p95": _finite(self.quantile(0.95)),
+            "p99": _finite(self.quantile(0.99))
+        }
+
+    def _cumulative(self):
+        total = 0
+        result = []
+        for n in self.counts:
+            total += n
+            result.append(total)
+        return result
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+def _format_labels(key, extra=None):
+    pairs = list(key) + (extra or [])
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class Metrics:
+    """
+    In-process counters and histograms for every outbound call, plus an
+    optional JSONL trace with one line per call.
+    Calls are labelled by leg ("gas", "direct", "relay" or "discord"),
+    endpoint and stub/prod mode, so a slow leg stands out during an event.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}  # name -> {label key: value}
+        self.histograms = {}  # name -> {label key: Histogram}
+        self.trace_file = None
+        self.started = time.time()
+
+    # --- Recording ---
+    def inc(self, name, labels, amount=1):
+        key = _label_key(labels)
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name, labels, value, buckets=LATENCY_BUCKETS):
+        key = _label_key(labels)
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram(buckets)
+            series[key].observe(value)
+
+    def record_call(self, leg, endpoint, mode, status, latency, retries=0, payload_size=0):
+        """
+        Record one logical call (all of its attempts).
+        status is the final HTTP status code, or a word like "timeout"/"error".
+        """
+        labels = {"leg": leg, "endpoint": endpoint, "mode": mode}
+        self.inc("calls_total", dict(labels, status=str(status)))
+        if retries:
+            self.inc("retries_total", labels, retries)
+        self.inc("payload_bytes_total", labels, payload_size)
+        self.observe("call_latency_seconds", labels, latency)
+        self.observe("payload_bytes", labels, payload_size, SIZE_BUCKETS)
+        self._trace({"ts": round(time.time(), 3), "leg": leg, "endpoint": endpoint, "mode": mode,
+                     "status": status, "latency_ms": round(latency * 1000, 1), "retries": retries,
+                     "payload_bytes": payload_size})
+
+    # --- Trace log ---
+    def enable_trace(self, path):
+        """Append one JSON line per call to path (None disables tracing)."""
+        with self.lock:
+            if self.trace_file:
+                self.trace_file.close()
+                self.trace_file = None
+            if path:
+                self.trace_file = open(path, "a", encoding="utf-8", buffering=1)
+
+    def _trace(self, record):
+        if self.trace_file is None:
+            return
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self.lock:
+            try:
+                if self.trace_file:
+                    self.trace_file.write(line)
+            except Exception as e:
+                print(f"Error writing trace log: {e}", file=sys.stderr)
+
+    # --- Export ---
+    def snapshot(self):
+        """JSON-serializable view of every counter and histogram."""
+        with self.lock:
+            return {
+                "started": self.started,
+                "uptime_s": time.time() - self.started,
+                "counters": {name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                             for name, series in self.counters.items()},
+                "histograms": {name: [dict(h.snapshot(), labels=dict(key)) for key, h in series.items()]
+                               for name, series in self.histograms.items()}
+            }
+
+    def to_prometheus(self):
+        """Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            for name, series in sorted(self.counters.items()):
+                lines.append(f"# TYPE lol_{name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"lol_{name}{_format_labels(key)} {value}")
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f"# TYPE lol_{name} histogram")
+                for key, h in sorted(series.items()):
+                    for bound, n in zip(h.buckets + ("+Inf",), h._cumulative()):
+                        lines.append(f"lol_{name}_bucket{_format_labels(key, [('le', bound)])} {n}")
+                    lines.append(f"lol_{name}_sum{_format_labels(key)} {h.sum}")
+                    lines.append(f"lol_{name}_count{_format_labels(key)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Export to path atomically: Prometheus text for *.prom/*.txt, JSON otherwise."""
+        if path.endswith((".prom", ".txt")):
+            data = self.to_prometheus()
+        else:
+            data = json.dumps(self.snapshot(), indent=2, ensure_ascii=False)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error writing metrics: {e}", file=sys.stderr)
+
+    def reset(self):
+        with self.lock:
+            self.counters = {}
+            self.histograms = {}
+            self.started = time.time()
+
+
+_metrics = Metrics()
+
+def get_metrics():
+    """Process-wide metrics registry."""
+    return _metrics
+
+def mode_label(use_stub):
+    return "stub" if use_stub else "prod"
+
+def configure(config):
+    """Apply the trace_log setting (the JSONL trace goes to TRACE_FILE)."""
+    _metrics.enable_trace(config_manager.app_data_path(TRACE_FILE) if config.get("trace_log") else None)
+
+def export_default():
+    """Write metrics.prom and metrics.json to the app-data dir."""
+    _metrics.write(config_manager.app_data_path(METRICS_PROM_FILE))
+    _metrics.write(config_manager.app_data_path(METRICS_JSON_FILE))
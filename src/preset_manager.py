@@ -0,0 +1,321 @@
+import copy
+import json
+import os
+import sqlite3
+import sys
+import threading
+import uuid
+import config_manager
+
+def resource_path(relative_path):
+    """ Get absolute path to resource, works for dev and for PyInstaller """
+    try:
+        # PyInstaller creates a temp folder and stores path in _MEIPASS
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+
+    return os.path.join(base_path, relative_path)
+
+# In the app-data dir
+PRESETS_FILE = "presets.json"
+PRESETS_DB = "presets.db"
+
+def _read_legacy_presets():
+    """Presets from the old presets.json, or the bundled example on first run."""
+    # 1. Try loading actual presets
+    presets_file = config_manager.app_data_path(PRESETS_FILE)
+    if os.path.exists(presets_file):
+        try:
+            with open(presets_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Error loading presets: {e}", file=sys.stderr)
+            return []
+            
+    # 2. Fallback to bundled example file if exists
+    example_path = resource_path("presets.json.example")
+    if os.path.exists(example_path):
+        try:
+            with open(example_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Error loading bundled example: {e}", file=sys.stderr)
+            
+    return []
+
+def _file_signature(path):
+    # Size too, since coarse mtime resolution can hide a quick second edit
+    try:
+        stat = os.stat(path)
+        return json.dumps([stat.st_mtime_ns, stat.st_size])
+    except OSError:
+        return None
+
+def _record_data(preset):
+    """Serialized preset without its ID (the ID is the row key)."""
+    return json.dumps({k: v for k, v in preset.items() if k != "id"}, sort_keys=True, ensure_ascii=False)
+
+class PresetRepository:
+    """
+    SQLite-backed preset store.
+    Every preset has a stable ID; an in-memory label -> ID index serves
+    lookups, and writes touch only the records that actually changed
+    instead of rewriting every preset. On first use the existing
+    presets.json (or the bundled example) is imported.
+    presets.json is kept as a mirror: every write re-exports it, and when
+    it changes on disk (edited by hand or restored from a backup) the
+    store is synced from it on the next read.
+    """
+    def __init__(self, path=None, json_path=None):
+        self.path = path or config_manager.app_data_path(PRESETS_DB)
+        self.json_path = json_path or config_manager.app_data_path(PRESETS_FILE)
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS presets ("
+                          "id TEXT PRIMARY KEY, position INTEGER NOT NULL, label TEXT NOT NULL, data TEXT NOT NULL)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.commit()
+
+        self.records = {}  # id -> preset dict (with "id")
+        self.order = []  # ids by position
+        self.label_index = {}  # label -> id of the first preset with that label
+        self._load()
+
+        if self._meta("imported") is None:
+            self.import_presets(_read_legacy_presets())
+            self._set_meta("imported", "1")
+        elif not os.path.exists(self.json_path):
+            self._export()
+        else:
+            self._sync_from_json()
+
+    def _meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+            self.conn.commit()
+
+    def _load(self):
+        rows = self.conn.execute("SELECT id, data FROM presets ORDER BY position").fetchall()
+        for preset_id, data in rows:
+            preset = json.loads(data)
+            preset["id"] = preset_id
+            self.records[preset_id] = preset
+            self.order.append(preset_id)
+        self._rebuild_index()
+
+    def _rebuild_index(self):
+        self.label_index = {}
+        for preset_id in self.order:
+            self.label_index.setdefault(self.records[preset_id].get("label", ""), preset_id)
+
+    # --- presets.json mirror ---
+    def _export(self):
+        """Rewrite presets.json from the store (atomically) and remember its signature."""
+        tmp_path = self.json_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump([self.records[i] for i in self.order], f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.json_path)
+            self._set_meta("json_signature", _file_signature(self.json_path))
+        except Exception as e:
+            print(f"Error exporting presets: {e}", file=sys.stderr)
+
+    def _sync_from_json(self):
+        """Make the store match presets.json if it changed since the last export."""
+        signature = _file_signature(self.json_path)
+        if signature is None or signature == self._meta("json_signature"):
+            return
+        try:
+            with open(self.json_path, "r", encoding="utf-8") as f:
+                presets = json.load(f)
+        except Exception as e:
+            print(f"Error loading presets: {e}", file=sys.stderr)
+            # Don't retry (and re-report) the same broken file on every read
+            self._set_meta("json_signature", signature)
+            return
+        # Presets without an ID (hand-written or old exports) keep the ID of the same label
+        used = {p["id"] for p in presets if p.get("id") in self.records}
+        for preset in presets:
+            if not preset.get("id"):
+                preset_id = self.label_index.get(preset.get("label", ""))
+                if preset_id and preset_id not in used:
+                    preset["id"] = preset_id
+                    used.add(preset_id)
+        self.save_all(presets)
+
+    # --- Reads ---
+    def all(self):
+        """All presets in display order (copies, each with its "id")."""
+        with self.lock:
+            self._sync_from_json()
+            return [copy.deepcopy(self.records[i]) for i in self.order]
+
+    def get(self, preset_id):
+        with self.lock:
+            self._sync_from_json()
+            preset = self.records.get(preset_id)
+            return copy.deepcopy(preset) if preset else None
+
+    def id_for_label(self, label):
+        with self.lock:
+            self._sync_from_json()
+            return self.label_index.get(label)
+
+    def find_by_label(self, label):
+        return self.get(self.id_for_label(label))
+
+    # --- Writes ---
+    def put(self, preset):
+        """Insert or update one preset. Returns its ID (assigned if missing)."""
+        with self.lock:
+            preset_id, changed = self._put(preset)
+            if changed:
+                self._export()
+            return preset_id
+
+    def _put(self, preset):
+        """put() without the presets.json export. Returns (ID, whether anything was written)."""
+        preset = copy.deepcopy(preset)
+        preset_id = preset.get("id") or uuid.uuid4().hex
+        preset["id"] = preset_id
+        if preset_id not in self.records:
+            self.order.append(preset_id)
+        elif _record_data(self.records[preset_id]) == _record_data(preset):
+            return preset_id, False
+        self.records[preset_id] = preset
+        self.conn.execute("INSERT OR REPLACE INTO presets (id, position, label, data) VALUES (?, ?, ?, ?)",
+                          (preset_id, self.order.index(preset_id), preset.get("label", ""), _record_data(preset)))
+        self.conn.commit()
+        self._rebuild_index()
+        return preset_id, True
+
+    def delete(self, preset_id):
+        """Delete one preset (a single row; the other records are untouched)."""
+        with self.lock:
+            if preset_id not in self.records:
+                return False
+            del self.records[preset_id]
+            self.order.remove(preset_id)
+            self.conn.execute("DELETE FROM presets WHERE id = ?", (preset_id,))
+            self.conn.commit()
+            self._rebuild_index()
+            self._export()
+            return True
+
+    def save_all(self, presets):
+        """
+        Make the store match a full preset list, writing only the diff:
+        changed or new records, moved positions and deleted IDs.
+        Presets without an "id" get one (written back into the given dicts).
+        """
+        with self.lock:
+            for preset in presets:
+                preset.setdefault("id", uuid.uuid4().hex)
+            new_order = [p["id"] for p in presets]
+            old_positions = {pid: i for i, pid in enumerate(self.order)}
+
+            removed = set(self.records) - set(new_order)
+            for preset_id in removed:
+                self.conn.execute("DELETE FROM presets WHERE id = ?", (preset_id,))
+                del self.records[preset_id]
+
+            for position, preset in enumerate(presets):
+                preset_id = preset["id"]
+                existing = self.records.get(preset_id)
+                if existing is None or _record_data(existing) != _record_data(preset):
+                    self.conn.execute("INSERT OR REPLACE INTO presets (id, position, label, data) VALUES (?, ?, ?, ?)",
+                                      (preset_id, position, preset.get("label", ""), _record_data(preset)))
+                    self.records[preset_id] = copy.deepcopy(preset)
+                elif old_positions.get(preset_id) != position:
+                    self.conn.execute("UPDATE presets SET position = ? WHERE id = ?", (position, preset_id))
+
+            self.conn.commit()
+            self.order = new_order
+            self._rebuild_index()
+            self._export()
+            return True
+
+    def import_presets(self, presets):
+        """Append presets (e.g. from a presets.json export) under new IDs."""
+        with self.lock:
+            for preset in presets:
+                self._put({k: v for k, v in preset.items() if k != "id"})
+            self._export()
+
+    def export_json(self, path):
+        """Write all presets to a presets.json-style file (IDs stripped)."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump([{k: v for k, v in p.items() if k != "id"} for p in self.all()],
+                      f, indent=2, ensure_ascii=False)
+
+_repository = None
+_repository_lock = threading.Lock()
+
+def get_repository():
+    """Process-wide preset repository."""
+    global _repository
+    with _repository_lock:
+        if _repository is None:
+            _repository = PresetRepository()
+        return _repository
+
+def load_presets_file():
+    """All presets in display order (each carries its stable "id")."""
+    try:
+        return get_repository().all()
+    except Exception as e:
+        print(f"Error loading presets: {e}", file=sys.stderr)
+        return []
+
+def save_presets_file(data):
+    """Persist a full preset list; only changed records are written."""
+    try:
+        return get_repository().save_all(data)
+    except Exception as e:
+        print(f"Error saving presets: {e}", file=sys.stderr)
+        return False
+
+def _label_tokens(label):
+    return [t for t in "".join(c.lower() if c.isalnum() else " " for c in label).split() if t]
+
+class LabelSearchIndex:
+    """
+    Token-prefix index over preset labels for the search box.
+    Each word of a label is indexed by its prefixes, so a query matches
+    presets whose words start with every query word ("grp a" -> "Group A").
+    """
+    MAX_PREFIX = 12
+
+    def __init__(self, labels=()):
+        self.rebuild(labels)
+
+    def rebuild(self, labels):
+        self.labels = list(labels)
+        self.prefixes = {}  # prefix -> set of label positions
+        for position, label in enumerate(self.labels):
+            for token in _label_tokens(label):
+                for length in range(1, min(len(token), self.MAX_PREFIX) + 1):
+                    self.prefixes.setdefault(token[:length], set()).add(position)
+
+    def search(self, query):
+        """Positions of matching labels in their original order. Empty query matches all."""
+        tokens = _label_tokens(query)
+        if not tokens:
+            return list(range(len(self.labels)))
+
+        matches = None
+        for token in tokens:
+            candidates = self.prefixes.get(token[:self.MAX_PREFIX], set())
+            if len(token) > self.MAX_PREFIX:
+                # Long words: confirm the full prefix against the label itself
+                candidates = {p for p in candidates
+                              if any(t.startswith(token) for t in _label_tokens(self.labels[p]))}
+            matches = candidates if matches is None else matches & candidates
+            if not matches:
+                return []
+        return sorted(matches)
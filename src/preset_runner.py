@@ -0,0 +1,436 @@
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from discord_helper import get_dispatcher
+from job_journal import STAGE_TOURNAMENT_CREATED, STAGE_CODE_MINTED, STAGE_WEBHOOK_SENT, OUTCOME_FAILED
+from code_ledger import SOURCE_LIVE, SOURCE_POOL
+from execution_plan import ExecutionPlan
+
+DEFAULT_MAX_WORKERS = 4
+CANCELLED_ERROR = "취소됨"
+NO_PROVIDER_ERROR = "Provider 없음"
+
+# Game settings an action may override; keys match create_codes() kwargs
+DEFAULT_CODE_SETTINGS = {
+    "map_type": "SUMMONERS_RIFT",
+    "pick_type": "TOURNAMENT_DRAFT",
+    "team_size": 5,
+    "spectator_type": "ALL"
+}
+
+def tournament_name(action):
+    return action.get("api_name", action["name"])
+
+def action_region(action, default="KR"):
+    """Region the action's code must be playable in (the action's "region", else default)."""
+    return (action.get("region") or default).upper()
+
+def action_settings(action):
+    """Game settings for an action, falling back to the defaults."""
+    return {key: action.get(key, default) for key, default in DEFAULT_CODE_SETTINGS.items()}
+
+def group_actions(actions, region="KR"):
+    """
+    Group action indices that can share one tournament and one /codes call:
+    same region, same tournament name, same game settings and same
+    "metadata" (one /codes call carries one metadata string). Groups keep
+    first-seen order.
+    """
+    groups = {}
+    for index, action in enumerate(actions):
+        settings = action_settings(action)
+        key = ((action_region(action, region), tournament_name(action), action.get("metadata", ""))
+               + tuple(settings[k] for k in sorted(settings)))
+        if key not in groups:
+            groups[key] = {"tournament_name": tournament_name(action), "settings": settings,
+                           "region": action_region(action, region), "metadata": action.get("metadata", ""),
+                           "indices": []}
+        groups[key]["indices"].append(index)
+    return list(groups.values())
+
+def single_group(actions, index, region="KR"):
+    """A group holding just one action (non-batch mode)."""
+    action = actions[index]
+    return {"tournament_name": tournament_name(action), "settings": action_settings(action),
+            "region": action_region(action, region), "metadata": action.get("metadata", ""), "indices": [index]}
+
+def default_metadata(label, group):
+    """Metadata sent with a group's codes when its actions set none: "<preset label>/<tournament name>"."""
+    return f"{label}/{group['tournament_name']}" if label else group["tournament_name"]
+
+def _new_result(action):
+    return {"name": action.get("name", ""), "success": False, "code": None, "error": None}
+
+def _call_key(run_id, kind, *parts):
+    """Idempotency key for one backend call of a journaled run (None without a run)."""
+    if not run_id:
+        return None
+    return "/".join([run_id, kind] + [str(p) for p in parts])
+
+def retryable(action, result):
+    """
+    Whether rerunning could fix a failed action: not without a webhook URL
+    (its code can never be delivered) or without a provider for its region.
+    """
+    if not action.get("url"):
+        return False
+    return not (result["error"] or "").startswith(NO_PROVIDER_ERROR)
+
+def _is_set(cancel):
+    return cancel is not None and cancel.is_set()
+
+class PresetRunner:
+    """
+    Executes the actions of a preset (tournament -> code -> webhook)
+    through a bounded thread pool. Independent of the GUI so the CLI can
+    reuse it.
+    With a ProviderRegistry, tournament groups are routed to providers of
+    their region and sharded across them; every provider (shard) gets its
+    own max_workers calls in flight.
+    """
+    def __init__(self, client, max_workers=DEFAULT_MAX_WORKERS, batch=True, cache=None, region="KR",
+                 code_pool=None, journal=None, providers=None, providers_per_region=1, ledger=None):
+        self.client = client
+        self.max_workers = max(1, int(max_workers))
+        # Batch mode mints all codes of a same-format group in one /codes call
+        self.batch = batch
+        # Optional TournamentCache: cached tournaments skip create_tournament
+        self.cache = cache
+        # Default region: actions without a "region" of their own are played here
+        self.region = region.upper()
+        # Optional CodePool: pre-minted codes are used before minting live
+        self.code_pool = code_pool
+        # Optional JobJournal: completed stages are recorded and skipped on resume
+        self.journal = journal
+        # Optional ProviderRegistry: providers per region to shard groups across
+        self.providers = providers
+        # Providers created up front in every region a run touches
+        self.providers_per_region = max(1, int(providers_per_region))
+        # Optional CodeLedger: every code handed out is recorded there
+        self.ledger = ledger
+
+    def _record(self, run_id, index, stage, **data):
+        if self.journal and run_id:
+            self.journal.record(run_id, index, stage, **data)
+
+    def _ledger_record(self, actions, index, code, group, tid, source, run_id):
+        if self.ledger:
+            self.ledger.record(code, provider_id=group.get("provider_id"), tournament_id=tid,
+                               action=actions[index].get("name", ""), preset=group.get("preset", ""),
+                               metadata=group.get("metadata", "") if source == SOURCE_LIVE else "",
+                               settings=group["settings"], region=group.get("region", self.region),
+                               use_stub=self.client.use_stub, source=source, run_id=run_id)
+
+    def _state(self, run_id, index):
+        if self.journal and run_id:
+            return self.journal.action_state(run_id, index)
+        return {}
+
+    def get_tournament(self, provider_id, name, idempotency_key=None, region=None):
+        """Return a tournament ID result, reusing a cached tournament when possible."""
+        region = region or self.region
+        if self.cache:
+            tid = self.cache.get(provider_id, region, self.client.use_stub, name)
+            if tid is not None:
+                return {"success": True, "data": tid}
+
+        t_res = self.client.create_tournament(provider_id, name, idempotency_key=idempotency_key)
+        if t_res["success"] and self.cache:
+            self.cache.put(provider_id, region, self.client.use_stub, name, t_res["data"])
+        return t_res
+
+    def missing_providers(self, groups):
+        """{region: providers assign_providers() would create} for the regions the groups touch."""
+        if not self.providers:
+            return {}
+        missing = {}
+        for region in sorted({group["region"] for group in groups}):
+            count = self.providers_per_region - len(self.providers.providers(region, self.client.use_stub))
+            if count > 0:
+                missing[region] = count
+        return missing
+
+    def assign_providers(self, provider_id, groups, create=True):
+        """
+        Set each group's "provider_id". With a registry, every region the
+        groups touch is topped up to providers_per_region providers and
+        groups are sharded across them by tournament name. Without one (or
+        when creation fails) default-region groups use provider_id and
+        others get None. Returns the number of distinct shards.
+        create=False only predicts: groups whose region still lacks
+        providers get None (their shard is decided once they exist).
+        """
+        missing = {} if create else self.missing_providers(groups)
+        if self.providers and create:
+            for region in sorted({group["region"] for group in groups}):
+                res = self.providers.ensure(self.client, region, self.providers_per_region)
+                if not res["success"]:
+                    print(f"Provider creation failed ({region}): {res['error']}", file=sys.stderr)
+        for group in groups:
+            pid = None
+            if group["region"] in missing:
+                group["provider_id"] = None
+                continue
+            if self.providers:
+                pid = self.providers.shard(group["region"], self.client.use_stub, group["tournament_name"])
+            if pid is None and group["region"] == self.region:
+                pid = provider_id
+            group["provider_id"] = pid
+        return len({group["provider_id"] for group in groups})
+
+    def run_action(self, provider_id, action):
+        """Run a single preset action. Never raises; failures are reported in the result."""
+        group = single_group([action], 0, self.region)
+        self.assign_providers(provider_id, [group])
+        minted = self.mint_group(provider_id, [action], group)
+        self.deliver([action], [0], minted)
+        return minted[0]
+
+    def mint_group(self, provider_id, actions, group, run_id=None):
+        """
+        Create one tournament and mint count=N codes for a group of actions,
+        under the group's "provider_id" if assign_providers() set one.
+        Returns {index: result} with codes filled in but webhooks not yet sent.
+        Stages already in the journal for run_id are reused, not repeated,
+        and calls carry idempotency keys derived from run_id, so a resumed run
+        gets the original answer for a call whose result never reached the journal.
+        """
+        results = {i: _new_result(actions[i]) for i in group["indices"]}
+        provider_id = group.get("provider_id", provider_id)
+        region = group.get("region", self.region)
+        # Pooled codes were minted under the default region's provider
+        code_pool = self.code_pool if region == self.region else None
+
+        # Serve what we can from the journal and the pre-minted pool; only the rest is minted live
+        pending = []
+        tid = None
+        for index in group["indices"]:
+            state = self._state(run_id, index)
+            if state.get("code"):
+                results[index]["code"] = state["code"]
+                results[index]["success"] = state["stage"] == STAGE_WEBHOOK_SENT
+                continue
+            tid = tid or state.get("tournament_id")
+            pooled = code_pool.take(group["settings"]) if code_pool else None
+            if pooled:
+                results[index]["code"] = pooled
+                self._record(run_id, index, STAGE_CODE_MINTED, code=pooled)
+                self._ledger_record(actions, index, pooled, group, None, SOURCE_POOL, run_id)
+            else:
+                pending.append(index)
+        if not pending:
+            return results
+
+        def fail(error):
+            for index in pending:
+                results[index]["error"] = error
+            return results
+
+        if provider_id is None:
+            return fail(f"{NO_PROVIDER_ERROR} ({region})")
+        try:
+            if tid is None:
+                t_res = self.get_tournament(provider_id, group["tournament_name"],
+                                            _call_key(run_id, "tournament", provider_id, group["tournament_name"]),
+                                            region)
+                if not t_res["success"]:
+                    return fail(f"토너먼트 생성 실패: {t_res['error']}")
+                tid = t_res["data"]
+                for index in pending:
+                    self._record(run_id, index, STAGE_TOURNAMENT_CREATED, tournament_id=tid)
+
+            c_res = self.client.create_codes(tid, count=len(pending), **group["settings"],
+                                             metadata=group.get("metadata", ""),
+                                             idempotency_key=_call_key(run_id, "codes", tid, *pending))
+            if not c_res["success"]:
+                return fail(f"코드 생성 실패: {c_res['error']}")
+        except Exception as e:
+            return fail(str(e))
+
+        codes = list(c_res["data"])
+        for index in pending:
+            if codes:
+                results[index]["code"] = codes.pop(0)
+                self._record(run_id, index, STAGE_CODE_MINTED, tournament_id=tid, code=results[index]["code"])
+                self._ledger_record(actions, index, results[index]["code"], group, tid, SOURCE_LIVE, run_id)
+            else:
+                results[index]["error"] = "코드 생성 실패: 발급된 코드 수 부족"
+        return results
+
+    def deliver(self, actions, indices, minted, run_id=None, on_result=None):
+        """
+        Send the minted codes of `indices` to their webhooks, coalescing
+        codes bound for the same URL. Actions already delivered (resumed
+        from the journal) or without a code are only reported.
+        """
+        by_url = {}
+        for i in indices:
+            if minted[i]["code"] and not minted[i]["success"]:
+                by_url.setdefault(actions[i].get("url", ""), []).append(i)
+
+        for url, url_indices in by_url.items():
+            entries = [(actions[i]["name"], minted[i]["code"]) for i in url_indices]
+            try:
+                sent = get_dispatcher().send_codes(url, entries)
+            except Exception as e:
+                sent = [False] * len(url_indices)
+                for i in url_indices:
+                    minted[i]["error"] = str(e)
+            for i, ok in zip(url_indices, sent):
+                minted[i]["success"] = ok
+                if ok:
+                    minted[i]["error"] = None
+                    self._record(run_id, i, STAGE_WEBHOOK_SENT)
+                    if self.ledger:
+                        self.ledger.mark_delivered(minted[i]["code"])
+                elif not minted[i]["error"]:
+                    minted[i]["error"] = "웹훅 실패"
+
+        if on_result:
+            for i in indices:
+                on_result(i, minted[i])
+
+    def skip(self, actions, indices, minted, on_result=None):
+        """Report actions as cancelled; already delivered ones keep their success."""
+        for i in indices:
+            if not minted[i]["success"]:
+                minted[i]["error"] = CANCELLED_ERROR
+        if on_result:
+            for i in indices:
+                on_result(i, minted[i])
+
+    def plan(self, provider_id, preset):
+        """
+        Compile the preset into the ExecutionPlan run() would execute now:
+        tournament groups with their shard, cached or resumed tournaments,
+        codes still to mint, coalesced webhook deliveries and the providers
+        to create. Makes no backend calls and writes nothing.
+        """
+        actions = preset.get("actions", [])
+        run_id = self.journal.find_run(preset) if self.journal else None
+
+        if self.batch:
+            groups = group_actions(actions, self.region)
+        else:
+            groups = [single_group(actions, i, self.region) for i in range(len(actions))]
+        missing = self.missing_providers(groups)
+        self.assign_providers(provider_id, groups, create=False)
+        label = preset.get("label", "")
+        delivered = set()
+        for group in groups:
+            group["preset"] = label
+            group["metadata"] = group["metadata"] or default_metadata(label, group)
+            group["pending"] = []
+            known = False
+            for index in group["indices"]:
+                state = self._state(run_id, index)
+                known = known or bool(state.get("tournament_id"))
+                if state.get("stage") == STAGE_WEBHOOK_SENT:
+                    delivered.add(index)
+                elif not state.get("code"):
+                    group["pending"].append(index)
+            if not known and self.cache and group["provider_id"] is not None:
+                known = self.cache.get(group["provider_id"], group["region"], self.client.use_stub,
+                                       group["tournament_name"]) is not None
+            group["tournament_known"] = known
+
+        if self.batch:
+            # One coalesced delivery per webhook URL, after every group is minted
+            by_url = {}
+            for index in range(len(actions)):
+                by_url.setdefault(actions[index].get("url", ""), []).append(index)
+            deliveries = [{"url": url, "indices": indices} for url, indices in by_url.items()]
+        else:
+            deliveries = [{"url": actions[g["indices"][0]].get("url", ""), "indices": g["indices"]} for g in groups]
+        limiter = getattr(self.client, "rate_limiter", None)
+        return ExecutionPlan(preset, groups, deliveries, batch=self.batch, max_workers=self.max_workers,
+                             provider_creations=missing, delivered=delivered, resume_run=run_id,
+                             use_stub=self.client.use_stub, limits=limiter.limits if limiter else None)
+
+    def run(self, provider_id, preset, on_result=None, cancel=None, plan=None):
+        """
+        Run every action of the preset with at most max_workers in flight.
+        on_result(index, result) is called from worker threads as each action finishes.
+        Returns a summary with per-action results in preset order.
+        plan: an ExecutionPlan from plan() (e.g. the one shown in a preview);
+        its groups and deliveries are executed as compiled. Without one the
+        preset is planned now.
+        With a journal, an interrupted run of the same preset is resumed; a
+        run whose only failures are not retryable() is closed instead.
+        cancel (a threading.Event) stops the run at the next stage boundary;
+        requests already in flight complete, and the journal keeps the run
+        open so it can be resumed. While this run is in progress its journal
+        run is claimed: another job of the same preset starts a new run.
+        """
+        plan = plan or self.plan(provider_id, preset)
+        actions = plan.actions
+        run_id = self.journal.start_run(plan.preset) if self.journal else None
+        try:
+            groups = plan.groups
+            # Creates the providers the plan counted; existing shards come out as planned
+            shards = self.assign_providers(provider_id, groups)
+            # max_workers calls in flight per provider, so throughput grows with the shard count
+            slots = {group["provider_id"]: threading.Semaphore(self.max_workers) for group in groups}
+
+            def mint(group):
+                with slots[group["provider_id"]]:
+                    if _is_set(cancel):
+                        return {i: _new_result(actions[i]) for i in group["indices"]}
+                    return self.mint_group(provider_id, actions, group, run_id)
+
+            with ThreadPoolExecutor(max_workers=self.max_workers * max(1, shards)) as executor:
+                if plan.batch:
+                    minted = self._run_batched(executor, actions, groups, plan.deliveries, mint, run_id, on_result,
+                                               cancel)
+                else:
+                    def task(group):
+                        res = mint(group)
+                        if _is_set(cancel):
+                            self.skip(actions, group["indices"], res, on_result)
+                        else:
+                            self.deliver(actions, group["indices"], res, run_id, on_result)
+                        return res
+                    minted = {}
+                    for f in [executor.submit(task, g) for g in groups]:
+                        minted.update(f.result())
+
+            results = [minted[i] for i in range(len(actions))]
+            success_count = sum(1 for r in results if r["success"])
+            if self.journal and success_count == len(actions):
+                self.journal.finish_run(run_id)
+            elif self.journal and not _is_set(cancel) and not any(
+                    retryable(actions[i], r) for i, r in enumerate(results) if not r["success"]):
+                # Resuming would only repeat these failures: let the next run start fresh
+                self.journal.finish_run(run_id, OUTCOME_FAILED)
+
+            return {
+                "label": plan.label,
+                "run_id": run_id,
+                "results": results,
+                "success_count": success_count,
+                "total_count": len(actions),
+                "cancelled": _is_set(cancel),
+                "shards": shards
+            }
+        finally:
+            if self.journal:
+                self.journal.release_run(run_id)
+
+    def _run_batched(self, executor, actions, groups, deliveries, mint, run_id, on_result, cancel=None):
+        def deliver(indices):
+            if _is_set(cancel):
+                self.skip(actions, indices, minted, on_result)
+            else:
+                self.deliver(actions, indices, minted, run_id, on_result)
+
+        # Phase 1: one tournament + one /codes call per group
+        mint_futures = [executor.submit(mint, g) for g in groups]
+        minted = {}
+        for f in mint_futures:
+            minted.update(f.result())
+
+        # Phase 2: fan the codes out, one coalesced delivery per webhook URL
+        webhook_futures = [executor.submit(deliver, d["indices"]) for d in deliveries]
+        for f in webhook_futures:
+            f.result()
+        return minted
@@ -0,0 +1,102 @@
+import threading
+import zlib
+import config_manager
+
+# Regions a tournament provider can be registered for
+PROVIDER_REGIONS = ["KR", "JP", "EUW", "EUNE", "NA", "BR", "LAN", "LAS", "OCE", "TR", "RU", "PBE"]
+DEFAULT_CALLBACK_URL = "http://example.com/callback"  # Placeholder: callbacks are dropped
+
+def callback_url(config=None):
+    """
+    URL new providers register for game-completion callbacks: config
+    "callback_url" (the public address of callback_server.py), else the placeholder.
+    """
+    config = config if config is not None else config_manager.load_config()
+    return config.get("callback_url") or DEFAULT_CALLBACK_URL
+
+class ProviderRegistry:
+    """
+    Tournament providers by region and stub/prod mode, kept in config.json
+    under "providers" as [{"id", "region", "stub"}].
+    Codes can only be played in their provider's region, so every action is
+    routed to a provider of its region; when a region has several providers,
+    tournament groups are sharded across them by a stable hash, so a rerun
+    lands on the same provider (and its cached tournaments) again.
+    The legacy single "provider_id" is taken over as a provider of the
+    configured region; the migrated list is only written by add()/remove(),
+    so reads (e.g. a dry run) never rewrite config.json.
+    """
+    def __init__(self):
+        # Serializes provider creation, so parallel jobs never create two for one region
+        self.lock = threading.Lock()
+
+    def _entries(self):
+        config = config_manager.load_config()
+        entries = config.get("providers")
+        if entries is None:
+            entries = []
+            if config.get("provider_id"):
+                entries.append({"id": config["provider_id"], "region": config.get("region", "KR").upper(),
+                                "stub": config.get("use_stub", True)})
+        return entries
+
+    def providers(self, region, use_stub):
+        """Provider IDs registered for region in stub or prod mode, oldest first."""
+        region = region.upper()
+        return [e["id"] for e in self._entries() if e["region"] == region and e["stub"] == use_stub]
+
+    def entry(self, provider_id):
+        """The registered {"id", "region", "stub"} of provider_id, or None if it is unknown."""
+        return next((dict(e) for e in self._entries() if e["id"] == provider_id), None)
+
+    def regions(self, use_stub):
+        """{region: [provider IDs]} for one mode, in registration order."""
+        result = {}
+        for e in self._entries():
+            if e["stub"] == use_stub:
+                result.setdefault(e["region"], []).append(e["id"])
+        return result
+
+    def add(self, provider_id, region, use_stub):
+        entries = [e for e in self._entries() if e["id"] != provider_id]
+        entries.append({"id": provider_id, "region": region.upper(), "stub": use_stub})
+        config_manager.update_config(providers=entries)
+
+    def remove(self, provider_id):
+        entries = self._entries()
+        config_manager.update_config(providers=[e for e in entries if e["id"] != provider_id])
+
+    def create(self, client, region):
+        """Create a provider for region through client and register it. Returns the API result."""
+        res = client.create_provider(region=region, url=callback_url())
+        if res["success"]:
+            self.add(res["data"], region, client.use_stub)
+        return res
+
+    def ensure(self, client, region, count=1):
+        """
+        Make sure region has at least count providers in the client's mode,
+        creating the missing ones. Returns {"success", "data": [IDs]} or the failed result.
+        """
+        with self.lock:
+            ids = self.providers(region, client.use_stub)
+            while len(ids) < count:
+                res = self.create(client, region)
+                if not res["success"]:
+                    return res
+                ids.append(res["data"])
+            return {"success": True, "data": ids}
+
+    def shard(self, region, use_stub, key):
+        """The provider of region that owns shard key, or None if the region has none."""
+        ids = self.providers(region, use_stub)
+        if not ids:
+            return None
+        return ids[zlib.crc32(key.encode("utf-8")) % len(ids)]
+
+
+_registry = ProviderRegistry()
+
+def get_registry():
+    """Process-wide provider registry."""
+    return _registry
@@ -0,0 +1,120 @@
+import random
+import threading
+import time
+
+# (requests, seconds) windows per endpoint. Mirrors the per-second and
+# per-10-minute limits of the tournament API; override via config "rate_limits".
+DEFAULT_LIMITS = {
+    "/providers": [(5, 1), (30, 600)],
+    "/tournaments": [(10, 1), (300, 600)],
+    "/codes": [(20, 1), (1000, 600)]
+}
+
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` tokens every `per` seconds."""
+    def __init__(self, rate, per):
+        self.capacity = float(rate)
+        self.fill_rate = float(rate) / float(per)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Take one token and return how long the caller must wait before using it.
+        Tokens may go negative, so concurrent callers queue up behind each other.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.fill_rate
+
+
+class RateLimiter:
+    """
+    Per-endpoint token buckets plus throttling counters.
+    Endpoints are the client-side suffixes ("/providers", "/tournaments", "/codes").
+    """
+    def __init__(self, limits=None):
+        merged = dict(DEFAULT_LIMITS)
+        merged.update(limits or {})
+        self.limits = merged
+        self.buckets = {
+            endpoint: [TokenBucket(rate, per) for rate, per in windows]
+            for endpoint, windows in merged.items()
+        }
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def _bump(self, endpoint, key, amount=1):
+        with self.lock:
+            counters = self.stats.setdefault(endpoint, {"throttled": 0, "wait_time": 0.0,
+                                                        "rate_limited": 0, "retries": 0})
+            counters[key] += amount
+
+    def reserve(self, endpoint):
+        """Reserve a slot on every window of the endpoint. Returns seconds to wait."""
+        wait = max([b.reserve() for b in self.buckets.get(endpoint, [])] or [0.0])
+        if wait > 0:
+            self._bump(endpoint, "throttled")
+            self._bump(endpoint, "wait_time", wait)
+        return wait
+
+    def acquire(self, endpoint):
+        """Blocking variant of reserve(): sleeps until the request may be sent."""
+        wait = self.reserve(endpoint)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def record_rate_limited(self, endpoint):
+        """Count a 429 answered by Riot (or the backend) for this endpoint."""
+        self._bump(endpoint, "rate_limited")
+
+    def record_retry(self, endpoint):
+        self._bump(endpoint, "retries")
+
+    def snapshot(self):
+        with self.lock:
+            return {endpoint: dict(counters) for endpoint, counters in self.stats.items()}
+
+
+def backoff_delay(attempt, retry_after=None, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    """
+    Seconds to wait before retry number `attempt` (1-based).
+    Honors the server's Retry-After when known, otherwise uses full-jitter
+    exponential backoff.
+    """
+    if retry_after:
+        # Small jitter so parallel workers don't all retry on the same tick
+        return min(cap, retry_after) + random.uniform(0, base)
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+def parse_retry_after(value):
+    """Parse a Retry-After value (seconds). Returns 0.0 when missing or unparsable."""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return 0.0
+
+def throttle_delay(http_status, headers, res_data):
+    """
+    Detect a rate-limited response.
+    Returns None when the response is not throttled, otherwise the advertised
+    retry delay in seconds (0.0 if the server didn't say).
+    Riot's 429 reaches us either as the backend's own HTTP status or inside the
+    GAS payload as {"status": {"status_code": 429}, "retry_after": ...}.
+    """
+    if http_status in (429, 503):
+        return parse_retry_after(headers.get("Retry-After"))
+    if isinstance(res_data, dict) and isinstance(res_data.get("status"), dict):
+        if res_data["status"].get("status_code") in (429, 503):
+            return parse_retry_after(res_data.get("retry_after"))
+    return None
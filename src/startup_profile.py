@@ -0,0 +1,72 @@
+"""
+Startup-time profiler.
+
+install() wraps the import system so every module import is timed, like
+`python -X importtime` but also inside a PyInstaller build, where -X flags
+cannot be passed. report() prints the slowest modules by self and
+cumulative time.
+"""
+import importlib.abc
+import sys
+import time
+
+PROCESS_START = time.perf_counter()
+
+_records = {}  # module name -> [self_seconds, cumulative_seconds, imported_at_top_level]
+_stack = []  # [child_seconds] accumulators of the imports in progress
+
+class _TimedLoader(importlib.abc.Loader):
+    def __init__(self, loader):
+        self.loader = loader
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        _stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            cumulative = time.perf_counter() - start
+            children = _stack.pop()
+            if _stack:
+                _stack[-1] += cumulative
+            _records[module.__name__] = [cumulative - children, cumulative, not _stack]
+
+    def __getattr__(self, name):
+        # get_resource_reader, is_package, ... of the wrapped loader
+        return getattr(self.loader, name)
+
+
+class _TimedFinder(importlib.abc.MetaPathFinder):
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader)
+                return spec
+        return None
+
+
+def install():
+    """Start timing imports. Call before the imports you want to measure."""
+    if not any(isinstance(f, _TimedFinder) for f in sys.meta_path):
+        sys.meta_path.insert(0, _TimedFinder())
+
+def elapsed():
+    """Seconds since this module was first imported."""
+    return time.perf_counter() - PROCESS_START
+
+def report(limit=25, out=None):
+    """Print the slowest imports by cumulative time."""
+    out = out or sys.stdout
+    rows = sorted(_records.items(), key=lambda item: item[1][1], reverse=True)
+    print(f"{'self (ms)':>10} {'cumulative (ms)':>16}  module", file=out)
+    for name, (self_time, cumulative, _) in rows[:limit]:
+        print(f"{self_time * 1000:10.1f} {cumulative * 1000:16.1f}  {name}", file=out)
+    total = sum(cumulative for _, cumulative, root in _records.values() if root)
+    print(f"Total import time: {total * 1000:.1f} ms", file=out)
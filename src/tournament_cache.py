@@ -0,0 +1,103 @@
+import json
+import os
+import sys
+import threading
+import time
+import config_manager
+
+CACHE_FILE = "tournament_cache.json"  # In the app-data dir
+
+DEFAULT_TTL = 12 * 60 * 60  # Seconds a cached tournament ID stays valid
+DEFAULT_MAX_ENTRIES = 500
+
+class TournamentCache:
+    """
+    On-disk mapping (provider, region, stub/prod, tournament name) -> tournament ID.
+    Entries expire after `ttl` seconds and the least recently used ones are
+    evicted beyond `max_entries`. Switching stub/prod clears the whole cache.
+    """
+    def __init__(self, path=None, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path or config_manager.app_data_path(CACHE_FILE)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.use_stub = None
+        self.entries = {}
+        self._load()
+
+    @staticmethod
+    def make_key(provider_id, region, use_stub, name):
+        return "|".join([str(provider_id), (region or "").upper(), "stub" if use_stub else "prod", name])
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.use_stub = data.get("use_stub")
+            self.entries = data.get("entries", {})
+        except Exception as e:
+            print(f"Error loading tournament cache: {e}", file=sys.stderr)
+            self.entries = {}
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"use_stub": self.use_stub, "entries": self.entries}, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error saving tournament cache: {e}", file=sys.stderr)
+
+    def _check_mode(self, use_stub):
+        """Tournaments never carry over between stub and production."""
+        if self.use_stub is not None and self.use_stub != use_stub:
+            self.entries = {}
+        self.use_stub = use_stub
+
+    def get(self, provider_id, region, use_stub, name):
+        """Return the cached tournament ID or None if missing/expired."""
+        key = self.make_key(provider_id, region, use_stub, name)
+        with self.lock:
+            self._check_mode(use_stub)
+            entry = self.entries.get(key)
+            if not entry:
+                return None
+            now = time.time()
+            if now - entry["created_at"] > self.ttl:
+                del self.entries[key]
+                self._save()
+                return None
+            # Only touch memory on hits; last_used is persisted on the next put()
+            entry["last_used"] = now
+            return entry["tournament_id"]
+
+    def put(self, provider_id, region, use_stub, name, tournament_id):
+        key = self.make_key(provider_id, region, use_stub, name)
+        with self.lock:
+            self._check_mode(use_stub)
+            now = time.time()
+            self.entries[key] = {"tournament_id": tournament_id, "created_at": now, "last_used": now}
+            self._evict(now)
+            self._save()
+
+    def _evict(self, now):
+        expired = [k for k, e in self.entries.items() if now - e["created_at"] > self.ttl]
+        for key in expired:
+            del self.entries[key]
+        overflow = len(self.entries) - self.max_entries
+        if overflow > 0:
+            oldest = sorted(self.entries, key=lambda k: self.entries[k]["last_used"])[:overflow]
+            for key in oldest:
+                del self.entries[key]
+
+    def invalidate(self, provider_id=None):
+        """Drop every entry, or only those of one provider."""
+        with self.lock:
+            if provider_id is None:
+                self.entries = {}
+            else:
+                prefix = f"{provider_id}|"
+                self.entries = {k: e for k, e in self.entries.items() if not k.startswith(prefix)}
+            self._save()
@@ -0,0 +1,154 @@
+import json
+import config_manager
+
+DEFAULT_GAS_URL = "https://script.google.com/macros/s/AKfycbz53p_hNUxB_EP8VaGaEZzpSzhXgiZ3ceMPDz5jdixqjLtEgrkpMqtB31Do-DXpFmMXug/exec"
+DEFAULT_RIOT_HOST = "americas.api.riotgames.com"  # Tournament API lives on the americas cluster
+
+TRANSPORT_GAS = "gas"
+TRANSPORT_DIRECT = "direct"
+TRANSPORT_RELAY = "relay"
+TRANSPORTS = [TRANSPORT_GAS, TRANSPORT_DIRECT, TRANSPORT_RELAY]
+
+class TransportError(Exception):
+    """The transport cannot send requests (e.g. it is missing its URL or API key)."""
+
+
+class GasTransport:
+    """
+    The default route: POST the {"method", "endpoint", "use_stub", "params",
+    "body"} payload to the Google Apps Script proxy, which holds the API key.
+    GAS answers with a 302 to googleusercontent that the HTTP client follows.
+    """
+    name = TRANSPORT_GAS
+    label = "Backend"
+    # Riot errors arrive inside a 200 response; a 4xx/5xx is the proxy failing
+    riot_errors_in_body = False
+
+    def __init__(self, url=None):
+        self.url = url or DEFAULT_GAS_URL
+
+    def build(self, payload):
+        """HTTP request for a GAS payload: {"method", "url", "params", "json", "headers"}."""
+        return {"method": "POST", "url": self.url, "params": None, "json": payload, "headers": {}}
+
+    def decode(self, http_status, body):
+        """Decoded response data from the raw body bytes (fed to normalize_response)."""
+        return json.loads(body)
+
+    def health_request(self):
+        """Cheap request that shows whether the route is up: the script's doGet()."""
+        return {"method": "GET", "url": self.url, "params": None, "json": None, "headers": {}}
+
+    def describe(self):
+        return "GAS proxy"
+
+
+class RelayTransport(GasTransport):
+    """
+    A self-hosted relay speaking the same payload contract as the GAS script
+    (e.g. scripts/mock_backend.py, or a small proxy next to a production key).
+    Skips the GAS cold start and redirect hop; an optional RELAY_TOKEN from
+    the .env file is sent as a bearer token.
+    """
+    name = TRANSPORT_RELAY
+    label = "Relay"
+
+    def __init__(self, url, token=None):
+        if not url:
+            raise TransportError("relay_url is not configured.")
+        super().__init__(url)
+        self.token = token
+
+    def build(self, payload):
+        request = super().build(payload)
+        if self.token:
+            request["headers"] = {"Authorization": f"Bearer {self.token}"}
+        return request
+
+    def health_request(self):
+        request = super().health_request()
+        if self.token:
+            request["headers"] = {"Authorization": f"Bearer {self.token}"}
+        return request
+
+    def describe(self):
+        return f"Relay ({self.url})"
+
+
+class DirectRiotTransport:
+    """
+    Calls the Riot tournament(-stub) v5 API directly with an API key read
+    from the .env file (RIOT_API_KEY), with no proxy hop at all.
+    Riot error responses are converted to the {"status": {...}} shape the
+    GAS script forwards, so result normalization is identical.
+    """
+    name = TRANSPORT_DIRECT
+    label = "Riot API"
+    riot_errors_in_body = True
+
+    def __init__(self, api_key=None, host=DEFAULT_RIOT_HOST):
+        self.api_key = api_key
+        self.host = host or DEFAULT_RIOT_HOST
+
+    def _key(self):
+        if not self.api_key:
+            self.api_key = config_manager.get_env_value("RIOT_API_KEY")
+        if not self.api_key:
+            raise TransportError(f"RIOT_API_KEY not configured (set it in {config_manager.app_data_path(config_manager.ENV_FILE)})")
+        return self.api_key
+
+    def build(self, payload):
+        params = payload.get("params")
+        return {
+            "method": payload.get("method", "POST"),
+            "url": f"https://{self.host}{payload['endpoint']}",
+            # Query values as strings, the same way GAS encodes them
+            "params": {k: str(v) for k, v in params.items()} if params else None,
+            "json": payload.get("body"),
+            "headers": {"X-Riot-Token": self._key()}
+        }
+
+    def decode(self, http_status, body):
+        try:
+            data = json.loads(body)
+        except ValueError:
+            data = body.decode("utf-8", "replace")
+        if http_status >= 400 and not (isinstance(data, dict) and isinstance(data.get("status"), dict)):
+            data = {"status": {"status_code": http_status, "message": str(data) or "Unknown"}}
+        return data
+
+    def health_request(self):
+        # No key needed: any answer below 500 shows the routing host is reachable
+        return {"method": "GET", "url": f"https://{self.host}/", "params": None, "json": None, "headers": {}}
+
+    def describe(self):
+        return f"Direct ({self.host})"
+
+
+def create_transport(config=None, base_url=None):
+    """
+    Build the transport selected by config["transport"].
+    base_url (tests, mock backend) overrides the GAS/relay URL.
+    Raises TransportError for an unknown or incomplete transport.
+    """
+    config = config if config is not None else config_manager.load_config()
+    kind = config.get("transport") or TRANSPORT_GAS
+    if kind == TRANSPORT_GAS:
+        return GasTransport(base_url or config.get("gas_url"))
+    if kind == TRANSPORT_RELAY:
+        return RelayTransport(base_url or config.get("relay_url"), config_manager.get_env_value("RELAY_TOKEN"))
+    if kind == TRANSPORT_DIRECT:
+        return DirectRiotTransport(host=config.get("riot_api_host"))
+    raise TransportError(f"Unknown transport: {kind} (expected one of {', '.join(TRANSPORTS)})")
+
+def create_fallback_transport(config=None):
+    """
+    Build the transport named by config["fallback_transport"], used while the
+    primary route's circuit breaker is open. None if no (distinct) fallback is set.
+    Raises TransportError like create_transport.
+    """
+    config = config if config is not None else config_manager.load_config()
+    kind = config.get("fallback_transport")
+    if not kind or kind == (config.get("transport") or TRANSPORT_GAS):
+        return None
+    return create_transport(dict(config, transport=kind))
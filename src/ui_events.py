@@ -0,0 +1,84 @@
+import queue
+import traceback
+
+DRAIN_INTERVAL_MS = 33  # About one frame at 30 fps
+MAX_EVENTS_PER_DRAIN = 500
+
+class EventBus:
+    """
+    Hands events from worker threads to the Tk main loop.
+
+    Tk is not thread-safe, so workers never touch widgets: they publish()
+    events to a queue (safe from any thread) and the main loop drains it in
+    batches every DRAIN_INTERVAL_MS through after(). Events published with a
+    coalesce key replace older ones with the same key in the same batch, so
+    a burst of status updates costs one widget update per frame.
+    """
+    def __init__(self, root, interval_ms=DRAIN_INTERVAL_MS, max_batch=MAX_EVENTS_PER_DRAIN):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.max_batch = max_batch
+        self.queue = queue.SimpleQueue()
+        self.handlers = {}  # topic -> [handler]
+        self._after_id = None
+
+    def subscribe(self, topic, handler):
+        """Call handler(*args) on the Tk thread for every event of topic."""
+        self.handlers.setdefault(topic, []).append(handler)
+
+    def publish(self, topic, *args, coalesce=None):
+        """
+        Queue an event from any thread.
+        coalesce: events with the same key within one drain keep only the latest.
+        """
+        self.queue.put((topic, args, coalesce))
+
+    def call(self, func, *args):
+        """Run func(*args) on the Tk thread."""
+        self.publish("call", func, *args)
+
+    def start(self):
+        if self._after_id is None:
+            self._after_id = self.root.after(self.interval_ms, self._drain)
+
+    def stop(self):
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _drain(self):
+        self._after_id = None
+        batch = []
+        latest = {}  # coalesce key -> position in batch
+        for _ in range(self.max_batch):
+            try:
+                event = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            key = event[2]
+            if key is not None and key in latest:
+                batch[latest[key]] = None  # superseded
+            if key is not None:
+                latest[key] = len(batch)
+            batch.append(event)
+
+        for event in batch:
+            if event is not None:
+                self._dispatch(*event[:2])
+
+        if self.root.winfo_exists():
+            self._after_id = self.root.after(self.interval_ms, self._drain)
+
+    def _dispatch(self, topic, args):
+        try:
+            if topic == "call":
+                args[0](*args[1:])
+                return
+            for handler in self.handlers.get(topic, []):
+                handler(*args)
+        except Exception:
+            # One bad event must not stop the drain loop
+            traceback.print_exc()
@@ -1,39 +1,56 @@
-import json
-import os
+import argparse
+import asyncio
 import requests
 from api_client import RiotTournamentClient
+from async_client import AsyncRiotTournamentClient
 from discord_helper import send_discord_webhook
+from preset_manager import get_repository
+from transports import create_transport, TransportError
+from provider_registry import callback_url
 
 def check_presets_file():
-    print("\n[1] Checking presets.json integrity...")
-    if not os.path.exists("presets.json"):
-        print("❌ presets.json not found!")
-        return False
+    print("\n[1] Checking preset store integrity...")
     try:
-        with open("presets.json", "r", encoding="utf-8") as f:
-            data = json.load(f)
-            print(f"✅ presets.json loaded. Found {len(data)} presets.")
-            for p in data:
-                print(f"   - Preset: {p.get('label', 'Unnamed')}")
-                if "actions" not in p or not isinstance(p["actions"], list):
-                    print("     ❌ Invalid actions structure")
-                    return False
-                for a in p["actions"]:
-                    url = a.get("url", "")
-                    masked_url = url[:35] + "..." if len(url) > 30 else url
-                    print(f"     -> Action: {a.get('name', 'Unnamed')} (Webhook: {masked_url})")
-            return True
+        repository = get_repository()
+        data = repository.all()
     except Exception as e:
-        print(f"❌ Error reading presets.json: {e}")
+        print(f"❌ Error opening presets.db: {e}")
+        return False
+    print(f"✅ {repository.path} loaded. Found {len(data)} presets.")
+    if not data:
+        print("❌ No presets stored!")
         return False
+    for p in data:
+        print(f"   - Preset: {p.get('label', 'Unnamed')}")
+        if "actions" not in p or not isinstance(p["actions"], list):
+            print("     ❌ Invalid actions structure")
+            return False
+        for a in p["actions"]:
+            url = a.get("url", "")
+            masked_url = url[:35] + "..." if len(url) > 30 else url
+            print(f"     -> Action: {a.get('name', 'Unnamed')} (Webhook: {masked_url})")
+    return True
 
-def check_backend_connection():
-    print("\n[2] Checking GAS Backend & Riot API...")
-    client = RiotTournamentClient(use_stub=True)
+def check_backend_connection(base_url=None):
+    try:
+        transport = create_transport(base_url=base_url)
+    except TransportError as e:
+        print(f"\n[2] ❌ Transport error: {e}")
+        return False
+    print(f"\n[2] Checking {transport.describe()} & Riot API...")
+    client = RiotTournamentClient(use_stub=True, transport=transport)
+    
+    # 0. Health check (GAS doGet): fails in seconds when the backend is down
+    print("   -> Health check...")
+    res = client.check_health()
+    if not res["success"]:
+        print(f"❌ {res['error']}")
+        return False
+    print(f"✅ Backend reachable ({res['data']['latency_ms']} ms)")
     
     # 1. Create Provider
     print("   -> Creating Provider...")
-    res = client.create_provider("KR", "http://dummy.url/callback")
+    res = client.create_provider("KR", callback_url())
     if not res["success"]:
         print(f"❌ Failed to create provider: {res['error']}")
         return False
@@ -60,15 +77,59 @@ def check_backend_connection():
     
     return True
 
+async def _check_backend_async(concurrency, base_url=None):
+    async with AsyncRiotTournamentClient(use_stub=True, transport=create_transport(base_url=base_url)) as client:
+        res = await client.create_provider("KR", callback_url())
+        if not res["success"]:
+            print(f"❌ Failed to create provider: {res['error']}")
+            return False
+        provider_id = res["data"]
+        print(f"✅ Provider Created: {provider_id}")
+        
+        # Fire the tournament -> code sequence several times at once on one loop
+        async def sequence(i):
+            t_res = await client.create_tournament(provider_id, f"Verify Async Tournament {i + 1}")
+            if not t_res["success"]:
+                return t_res
+            return await client.create_codes(t_res["data"], count=1)
+        
+        results = await asyncio.gather(*(sequence(i) for i in range(concurrency)))
+        failed = [r for r in results if not r["success"]]
+        for r in failed:
+            print(f"❌ Failed async sequence: {r['error']}")
+        print(f"✅ Async Codes Generated: {concurrency - len(failed)}/{concurrency}")
+        return not failed
+
+def check_backend_connection_async(concurrency=5, base_url=None):
+    print(f"\n[3] Checking backend with async client ({concurrency} concurrent)...")
+    try:
+        return asyncio.run(_check_backend_async(concurrency, base_url))
+    except TransportError as e:
+        print(f"❌ Transport error: {e}")
+        return False
+
 def main():
+    parser = argparse.ArgumentParser(description="LOL Tournament Code Creator system verification")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Also verify the backend through the async client")
+    parser.add_argument("--concurrency", type=int, default=5,
+                        help="Concurrent sequences for the async check (default: 5)")
+    parser.add_argument("--base-url", default=None,
+                        help="GAS/relay URL to verify instead of the configured one "
+                             "(e.g. scripts/mock_backend.py at http://127.0.0.1:8765/exec)")
+    args = parser.parse_args()
+    
     print("=== LOL Tournament Code Creator - System Verification ===")
     
     presets_ok = check_presets_file()
-    backend_ok = check_backend_connection()
+    backend_ok = check_backend_connection(args.base_url)
+    async_ok = check_backend_connection_async(args.concurrency, args.base_url) if args.use_async else None
     
     print("\n" + "="*40)
-    print(f"Presets File: {'✅ PASS' if presets_ok else '❌ FAIL'}")
+    print(f"Preset Store: {'✅ PASS' if presets_ok else '❌ FAIL'}")
     print(f"API Backend : {'✅ PASS' if backend_ok else '❌ FAIL'}")
+    if async_ok is not None:
+        print(f"Async Client: {'✅ PASS' if async_ok else '❌ FAIL'}")
     print("="*40)
 
 if __name__ == "__main__":
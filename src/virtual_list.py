@@ -0,0 +1,179 @@
+import sys
+import tkinter
+import customtkinter as ctk
+
+WHEEL_SEQUENCES = ("<MouseWheel>", "<Button-4>", "<Button-5>")
+
+class VirtualList(ctk.CTkFrame):
+    """
+    Scrollable list that only materializes the rows visible in the viewport.
+
+    Row widgets are built once by make_row(parent) and recycled: as the list
+    scrolls, bind_row(row, index, item) re-points an existing row at another
+    item instead of destroying and recreating widgets. Updating one item
+    only rebinds its row (update_item), so lists of hundreds of entries stay
+    responsive.
+    """
+    def __init__(self, master, row_height, make_row, bind_row, empty_text="", **kwargs):
+        super().__init__(master, **kwargs)
+        self.row_height = row_height
+        self.make_row = make_row
+        self.bind_row = bind_row
+        self.items = []
+        self.rows = []  # Recycled row widgets, in viewport order
+        self.offset = 0  # Pixels scrolled from the top
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self.viewport = ctk.CTkFrame(self, fg_color="transparent")
+        self.viewport.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.lbl_empty = ctk.CTkLabel(self.viewport, text=empty_text)
+
+        self.viewport.bind("<Configure>", lambda e: self._render())
+        # Wheel events arrive at the widget under the pointer (usually a row
+        # child), so the list listens app-wide, but only while the pointer is
+        # over it: no handler outlives the list or piles up across windows.
+        # tkinter.Misc.bind: CTkFrame.bind would only bind the background canvas
+        self._wheel_ids = {}  # sequence -> Tcl command of our bind_all handler
+        tkinter.Misc.bind(self, "<Enter>", self._bind_wheel, add="+")
+        tkinter.Misc.bind(self, "<Leave>", self._on_leave, add="+")
+        tkinter.Misc.bind(self, "<Destroy>", self._on_destroy, add="+")
+
+    # --- Public API ---
+    def set_items(self, items):
+        """Replace the item list and redraw only the visible rows."""
+        self.items = list(items)
+        self.offset = min(self.offset, self._max_offset())
+        self._render()
+
+    def update_item(self, index, item=None):
+        """Rebind a single item's row (if visible) after it changed."""
+        if item is not None:
+            self.items[index] = item
+        row = self._row_for_index(index)
+        if row is not None:
+            self.bind_row(row, index, self.items[index])
+
+    def scroll_to(self, index):
+        """Scroll so that the item at index is visible."""
+        top = index * self.row_height
+        bottom = top + self.row_height
+        height = self._viewport_height()
+        if top < self.offset:
+            self.offset = top
+        elif bottom > self.offset + height:
+            self.offset = bottom - height
+        self.offset = max(0, min(self.offset, self._max_offset()))
+        self._render()
+
+    def visible_rows(self):
+        """(row widget, item index) pairs currently on screen."""
+        first = self.offset // self.row_height
+        return [(row, first + i) for i, row in enumerate(self.rows) if first + i < len(self.items)]
+
+    # --- Layout ---
+    def _viewport_height(self):
+        return max(1, self.viewport.winfo_height())
+
+    def _max_offset(self):
+        return max(0, len(self.items) * self.row_height - self._viewport_height())
+
+    def _row_for_index(self, index):
+        for row, row_index in self.visible_rows():
+            if row_index == index:
+                return row
+        return None
+
+    def _render(self):
+        height = self._viewport_height()
+        if not self.items:
+            for row in self.rows:
+                row.place_forget()
+            self.lbl_empty.place(relx=0.5, y=20, anchor="n")
+            self.scrollbar.set(0, 1)
+            return
+        self.lbl_empty.place_forget()
+
+        # One spare row covers the partially visible row at the bottom
+        needed = min(len(self.items), height // self.row_height + 2)
+        while len(self.rows) < needed:
+            self.rows.append(self.make_row(self.viewport))
+
+        first = self.offset // self.row_height
+        shift = self.offset % self.row_height
+        for i, row in enumerate(self.rows):
+            index = first + i
+            if i < needed and index < len(self.items):
+                self.bind_row(row, index, self.items[index])
+                row.place(x=0, y=i * self.row_height - shift, relwidth=1)
+            else:
+                row.place_forget()
+
+        total = len(self.items) * self.row_height
+        self.scrollbar.set(self.offset / total, min(1.0, (self.offset + height) / total))
+
+    # --- Scrolling ---
+    def _scroll_by(self, pixels):
+        new_offset = max(0, min(self.offset + pixels, self._max_offset()))
+        if new_offset != self.offset:
+            self.offset = new_offset
+            self._render()
+
+    def _on_scrollbar(self, action, *args):
+        if action == "moveto":
+            total = len(self.items) * self.row_height
+            self.offset = max(0, min(int(float(args[0]) * total), self._max_offset()))
+            self._render()
+        elif action == "scroll":
+            amount, unit = int(args[0]), args[1]
+            step = self._viewport_height() if unit == "pages" else self.row_height
+            self._scroll_by(amount * step)
+
+    def _contains_pointer(self):
+        widget = self.winfo_containing(*self.winfo_pointerxy())
+        return widget is not None and str(widget).startswith(str(self))
+
+    def _bind_wheel(self, event=None):
+        if self._wheel_ids:
+            return
+        for sequence in WHEEL_SEQUENCES:
+            self._wheel_ids[sequence] = self.bind_all(sequence, self._on_wheel, add="+")
+
+    def _unbind_wheel(self):
+        # unbind_all would drop every other handler too; remove only ours
+        for sequence, funcid in self._wheel_ids.items():
+            try:
+                script = self.tk.call("bind", "all", sequence)
+                kept = "\n".join(line for line in script.split("\n") if funcid not in line)
+                self.tk.call("bind", "all", sequence, kept)
+                self.deletecommand(funcid)
+            except tkinter.TclError:
+                pass
+        self._wheel_ids = {}
+
+    def _on_leave(self, event):
+        # Moving onto a row also "leaves" the frame; only unbind once the pointer is really outside
+        if not self._contains_pointer():
+            self._unbind_wheel()
+
+    def _on_destroy(self, event):
+        if event.widget is self:
+            self._unbind_wheel()
+
+    def _on_wheel(self, event):
+        if not self.winfo_exists():
+            return
+        widget = self.winfo_containing(event.x_root, event.y_root)
+        if widget is None or not str(widget).startswith(str(self.viewport)):
+            return
+        if sys.platform == "darwin":
+            self._scroll_by(-event.delta * self.row_height // 4)
+        elif event.num == 4:
+            self._scroll_by(-self.row_height)
+        elif event.num == 5:
+            self._scroll_by(self.row_height)
+        else:
+            self._scroll_by(-(event.delta // 120) * self.row_height)
@@ -0,0 +1,41 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from job_journal import JobJournal, STAGE_CODE_MINTED
+
+PRESET = {"label": "Group A", "actions": [{"name": "Match 1", "url": ""}, {"name": "Match 2", "url": ""}]}
+
+def test_two_jobs_of_one_preset_never_share_a_run(tmp_path):
+    journal = JobJournal(str(tmp_path / "job_journal.jsonl"))
+    interrupted = journal.start_run(PRESET)
+    journal.record(interrupted, 0, STAGE_CODE_MINTED, code="KR-1")
+    journal.release_run(interrupted)
+
+    # Both jobs start at once: one resumes the interrupted run, the other gets a new one
+    claimed = []
+    barrier = threading.Barrier(2)
+
+    def job():
+        barrier.wait()
+        claimed.append(journal.start_run(PRESET))
+
+    threads = [threading.Thread(target=job) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert interrupted in claimed
+    assert len(set(claimed)) == 2
+    # Neither run is offered for resuming while its job holds it
+    assert journal.find_run(PRESET) is None
+    assert journal.abandon_run(PRESET) is None
+
+    fresh = next(run_id for run_id in claimed if run_id != interrupted)
+    journal.finish_run(fresh)
+    journal.release_run(fresh)
+    journal.release_run(interrupted)
+    assert journal.find_run(PRESET) == interrupted